@@ -0,0 +1,110 @@
+"""Rolling robust z-scores for many daily delay series at once.
+
+Each series (an airport, an airline, ...) is a column of a ``(days, series)``
+matrix. A day is scored against the median of the previous ``window`` days of
+its own series, scaled by their median absolute deviation (MAD), so a single
+bad day neither hides itself nor distorts the next month's baseline the way a
+mean and standard deviation would. Medians are taken over sliding-window views
+of the whole matrix, a block of days at a time, so no Python loop runs per
+series or per day.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+ANOMALY_WINDOW = 28
+MIN_HISTORY = 14
+MAD_SCALE = 1.4826  # Makes the MAD consistent with a standard deviation.
+MIN_SPREAD = 1.0
+BLOCK_DAYS = 128
+
+
+def daily_means(
+    day: np.ndarray,
+    series: np.ndarray,
+    values: np.ndarray,
+    n_days: int,
+    n_series: int,
+    min_count: int = 1,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(means, counts)`` matrices of ``values`` per day and series.
+
+    ``day`` and ``series`` are integer positions; rows with a negative
+    position or a NaN value are ignored. Cells with fewer than ``min_count``
+    values are NaN in ``means``.
+    """
+
+    valid = (day >= 0) & (series >= 0) & ~np.isnan(values)
+    key = day[valid].astype(np.int64) * n_series + series[valid]
+    size = n_days * n_series
+    counts = np.bincount(key, minlength=size).reshape(n_days, n_series)
+    sums = np.bincount(key, weights=values[valid], minlength=size).reshape(n_days, n_series)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    means[counts < max(min_count, 1)] = np.nan
+    return means, counts
+
+
+class RollingRobustZ:
+    """Scores new days of every series against their trailing window.
+
+    Keeps only the last ``window`` days between calls, so history can be fed
+    all at once or a day at a time with identical results.
+    """
+
+    def __init__(
+        self,
+        n_series: int,
+        window: int = ANOMALY_WINDOW,
+        min_history: int = MIN_HISTORY,
+    ) -> None:
+        self.window = window
+        self.min_history = min_history
+        self._tail = np.full((window, n_series), np.nan)
+
+    def update(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(z, baseline, spread)`` for the new ``(days, series)`` rows.
+
+        ``baseline`` is the trailing median and ``spread`` the scaled MAD,
+        floored at ``MIN_SPREAD``. All three are NaN where a value is missing
+        or its window has fewer than ``min_history`` observed days.
+        """
+
+        values = np.asarray(values, dtype=float).reshape(-1, self._tail.shape[1])
+        history = np.vstack([self._tail, values])
+        baseline = np.full(values.shape, np.nan)
+        spread = np.full(values.shape, np.nan)
+        for start in range(0, len(values), BLOCK_DAYS):
+            stop = min(start + BLOCK_DAYS, len(values))
+            # Row i of ``windows`` holds the ``window`` days before new day i.
+            windows = np.lib.stride_tricks.sliding_window_view(
+                history[start:stop + self.window - 1], self.window, axis=0)
+            median, observed = _nanmedian_last(windows)
+            deviation, _ = _nanmedian_last(np.abs(windows - median[..., None]))
+            enough = observed >= self.min_history
+            baseline[start:stop] = np.where(enough, median, np.nan)
+            spread[start:stop] = np.where(
+                enough, np.maximum(MAD_SCALE * deviation, MIN_SPREAD), np.nan)
+
+        self._tail = history[-self.window:]
+        z = (values - baseline) / spread
+        return z, baseline, spread
+
+
+def _nanmedian_last(blocks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the NaN-ignoring median along the last axis and the counts used.
+
+    Sorting puts NaN last, so the median is read at positions derived from each
+    cell's count of observed values; much faster than ``np.nanmedian``.
+    """
+
+    ordered = np.sort(blocks, axis=-1)
+    observed = np.count_nonzero(~np.isnan(blocks), axis=-1)
+    low = np.take_along_axis(ordered, np.maximum(observed - 1, 0)[..., None] // 2, axis=-1)
+    high = np.take_along_axis(ordered, (observed // 2)[..., None], axis=-1)
+    # ``high`` indexes past the last observed value when nothing was observed.
+    median = np.where(observed > 0, (low[..., 0] + high[..., 0]) / 2, np.nan)
+    return median, observed
@@ -2,18 +2,32 @@
 
 from __future__ import annotations
 
+from http.server import ThreadingHTTPServer
 from pathlib import Path
 from typing import Callable, Tuple
 
 import pandas as pd
 import streamlit as st
 
-from preprocess import load_preprocessed_data
+from filters import FILTERED_FRAMES_KEPT, FilterIndex, FilterSpec, get_filter_index
+from filters import render_sidebar_filters
+from filters import warmup_tasks as filters_warmup_tasks
+from metrics import metrics_port, start_metrics_server
+from partitions import DatePredicate
+from preprocess import AIRLINE_DATA_PATH, DATA_MONTHS, load_preprocessed_data
+from progressive import progressive_applies, render_preview_until_exact
+from progressive import warmup_tasks as progressive_warmup_tasks
+from rerun_costs import RerunCosts
 from pages.context import render_page as render_context_page
+from pages.context import warmup_tasks as context_warmup_tasks
 from pages.volume import render_page as render_volume_page
+from pages.volume import warmup_tasks as volume_warmup_tasks
 from pages.delay import render_page as render_delay_page
+from pages.delay import warmup_tasks as delay_warmup_tasks
 from pages.best_airline import render_page as render_best_airline_page
+from pages.best_airline import warmup_tasks as best_airline_warmup_tasks
 from theme import init_theme
+from warmup import WARMUP_CPU_BUDGET, WARMUP_ENABLED, TaskFactory, WarmupProgress, start_warmup
 
 st.set_page_config(
     page_title="US Airline Operations",
@@ -22,42 +36,122 @@ st.set_page_config(
 )
 
 
-@st.cache_data(show_spinner="Loading flight and airport data...")
-def get_data(dataset_path: str | Path = "Airline_dataset.csv") -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Cache the preprocessing step so Streamlit reloads stay fast."""
+@st.cache_resource(show_spinner="Loading flight and airport data...")
+def get_data(
+    dataset_path: str | Path = AIRLINE_DATA_PATH,
+    predicate: DatePredicate | None = DATA_MONTHS,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Cache the preprocessing step so Streamlit reloads stay fast.
 
-    return load_preprocessed_data(dataset_path)
+    A shared resource rather than cached data: every rerun gets the same
+    frames instead of unpickling a fresh copy, so nothing may modify them.
+    """
 
+    return load_preprocessed_data(dataset_path, predicate)
 
-PAGE_DEFINITIONS: Tuple[Tuple[str, str, str, Callable[[pd.DataFrame, pd.DataFrame], None]], ...] = (
+
+@st.cache_resource(show_spinner="Indexing flights for filtering...")
+def get_data_filter_index() -> FilterIndex:
+    """Return the filter index of ``get_data()``'s frames.
+
+    Taking no arguments avoids hashing the flight frame on every rerun, as
+    ``get_filter_index(df, airports_us)`` would. It calls ``get_data()`` exactly
+    as ``main`` and the warm-up do: Streamlit keys caches by the arguments as
+    passed, so spelling out the defaults would load the dataset a second time.
+    """
+
+    return get_filter_index(*get_data())
+
+
+@st.cache_resource(show_spinner=False, max_entries=FILTERED_FRAMES_KEPT)
+def get_filtered_data(spec: FilterSpec) -> pd.DataFrame:
+    """Return ``get_data()``'s flights matching ``spec``, one shared frame per selection.
+
+    Keyed by the hashable ``spec`` alone, so every rerun and session with the
+    same filters gets the same frame object: identity-keyed memos keep their
+    entries, and the frame's cells stay registered for ``flight_cells``.
+    """
+
+    return get_data_filter_index().apply(get_data()[0], spec)
+
+
+PAGE_DEFINITIONS: Tuple[Tuple[str, str, str, Callable[[pd.DataFrame, pd.DataFrame], None], TaskFactory], ...] = (
     ("📘", "Understanding the Dataset",
-     "Explore coverage, scale, and on-time performance.", render_context_page),
+     "Explore coverage, scale, and on-time performance.",
+     render_context_page, context_warmup_tasks),
     ("📊", "Flight Volume Analysis",
-     "Track volumes by airport, state, and year-over-year shifts.", render_volume_page),
+     "Track volumes by airport, state, and year-over-year shifts.",
+     render_volume_page, volume_warmup_tasks),
     ("⏱️", "Delay Analysis",
-     "Compare temporal delay patterns and magnitude by airline.", render_delay_page),
+     "Compare temporal delay patterns and magnitude by airline.",
+     render_delay_page, delay_warmup_tasks),
     ("🛫", "Best Airline Suggester",
-     "Get carrier recommendations for any origin-destination pair.", render_best_airline_page),
+     "Get carrier recommendations for any origin-destination pair.",
+     render_best_airline_page, best_airline_warmup_tasks),
 )
 
+PAGE_OPTIONS = [f"{icon}  {title}" for icon, title, *_ in PAGE_DEFINITIONS]
+PAGES_BY_OPTION = dict(zip(PAGE_OPTIONS, PAGE_DEFINITIONS))
+
+WARMUP_TASK_FACTORIES = (
+    filters_warmup_tasks,
+    progressive_warmup_tasks,
+    *(page[4] for page in PAGE_DEFINITIONS),
+)
+
+
+@st.cache_resource(show_spinner=False)
+def start_cache_warmup() -> WarmupProgress:
+    """Start filling the data and page caches once per server process."""
+
+    return start_warmup(get_data, WARMUP_TASK_FACTORIES, WARMUP_CPU_BUDGET)
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_endpoint(port: int) -> ThreadingHTTPServer | None:
+    """Serve ``/metrics`` on ``port`` once per server process."""
+
+    return start_metrics_server(port)
+
 
 def main() -> None:
-    init_theme()
-    df, airports_us = get_data()
-
-    st.title("Flight Reliability & Resilience Dashboard")
-    options = [f"{icon}  {title}" for icon, title, _, _ in PAGE_DEFINITIONS]
-    choice = st.sidebar.radio(
-        label="", options=options, index=0, key="page_selector")
-
-    icon, title, description, renderer = next(
-        item for item in PAGE_DEFINITIONS if f"{item[0]}  {item[1]}" == choice
-    )
-    st.sidebar.markdown(
-        f"<div class='active-nav-label'>{title}</div>", unsafe_allow_html=True)
-    st.sidebar.caption(description)
-
-    renderer(df, airports_us)
+    costs = RerunCosts()
+    port = metrics_port()
+    if port:
+        start_metrics_endpoint(port)
+    with costs.stage("theme"):
+        init_theme()
+    with costs.stage("data"):
+        warmup_progress = start_cache_warmup() if WARMUP_ENABLED else None
+        df, airports_us = get_data()
+
+    with costs.stage("navigation"):
+        st.title("Flight Reliability & Resilience Dashboard")
+        choice = st.sidebar.radio(
+            label="", options=PAGE_OPTIONS, index=0, key="page_selector")
+        icon, title, description, renderer, page_warmup_tasks = PAGES_BY_OPTION[choice]
+        st.sidebar.markdown(
+            f"<div class='active-nav-label'>{title}</div>", unsafe_allow_html=True)
+        st.sidebar.caption(description)
+        if warmup_progress is not None and not warmup_progress.finished:
+            st.sidebar.progress(warmup_progress.fraction,
+                                text=warmup_progress.summary())
+
+    with costs.stage("filters"):
+        filter_index = get_data_filter_index()
+        spec = render_sidebar_filters(filter_index)
+        filtered_df = get_filtered_data(spec)
+
+    with costs.stage("page"):
+        # On large datasets, show a sampled preview until this page's builders
+        # are cached for the current filters.
+        if not (progressive_applies(df) and render_preview_until_exact(
+            title, page_warmup_tasks, df, filtered_df, airports_us, spec,
+            exact_cached=(filter_index.is_default(spec)
+                          and warmup_progress is not None and warmup_progress.finished),
+        )):
+            renderer(filtered_df, airports_us)
+    costs.finish(title)
 
 
 if __name__ == "__main__":
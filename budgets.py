@@ -0,0 +1,287 @@
+"""Memory and latency budgets for the data loader and every page builder.
+
+Each target runs on a fixed synthetic dataset, once under ``tracemalloc`` for
+peak allocation and ``--repeat`` times untraced for wall time (the fastest run
+counts, since tracing slows Python code down). Every target must have an entry
+in ``BUDGETS``; a missing budget fails just like an exceeded one, so a new
+builder cannot slip in unmeasured.
+
+Memory budgets are absolute. Time budgets are multiples of a fixed reference
+workload (a groupby and a sort over ``BUDGET_FLIGHTS`` rows) timed in the same
+run, so a slower or busier machine moves the limits along with the targets.
+
+    python budgets.py              # check, exit status 1 on any violation
+    python budgets.py --record     # print measured values as a BUDGETS literal
+
+Peaks cover allocations made through Python and NumPy. Arrow-backed string
+buffers bypass ``tracemalloc``, so string-heavy steps read lower than their
+RSS growth. ``--time-scale`` or ``DASHBOARD_BUDGET_TIME_SCALE`` loosens every
+time budget further, e.g. under a profiler.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.logger import set_log_level
+
+import preprocess
+from synthetic import Sources, make_synthetic_data, synthetic_sources, use_sources
+
+BUDGET_FLIGHTS = 200_000
+BUDGET_SEED = 0
+TIME_SCALE = float(os.environ.get("DASHBOARD_BUDGET_TIME_SCALE", "1.0"))
+
+MIB = 1024 * 1024
+MIN_PEAK_MIB = 1.0
+MIN_TIME_RATIO = 3.0
+BASELINE_NAME = "baseline.reference_workload"
+
+
+@dataclass(frozen=True)
+class Budget:
+    """Allowed peak traced allocation (MiB) and wall time in baseline runs."""
+
+    peak_mib: float
+    time_ratio: float
+
+
+@dataclass(frozen=True)
+class Measurement:
+    name: str
+    peak_mib: float
+    seconds: float
+
+
+# Generated with ``--record`` on BUDGET_FLIGHTS synthetic flights: 1.5x the
+# measured peak and 3x the measured time over the baseline's, with floors.
+BUDGETS: Dict[str, Budget] = {
+    "preprocess.load_preprocessed_data": Budget(peak_mib=37.8, time_ratio=60.4),
+    "filters.index": Budget(peak_mib=40.2, time_ratio=7.9),
+    "progressive.preview": Budget(peak_mib=34.7, time_ratio=25.8),
+    "context.overview_metrics": Budget(peak_mib=13.2, time_ratio=3.0),
+    "context.performance_waterfall": Budget(peak_mib=1.0, time_ratio=3.0),
+    "context.airline_distances": Budget(peak_mib=32.1, time_ratio=4.5),
+    "volume.busiest_airports": Budget(peak_mib=4.9, time_ratio=3.0),
+    "volume.airline_snapshot": Budget(peak_mib=3.6, time_ratio=3.0),
+    "volume.day_of_week": Budget(peak_mib=3.1, time_ratio=3.0),
+    "volume.airline_comparison": Budget(peak_mib=1.0, time_ratio=3.0),
+    "volume.state_comparison": Budget(peak_mib=1.0, time_ratio=3.0),
+    "volume.airline_sankey": Budget(peak_mib=1.0, time_ratio=3.1),
+    "volume.route_flows": Budget(peak_mib=16.1, time_ratio=4.5),
+    "delay.delay_map": Budget(peak_mib=13.2, time_ratio=13.1),
+    "delay.period_comparison": Budget(peak_mib=7.0, time_ratio=18.6),
+    "delay.airline_delay_range": Budget(peak_mib=3.7, time_ratio=3.0),
+    "delay.daily_aggregates": Budget(peak_mib=7.3, time_ratio=3.8),
+    "delay.anomalies": Budget(peak_mib=29.7, time_ratio=23.3),
+    "best_airline.airports_lookup": Budget(peak_mib=1.0, time_ratio=3.0),
+    "best_airline.default_route": Budget(peak_mib=3.5, time_ratio=4.6),
+    "best_airline.connectivity_graph": Budget(peak_mib=30.8, time_ratio=10.6),
+    "best_airline.route_leaderboard": Budget(peak_mib=39.2, time_ratio=21.7),
+    "best_airline.flight_history_index": Budget(peak_mib=28.7, time_ratio=8.7),
+    "best_airline.delay_forecast": Budget(peak_mib=48.2, time_ratio=14.4),
+    "best_airline.airport_grid": Budget(peak_mib=1.0, time_ratio=3.0),
+}
+
+Target = Tuple[str, Callable[[], object]]
+
+
+def collect_targets(
+    sources: Sources,
+    n_flights: int = BUDGET_FLIGHTS,
+    seed: int = BUDGET_SEED,
+) -> List[Target]:
+    """Return the loader plus every warm-up builder, bound to synthetic data."""
+
+    # Imported here so ``--help`` stays fast.
+    from app import WARMUP_TASK_FACTORIES
+    from filters import FilterIndex
+
+    df, airports_us = make_synthetic_data(n_flights, seed=seed)
+    # As in the app, the filter index registers the frame's pre-aggregated
+    # cells before any page builder reads them.
+    FilterIndex(df, airports_us)
+    targets: List[Target] = [
+        ("preprocess.load_preprocessed_data", partial(_load_from_sources, *sources)),
+    ]
+    for factory in WARMUP_TASK_FACTORIES:
+        for name, task in factory(df, airports_us):
+            targets.append((name, _uncached(task)))
+    return targets
+
+
+def _load_from_sources(dataset: Path, airlines_url: str, airports_url: str) -> object:
+    """Run ``load_preprocessed_data`` with the remote URLs pointed at local copies."""
+
+    with use_sources(dataset, airlines_url, airports_url):
+        return preprocess.load_preprocessed_data(dataset)
+
+
+def _uncached(task: Callable[[], object]) -> Callable[[], object]:
+    """Bypass ``st.cache_data`` so each run measures the builder body itself."""
+
+    if isinstance(task, partial):
+        func = getattr(task.func, "__wrapped__", task.func)
+        return partial(func, *task.args, **task.keywords)
+    return task
+
+
+def _reference_workload(keys: np.ndarray, values: np.ndarray) -> object:
+    frame = pd.DataFrame({"key": keys, "value": values})
+    return frame.groupby("key")["value"].agg(["mean", "median"]), np.sort(values)
+
+
+def measure_baseline(n_rows: int = BUDGET_FLIGHTS, repeat: int = 5) -> Measurement:
+    """Time the reference workload that every time budget is a multiple of."""
+
+    rng = np.random.default_rng(BUDGET_SEED)
+    keys, values = rng.integers(0, 5000, n_rows), rng.random(n_rows)
+    return measure(BASELINE_NAME, partial(_reference_workload, keys, values), repeat)
+
+
+def measure(name: str, func: Callable[[], object], repeat: int = 3) -> Measurement:
+    """Return ``func``'s traced peak allocation and fastest untraced wall time."""
+
+    _clear_caches()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings = []
+    for _ in range(max(repeat, 1)):
+        # Helpers such as the default-route warm-up call cached builders.
+        _clear_caches()
+        gc.collect()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return Measurement(name, peak / MIB, min(timings))
+
+
+def _clear_caches() -> None:
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def check(
+    measurements: Sequence[Measurement],
+    baseline: Measurement,
+    time_scale: float = TIME_SCALE,
+) -> List[str]:
+    """Return one line per exceeded or missing budget."""
+
+    violations = []
+    for result in measurements:
+        budget = BUDGETS.get(result.name)
+        if budget is None:
+            violations.append(f"{result.name}: no budget declared "
+                              f"(measured {result.peak_mib:.1f} MiB, {result.seconds:.3f}s)")
+            continue
+        if result.peak_mib > budget.peak_mib:
+            violations.append(_diff(result.name, "peak", result.peak_mib, budget.peak_mib, "MiB"))
+        allowed = budget.time_ratio * baseline.seconds * time_scale
+        if result.seconds > allowed:
+            violations.append(_diff(result.name, "time", result.seconds, allowed, "s"))
+    return violations
+
+
+def _diff(name: str, kind: str, measured: float, allowed: float, unit: str) -> str:
+    return (f"{name}: {kind} {measured:.3f}{unit} exceeds budget {allowed:.3f}{unit} "
+            f"(+{(measured / allowed - 1) * 100:.0f}%)")
+
+
+def format_report(
+    measurements: Sequence[Measurement],
+    baseline: Measurement,
+    time_scale: float = TIME_SCALE,
+) -> str:
+    """Return a table of measured values against their budgets."""
+
+    lines = [f"baseline: {baseline.seconds:.3f}s per reference workload",
+             f"{'target':<36} {'peak MiB':>9} {'budget':>8} {'seconds':>8} {'budget':>8}"]
+    for result in measurements:
+        budget = BUDGETS.get(result.name)
+        peak_budget = f"{budget.peak_mib:.1f}" if budget else "-"
+        time_budget = (f"{budget.time_ratio * baseline.seconds * time_scale:.3f}"
+                       if budget else "-")
+        lines.append(f"{result.name:<36} {result.peak_mib:>9.1f} {peak_budget:>8} "
+                     f"{result.seconds:>8.3f} {time_budget:>8}")
+    return "\n".join(lines)
+
+
+def format_budgets(
+    measurements: Sequence[Measurement],
+    baseline: Measurement,
+    peak_headroom: float = 1.5,
+    time_headroom: float = 3.0,
+) -> str:
+    """Return a ``BUDGETS`` literal derived from ``measurements``.
+
+    Small values get a floor so timer and allocator noise cannot fail a run.
+    """
+
+    lines = ["BUDGETS: Dict[str, Budget] = {"]
+    for result in measurements:
+        peak = max(result.peak_mib * peak_headroom, MIN_PEAK_MIB)
+        ratio = max(result.seconds / baseline.seconds * time_headroom, MIN_TIME_RATIO)
+        lines.append(f'    "{result.name}": Budget(peak_mib={peak:.1f}, time_ratio={ratio:.1f}),')
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", default="",
+                        help="Measure only targets whose name contains this text.")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Untraced runs per target; the fastest counts.")
+    parser.add_argument("--time-scale", type=float, default=TIME_SCALE,
+                        help="Multiply every time budget by this factor.")
+    parser.add_argument("--record", action="store_true",
+                        help="Print measured values as a BUDGETS literal and exit 0.")
+    args = parser.parse_args(argv)
+
+    # Builders run outside ``streamlit run``; silence the no-runtime warnings.
+    set_log_level("error")
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    with synthetic_sources(BUDGET_FLIGHTS, BUDGET_SEED) as sources:
+        targets = [(name, func) for name, func in collect_targets(sources)
+                   if args.only in name]
+        baseline = measure_baseline(repeat=max(args.repeat, 5))
+        measurements = [measure(name, func, args.repeat) for name, func in targets]
+    print(format_report(measurements, baseline, args.time_scale))
+    if args.record:
+        print()
+        print(format_budgets(measurements, baseline))
+        return 0
+
+    violations = check(measurements, baseline, args.time_scale)
+    if violations:
+        print(f"\n{len(violations)} budget violation(s):")
+        for line in violations:
+            print(f"  {line}")
+        return 1
+    print("\nAll budgets met.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+"""Integer calendar keys shared by the dashboard pages and the route API.
+
+Plain NumPy on purpose: ``route_api`` imports this without Streamlit.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def week_numbers(dates: pd.Series) -> np.ndarray:
+    """Return Monday-based week numbers, the same buckets as ``to_period("W")``.
+
+    1970-01-01 was a Thursday, hence the three-day shift. Avoids building a
+    Period object per row.
+    """
+
+    days = dates.to_numpy().astype("datetime64[D]").astype("int64")
+    return (days + 3) // 7
@@ -0,0 +1,75 @@
+"""Build a page's charts concurrently and place each one as soon as it is ready.
+
+Builders (aggregation plus figure construction) run on a worker pool; only the
+main script thread writes to Streamlit. Each chart gets a placeholder up front
+so the layout is fixed before any result arrives, and results fill their
+placeholders in completion order.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, List, Sequence, Tuple, Union
+
+import plotly.graph_objects as go
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+MAX_CHART_WORKERS = int(os.environ.get(
+    "DASHBOARD_CHART_WORKERS", min(4, os.cpu_count() or 1)))
+
+ChartResult = Union[go.Figure, str, None]
+ChartTask = Tuple[Callable[[], Any], Callable[[Any], None]]
+
+
+def render_concurrently(tasks: Sequence[ChartTask], max_workers: int = MAX_CHART_WORKERS) -> List[Any]:
+    """Run every ``(build, render)`` pair, rendering results as they complete.
+
+    ``build`` runs on a worker thread and must not call Streamlit elements;
+    ``render`` runs on the calling thread with the builder's result. Returns
+    the builder results in task order.
+    """
+
+    results: List[Any] = [None] * len(tasks)
+    if not tasks:
+        return results
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    pool_options = {}
+    if ctx is not None:
+        # Cached builders look up the session through the thread's context.
+        pool_options = {"initializer": add_script_run_ctx, "initargs": (None, ctx)}
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(tasks))),
+        thread_name_prefix="chart",
+        **pool_options,
+    ) as pool:
+        futures = {pool.submit(build): position
+                   for position, (build, _) in enumerate(tasks)}
+        for future in as_completed(futures):
+            position = futures[future]
+            results[position] = future.result()
+            tasks[position][1](results[position])
+    return results
+
+
+def chart_slot(container: Any = st) -> Callable[[ChartResult], None]:
+    """Reserve a placeholder in ``container`` and return its renderer.
+
+    The renderer draws a figure, shows a string as an info message and leaves
+    the slot empty for ``None``.
+    """
+
+    placeholder = container.empty()
+
+    def render(result: ChartResult) -> None:
+        if result is None:
+            return
+        if isinstance(result, str):
+            placeholder.info(result)
+        else:
+            placeholder.plotly_chart(result, use_container_width=True)
+
+    return render
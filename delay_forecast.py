@@ -0,0 +1,136 @@
+"""Per-route arrival delay forecasts from one batched least-squares fit.
+
+Each route's expected arrival delay is an intercept plus yearly harmonics of
+the flight date, so seasonality differs by route. The normal equations of
+every route are accumulated with ``np.bincount`` and solved together by one
+batched ``np.linalg.solve``, ridge-regularised towards the nationwide
+seasonal curve so thin routes borrow its shape. Each airline's effect on a
+route is the mean of that route's residuals for the airline, shrunk towards
+the airline's nationwide effect. Only the coefficients are kept: a float32
+row per route and an offset per (route, airline) cell, looked up by binary
+search over sorted integer keys.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+FORECAST_WEEKS = 4
+HARMONICS = 2
+ROUTE_SHRINKAGE = 50.0
+AIRLINE_SHRINKAGE = 20.0
+
+
+def _design(days: np.ndarray) -> np.ndarray:
+    """Return an intercept column and ``HARMONICS`` yearly sine/cosine pairs of ``days``."""
+
+    angle = 2 * np.pi * np.asarray(days, dtype=float) / 365.25
+    columns = [np.ones_like(angle)]
+    for harmonic in range(1, HARMONICS + 1):
+        columns += [np.sin(harmonic * angle), np.cos(harmonic * angle)]
+    return np.stack(columns, axis=1)
+
+
+class DelayForecast:
+    """Seasonal route curves plus airline offsets, fitted for every route at once."""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        route_shrinkage: float = ROUTE_SHRINKAGE,
+        airline_shrinkage: float = AIRLINE_SHRINKAGE,
+    ) -> None:
+        origin, self.origins = pd.factorize(df["ORIGIN_AIRPORT"], sort=True)
+        dest, self.dests = pd.factorize(df["DEST_AIRPORT"], sort=True)
+        airline, self.airlines = pd.factorize(df["Airline_Name"], sort=True)
+        delay = df["ARR_DELAY"].to_numpy(dtype=float, na_value=np.nan)
+        days = df["FL_DATE"].to_numpy(dtype="datetime64[D]")
+        valid = (origin >= 0) & (dest >= 0) & ~np.isnan(delay)
+        self.start = (days.max() + 1) if len(days) else np.datetime64("NaT", "D")
+
+        route, self.route_keys = pd.factorize(
+            origin[valid] * len(self.dests) + dest[valid], sort=True)
+        n_routes = len(self.route_keys)
+        x = _design(days[valid].astype(np.int64))
+        y = delay[valid]
+        k = x.shape[1]
+
+        # Every route's normal equations, one bincount per distinct entry.
+        xtx = np.empty((n_routes, k, k))
+        xty = np.empty((n_routes, k))
+        for i in range(k):
+            xty[:, i] = np.bincount(route, weights=x[:, i] * y, minlength=n_routes)
+            for j in range(i, k):
+                xtx[:, i, j] = xtx[:, j, i] = np.bincount(
+                    route, weights=x[:, i] * x[:, j], minlength=n_routes)
+
+        nationwide = np.linalg.lstsq(xtx.sum(axis=0), xty.sum(axis=0), rcond=None)[0]
+        ridge = route_shrinkage * np.eye(k)
+        coefficients = np.linalg.solve(
+            xtx + ridge, (xty + route_shrinkage * nationwide)[..., None])[..., 0]
+        self.coefficients = coefficients.astype(np.float32)
+
+        residual = y.copy()
+        for i in range(k):
+            residual -= x[:, i] * coefficients[route, i]
+        slot = airline[valid] + 1  # slot 0: flights with no known airline
+        n_slots = len(self.airlines) + 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            effects = (np.bincount(slot, weights=residual, minlength=n_slots)
+                       / np.bincount(slot, minlength=n_slots))
+        effects = np.nan_to_num(effects)
+        effects[0] = 0.0
+        self.airline_effects = effects.astype(np.float32)
+
+        cell, self.cell_keys = pd.factorize(route * n_slots + slot, sort=True)
+        cell_slot = self.cell_keys % n_slots
+        self.cell_offsets = (
+            (np.bincount(cell, weights=residual, minlength=len(self.cell_keys))
+             + airline_shrinkage * effects[cell_slot])
+            / (np.bincount(cell, minlength=len(self.cell_keys)) + airline_shrinkage)
+        ).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.route_keys)
+
+    def week_starts(self, weeks: int = FORECAST_WEEKS) -> np.ndarray:
+        """Return the first day of each forecast week, starting the day after the data ends."""
+
+        return self.start + 7 * np.arange(weeks)
+
+    def forecast(
+        self,
+        origin: str,
+        destination: str,
+        airlines: Sequence[str],
+        weeks: int = FORECAST_WEEKS,
+    ) -> np.ndarray | None:
+        """Return the expected arrival delay of each airline on the route, one column per week.
+
+        Returns ``None`` for a route with no flights. Airlines never seen on
+        the route get their nationwide effect.
+        """
+
+        origin_pos = self.origins.get_indexer([origin])[0]
+        dest_pos = self.dests.get_indexer([destination])[0]
+        if origin_pos < 0 or dest_pos < 0:
+            return None
+        route_key = origin_pos * len(self.dests) + dest_pos
+        route = int(np.searchsorted(self.route_keys, route_key))
+        if route == len(self.route_keys) or self.route_keys[route] != route_key:
+            return None
+
+        days = self.week_starts(weeks)[:, None] + np.arange(7)
+        curve = _design(days.ravel().astype(np.int64)).reshape(weeks, 7, -1).mean(axis=1)
+        seasonal = curve @ self.coefficients[route].astype(float)
+
+        n_slots = len(self.airlines) + 1
+        slots = self.airlines.get_indexer(pd.Index(airlines, dtype=object)) + 1
+        keys = route * n_slots + slots
+        found = np.minimum(np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1)
+        offsets = np.where(self.cell_keys[found] == keys,
+                           self.cell_offsets[found], self.airline_effects[slots])
+        return seasonal[None, :] + offsets[:, None]
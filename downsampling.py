@@ -0,0 +1,68 @@
+"""Visual-fidelity downsampling for long time series.
+
+Both helpers return the *indices* of the points to keep, so callers can take
+any aligned columns (dates, values, hover data) with the same selection. The
+first and last points are always kept.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets selection of ``threshold`` points.
+
+    Keeps the point in each bucket that forms the largest triangle with the
+    previously kept point and the average of the next bucket, which preserves
+    the visual shape of the line. NaN values in ``y`` are skipped.
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if threshold >= n or threshold < 3:
+        return valid
+
+    xv, yv = x[valid], y[valid]
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = xv[stop:next_stop].mean() if next_stop > stop else xv[-1]
+        avg_y = yv[stop:next_stop].mean() if next_stop > stop else yv[-1]
+        area = np.abs(
+            (xv[previous] - avg_x) * (yv[start:stop] - yv[previous])
+            - (xv[previous] - xv[start:stop]) * (avg_y - yv[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    selected[-1] = n - 1
+    return valid[selected]
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Keep the minimum and maximum of each of ``n_buckets`` equal-width buckets.
+
+    Cheaper than LTTB and fully vectorized; spikes are never dropped, which
+    suits delay series where the outliers are the interesting part.
+    """
+
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n <= 2 * n_buckets or n_buckets < 1:
+        return valid
+
+    buckets = (np.arange(n) * n_buckets) // n
+    values = y[valid]
+    # Within each bucket order by value: the first row is the min, the last the max.
+    order = np.lexsort((values, buckets))
+    starts = np.flatnonzero(np.r_[True, buckets[order][1:] != buckets[order][:-1]])
+    stops = np.r_[starts[1:], n] - 1
+    keep = np.unique(np.concatenate(([0, n - 1], order[starts], order[stops])))
+    return valid[keep]
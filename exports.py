@@ -0,0 +1,108 @@
+"""Chunked CSV and Parquet exports behind each page's download button.
+
+Nothing is encoded while a page renders: the download button gets a callable
+that Streamlit runs only when it is clicked. The export then builds the
+dataset, walks it ``EXPORT_CHUNK_ROWS`` rows at a time and writes each chunk
+to a spooled temporary file (in memory up to ``EXPORT_SPOOL_BYTES``, on disk
+beyond that). Working memory is therefore one chunk, rather than a full CSV
+string plus its encoded copy; Streamlit then reads the finished file once to
+serve it.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict
+
+import pandas as pd
+import streamlit as st
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow ships with Streamlit
+    pa = pq = None
+
+EXPORT_CHUNK_ROWS = int(os.environ.get("DASHBOARD_EXPORT_CHUNK_ROWS", "100000"))
+EXPORT_SPOOL_BYTES = 32 * 1024 * 1024
+
+
+def write_csv(frame: pd.DataFrame, sink: BinaryIO, chunk_rows: int = EXPORT_CHUNK_ROWS) -> None:
+    """Write ``frame`` to ``sink`` as UTF-8 CSV, one chunk of rows at a time."""
+
+    text = io.TextIOWrapper(sink, encoding="utf-8", newline="")
+    try:
+        for start in range(0, max(len(frame), 1), chunk_rows):
+            frame.iloc[start:start + chunk_rows].to_csv(text, header=start == 0, index=False)
+    finally:
+        text.flush()
+        text.detach()
+
+
+def write_parquet(frame: pd.DataFrame, sink: BinaryIO, chunk_rows: int = EXPORT_CHUNK_ROWS) -> None:
+    """Write ``frame`` to ``sink`` as Parquet, one row group per chunk."""
+
+    schema = pa.Schema.from_pandas(frame.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(sink, schema) as writer:
+        for start in range(0, len(frame), chunk_rows):
+            writer.write_table(pa.Table.from_pandas(
+                frame.iloc[start:start + chunk_rows], schema=schema, preserve_index=False))
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    extension: str
+    mime: str
+    write: Callable[[pd.DataFrame, BinaryIO, int], None]
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {"CSV": ExportFormat("csv", "text/csv", write_csv)}
+if pq is not None:
+    EXPORT_FORMATS["Parquet"] = ExportFormat(
+        "parquet", "application/vnd.apache.parquet", write_parquet)
+
+
+def export_file(
+    build: Callable[[], pd.DataFrame | None],
+    export: ExportFormat,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> BinaryIO:
+    """Build a dataset and return it encoded in a rewound temporary file."""
+
+    frame = build()
+    if frame is None:
+        frame = pd.DataFrame()
+    sink = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    export.write(frame, sink, chunk_rows)
+    sink.seek(0)
+    return sink
+
+
+@st.fragment
+def render_downloads(datasets: Dict[str, Callable[[], pd.DataFrame | None]], key: str) -> None:
+    """Offer a page's datasets for download in every available format.
+
+    ``datasets`` maps a label to a zero-argument builder; only the chosen one
+    runs, and only when the button is clicked. Runs as a fragment, so picking
+    a dataset or format does not rerun the page.
+    """
+
+    with st.expander("Download data"):
+        dataset_col, format_col = st.columns((2, 1))
+        name = dataset_col.selectbox("Dataset", list(datasets), key=f"{key}_download_dataset")
+        fmt = format_col.radio(
+            "Format", list(EXPORT_FORMATS), horizontal=True, key=f"{key}_download_format")
+        export = EXPORT_FORMATS[fmt]
+        build = datasets[name]
+        st.download_button(
+            f"Download {name.lower()} ({fmt})",
+            data=lambda: export_file(build, export),
+            file_name=f"{key}_{re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')}.{export.extension}",
+            mime=export.mime,
+            on_click="ignore",
+            key=f"{key}_download_button",
+        )
@@ -0,0 +1,184 @@
+"""On-disk cache of finished Plotly figures, stored as their serialized JSON.
+
+``st.cache_data`` keeps builder results in memory but hands back a pickled
+copy on every rerun, and unpickling a ``go.Figure`` re-validates every trace.
+``cached_figure`` instead stores the figure's final JSON on disk, keyed by a
+fingerprint of the input data, the builder name, its parameters, a digest of
+the source file that defines the builder and ``THEME_VERSION``. A hit is a
+file read plus ``json.loads``; neither the aggregation nor the figure
+construction runs. Editing a page's visuals module therefore retires that
+page's cached figures; a change elsewhere that alters figures (a shared
+helper, the theme) needs a ``THEME_VERSION`` bump.
+
+Entries are evicted least-recently-used first once the directory grows past
+``FIGURE_CACHE_MAX_BYTES``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from concurrent_render import ChartResult
+from frame_memo import frame_fingerprint
+from metrics import FIGURE_CACHE_REQUESTS
+from theme import THEME_VERSION
+
+FIGURE_CACHE_ENABLED = os.environ.get("DASHBOARD_FIGURE_CACHE", "1") != "0"
+FIGURE_CACHE_DIR = Path(os.environ.get("DASHBOARD_FIGURE_CACHE_DIR", ".figure_cache"))
+FIGURE_CACHE_MAX_BYTES = int(
+    float(os.environ.get("DASHBOARD_FIGURE_CACHE_MB", "256")) * 1024 * 1024)
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SerializedFigure(go.Figure):
+    """A figure restored from cached JSON.
+
+    Streamlit reads figures through ``to_dict``; returning the stored dict
+    skips rebuilding and re-validating every trace.
+    """
+
+    def __init__(self, spec: Dict[str, Any]) -> None:
+        super().__init__()
+        self._spec = spec
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._spec
+
+    def to_plotly_json(self) -> Dict[str, Any]:
+        return self._spec
+
+
+class FigureCache:
+    """Directory of ``<key>.json`` files with size-based LRU eviction."""
+
+    def __init__(self, directory: str | Path = FIGURE_CACHE_DIR,
+                 max_bytes: int = FIGURE_CACHE_MAX_BYTES) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(fingerprint: str, builder: str, params: Dict[str, Any], code_version: str = "") -> str:
+        payload = json.dumps(
+            [THEME_VERSION, code_version, fingerprint, builder, sorted(params.items())],
+            default=repr,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> SerializedFigure | None:
+        path = self.directory / f"{key}.json"
+        try:
+            spec = json.loads(path.read_bytes())
+            # Refresh the mtime so eviction treats this entry as recently used.
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return SerializedFigure(spec)
+
+    def put(self, key: str, figure: go.Figure) -> None:
+        data = figure.to_json().encode()
+        if len(data) > self.max_bytes:
+            return
+        path = self.directory / f"{key}.json"
+        temp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp.write_bytes(data)
+            os.replace(temp, path)
+        except OSError as exc:
+            LOGGER.warning("Could not write figure cache entry %s: %r", path, exc)
+            return
+        self._evict()
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            for path in self.directory.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+
+FIGURE_CACHE = FigureCache()
+
+
+def dataset_fingerprint(*frames: pd.DataFrame) -> str:
+    """Return a content fingerprint for the frames a page renders from.
+
+    Combines each frame's ``frame_fingerprint``, which is computed once per
+    frame object, so repeat renders of the same frames cost no row scan.
+    """
+
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(frame_fingerprint(frame).encode())
+    return digest.hexdigest()
+
+
+def code_version(build: Callable) -> str:
+    """Return a digest of the source file that defines ``build``, or "" if unknown."""
+
+    while isinstance(build, partial):
+        build = build.func
+    code = getattr(build, "__code__", None)
+    if code is None:
+        return ""
+    try:
+        # The mtime in the key picks up edits made while the server runs.
+        return _source_digest(code.co_filename, os.stat(code.co_filename).st_mtime_ns)
+    except OSError:
+        return ""
+
+
+@lru_cache(maxsize=256)
+def _source_digest(path: str, mtime_ns: int) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def cached_figure(
+    fingerprint: str,
+    builder: str,
+    build: Callable[[], ChartResult],
+    **params: Any,
+) -> ChartResult:
+    """Return the cached figure for these inputs, building and storing it on a miss.
+
+    ``params`` must include every argument besides the data that changes the
+    figure. Messages and empty results are returned as-is and not cached.
+    """
+
+    if not FIGURE_CACHE_ENABLED:
+        return build()
+    key = FIGURE_CACHE.key(fingerprint, builder, params, code_version(build))
+    cached = FIGURE_CACHE.get(key)
+    if cached is not None:
+        FIGURE_CACHE_REQUESTS.inc(builder=builder, result="hit")
+        return cached
+    FIGURE_CACHE_REQUESTS.inc(builder=builder, result="miss")
+    result = build()
+    if isinstance(result, go.Figure):
+        FIGURE_CACHE.put(key, result)
+    return result
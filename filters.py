@@ -0,0 +1,307 @@
+"""Global sidebar filters (date range, airlines, origin states) for every page.
+
+Filtering the raw frame with string comparisons on every widget change is too
+slow at tens of millions of flights, so ``FilterIndex`` keeps a compact,
+date-ordered index built once per dataset: day numbers sorted ascending plus
+small integer codes for the airline and the origin airport's state. A filter
+change then costs two binary searches for the date range, one table lookup
+per row of that range for airlines/states, and a single ``take``.
+
+The index also keeps ``FlightCells``: flight counts and delay totals per
+(day, airline, origin state), the same three keys the filters select on, so
+any selection is exact over the cells too. Every frame ``apply`` returns is
+registered with its selected cells, and ``flight_cells`` hands them to the
+page builders that only need counts and totals, so a filter change
+re-aggregates a few hundred thousand cells instead of re-scanning the rows.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Callable, List, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from frame_memo import FRAME_HASH_FUNCS, FrameMemo
+
+# Filtered frames kept per selection by the app; each is a copy of its rows.
+FILTERED_FRAMES_KEPT = 4
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """A hashable selection; empty tuples mean "no restriction"."""
+
+    start: dt.date | None = None
+    end: dt.date | None = None
+    airlines: Tuple[str, ...] = ()
+    states: Tuple[str, ...] = ()
+
+
+class FlightCells:
+    """Flights and delay totals per (day, airline, origin state), in date order.
+
+    Delay sums skip missing values and come with the count of values summed,
+    so means over any group of cells are exact.
+    """
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        airline_codes: np.ndarray,
+        state_codes: np.ndarray,
+        airlines: pd.Index,
+        states: pd.Index,
+        dep_delay: np.ndarray,
+        arr_delay: np.ndarray,
+    ) -> None:
+        self.airlines = airlines
+        self.states = states
+        n_airlines, n_states = len(airlines) + 1, len(states) + 1
+        first = dates.min() if len(dates) else np.datetime64(0, "D")
+        day = (dates - first).astype(np.int64)
+        # Dense keys in (day, airline, state) order: the span of days times the
+        # airline and state counts, not the number of flights, bounds their range.
+        key = (day * n_airlines + airline_codes) * n_states + state_codes
+        size = (int(day.max()) + 1 if len(day) else 0) * n_airlines * n_states
+        flights = np.bincount(key, minlength=size)
+        present = np.flatnonzero(flights)
+
+        def total(weights: np.ndarray) -> np.ndarray:
+            return np.bincount(key, weights=weights, minlength=size)[present]
+
+        dep_known, arr_known = ~np.isnan(dep_delay), ~np.isnan(arr_delay)
+        self.flights = flights[present]
+        self.dep_delay_sum = total(np.where(dep_known, dep_delay, 0.0))
+        self.dep_delay_count = total(dep_known).astype(np.int64)
+        self.arr_delay_sum = total(np.where(arr_known, arr_delay, 0.0))
+        self.arr_delay_count = total(arr_known).astype(np.int64)
+        self.dep_delayed = total(dep_delay > 0).astype(np.int64)
+        self.dep_on_time = total(dep_delay <= 0).astype(np.int64)
+
+        self.days = first + present // (n_airlines * n_states)
+        self.airline_codes = (present // n_states % n_airlines).astype(np.int16)
+        self.state_codes = (present % n_states).astype(np.int16)
+
+    def __len__(self) -> int:
+        return len(self.flights)
+
+    def frame(self, selection: slice | np.ndarray = slice(None)) -> pd.DataFrame:
+        """Return the selected cells as a frame; unknown airlines and states are NaN."""
+
+        return pd.DataFrame({
+            "FL_DATE": self.days[selection].astype("datetime64[s]"),
+            "Airline_Name": pd.Categorical.from_codes(
+                self.airline_codes[selection] - 1, categories=self.airlines),
+            "State": pd.Categorical.from_codes(
+                self.state_codes[selection] - 1, categories=self.states),
+            "Flights": self.flights[selection],
+            "DEP_DELAY_SUM": self.dep_delay_sum[selection],
+            "DEP_DELAY_COUNT": self.dep_delay_count[selection],
+            "ARR_DELAY_SUM": self.arr_delay_sum[selection],
+            "ARR_DELAY_COUNT": self.arr_delay_count[selection],
+            "DEP_DELAYED": self.dep_delayed[selection],
+            "DEP_ON_TIME": self.dep_on_time[selection],
+        })
+
+
+FlightCodes = Tuple[np.ndarray, np.ndarray, pd.Index, np.ndarray, pd.Index]
+
+
+def _flight_codes(df: pd.DataFrame, airports_us: pd.DataFrame | None) -> FlightCodes:
+    """Return day numbers plus airline and origin-state codes shifted so 0 is "unknown"."""
+
+    dates = pd.to_datetime(df["FL_DATE"]).to_numpy().astype("datetime64[D]")
+    airline_codes, airlines = pd.factorize(df["Airline_Name"], sort=True)
+    origin_codes, origins = pd.factorize(df["ORIGIN_AIRPORT"])
+    airport_states = (
+        airports_us.drop_duplicates("IATA").set_index("IATA")["State"]
+        if airports_us is not None and not airports_us.empty else pd.Series(dtype=object)
+    )
+    state_codes, states = pd.factorize(
+        airport_states.reindex(origins), sort=True)
+    # Shift by one so "unknown" (-1) maps to slot 0 of the lookup tables.
+    row_states = np.append(state_codes, -1)[origin_codes] + 1
+    return (dates, (airline_codes + 1).astype(np.int16), pd.Index(airlines.astype(str)),
+            row_states.astype(np.int16), pd.Index(states.astype(str)))
+
+
+def _flight_cells(df: pd.DataFrame, codes: FlightCodes) -> FlightCells:
+    dates, airline_codes, airlines, state_codes, states = codes
+    return FlightCells(
+        dates, airline_codes, state_codes, airlines, states,
+        df["DEP_DELAY"].to_numpy(dtype=float, na_value=np.nan),
+        df["ARR_DELAY"].to_numpy(dtype=float, na_value=np.nan),
+    )
+
+
+class FilterIndex:
+    """Integer-coded, date-ordered view of the flight frame used for filtering."""
+
+    def __init__(self, df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
+        codes = _flight_codes(df, airports_us)
+        dates, airline_codes, self.airlines, state_codes, self.states = codes
+        # The loader sorts by date; fall back to an explicit order otherwise.
+        self._order = None if _is_sorted(dates) else np.argsort(dates, kind="stable")
+
+        self._days = self._sorted(dates)
+        self._airline_codes = self._sorted(airline_codes)
+        self._state_codes = self._sorted(state_codes)
+        self._select = lru_cache(maxsize=16)(self._compute_selection)
+
+        self.cells = _flight_cells(df, codes)
+        self._select_cells = lru_cache(maxsize=16)(self._compute_cell_selection)
+        _FRAME_CELLS.set(df, self.cells.frame())
+
+    @property
+    def date_bounds(self) -> Tuple[dt.date, dt.date] | None:
+        if not len(self._days):
+            return None
+        return (self._days[0].item(), self._days[-1].item())
+
+    def is_default(self, spec: FilterSpec) -> bool:
+        """Return True when ``spec`` keeps every row."""
+
+        bounds = self.date_bounds
+        full_range = bounds is None or (
+            (spec.start is None or spec.start <= bounds[0])
+            and (spec.end is None or spec.end >= bounds[1])
+        )
+        return full_range and not spec.airlines and not spec.states
+
+    def apply(self, df: pd.DataFrame, spec: FilterSpec) -> pd.DataFrame:
+        """Return the rows of ``df`` matching ``spec`` (``df`` itself if all match).
+
+        The result is registered with its cells for ``flight_cells``.
+        """
+
+        if self.is_default(spec):
+            return df
+        selection = self._select(spec)
+        if isinstance(selection, slice):
+            filtered = df.iloc[selection]
+        else:
+            filtered = df.take(selection)
+        _FRAME_CELLS.set(filtered, self.cells.frame(self._select_cells(spec)))
+        return filtered
+
+    def _compute_selection(self, spec: FilterSpec) -> slice | np.ndarray:
+        lo, hi = _date_range(self._days, spec)
+        mask = self._code_mask(self._airline_codes[lo:hi], self._state_codes[lo:hi], spec)
+        if mask is None:
+            if self._order is None:
+                return slice(lo, hi)
+            return self._order[lo:hi]
+        positions = np.flatnonzero(mask) + lo
+        return positions if self._order is None else self._order[positions]
+
+    def _compute_cell_selection(self, spec: FilterSpec) -> slice | np.ndarray:
+        cells = self.cells
+        lo, hi = _date_range(cells.days, spec)
+        mask = self._code_mask(cells.airline_codes[lo:hi], cells.state_codes[lo:hi], spec)
+        return slice(lo, hi) if mask is None else np.flatnonzero(mask) + lo
+
+    def _code_mask(
+        self,
+        airline_codes: np.ndarray,
+        state_codes: np.ndarray,
+        spec: FilterSpec,
+    ) -> np.ndarray | None:
+        """Return the airline/state mask for ``spec``, or ``None`` when it keeps every row."""
+
+        if not spec.airlines and not spec.states:
+            return None
+        mask = np.ones(len(airline_codes), dtype=bool)
+        if spec.airlines:
+            mask &= _lookup_table(self.airlines, spec.airlines)[airline_codes]
+        if spec.states:
+            mask &= _lookup_table(self.states, spec.states)[state_codes]
+        return mask
+
+    def _sorted(self, values: np.ndarray) -> np.ndarray:
+        return values if self._order is None else values[self._order]
+
+
+def _date_range(days: np.ndarray, spec: FilterSpec) -> Tuple[int, int]:
+    """Return the positions of ``spec``'s date range in the sorted ``days``."""
+
+    lo = 0 if spec.start is None else int(
+        np.searchsorted(days, np.datetime64(spec.start, "D"), side="left"))
+    hi = len(days) if spec.end is None else int(
+        np.searchsorted(days, np.datetime64(spec.end, "D"), side="right"))
+    return lo, hi
+
+
+def _is_sorted(values: np.ndarray) -> bool:
+    return bool(len(values) < 2 or (values[1:] >= values[:-1]).all())
+
+
+def _lookup_table(categories: pd.Index, selected: Tuple[str, ...]) -> np.ndarray:
+    """Boolean table indexed by ``code + 1`` (slot 0 is "unknown")."""
+
+    table = np.zeros(len(categories) + 1, dtype=bool)
+    table[categories.get_indexer(list(selected)) + 1] = True
+    table[0] = False
+    return table
+
+
+# Cells of every frame a ``FilterIndex`` has produced.
+_FRAME_CELLS: FrameMemo[pd.DataFrame] = FrameMemo()
+
+
+def flight_cells(df: pd.DataFrame, airports_us: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Return ``df``'s flights and delay totals per (day, airline, origin state).
+
+    Frames the filter index has seen (the loaded frame and every filtered
+    frame) are answered from their registered cells without reading a row;
+    any other frame is aggregated here, with origin states from
+    ``airports_us`` when given.
+    """
+
+    cells = _FRAME_CELLS.get(df)
+    if cells is not None:
+        return cells
+    return _flight_cells(df, _flight_codes(df, airports_us)).frame()
+
+
+@st.cache_resource(show_spinner="Indexing flights for filtering...", hash_funcs=FRAME_HASH_FUNCS)
+def get_filter_index(df: pd.DataFrame, airports_us: pd.DataFrame) -> FilterIndex:
+    """Build the filter index once per dataset and share it across sessions."""
+
+    return FilterIndex(df, airports_us)
+
+
+def warmup_tasks(df: pd.DataFrame, airports_us: pd.DataFrame) -> List[Tuple[str, Callable[[], object]]]:
+    """Return the filter index build so the warm-up can run it ahead of time."""
+
+    return [("filters.index", partial(get_filter_index, df, airports_us))]
+
+
+def render_sidebar_filters(index: FilterIndex) -> FilterSpec:
+    """Draw the global filter widgets in the sidebar and return the selection."""
+
+    st.sidebar.markdown("### Filters")
+    start = end = None
+    bounds = index.date_bounds
+    if bounds is not None:
+        selected = st.sidebar.date_input(
+            "Date range",
+            value=bounds,
+            min_value=bounds[0],
+            max_value=bounds[1],
+            key="filter_dates",
+        )
+        # While the user is picking, the widget briefly holds a single date.
+        if isinstance(selected, (tuple, list)) and len(selected) == 2:
+            start, end = selected
+    airlines = st.sidebar.multiselect(
+        "Airlines", list(index.airlines), key="filter_airlines",
+        placeholder="All airlines")
+    states = st.sidebar.multiselect(
+        "Origin states", list(index.states), key="filter_states",
+        placeholder="All states")
+    return FilterSpec(start, end, tuple(sorted(airlines)), tuple(sorted(states)))
@@ -0,0 +1,127 @@
+"""Flight-number history index for "how late does AA 1234 usually run?".
+
+Flights are sorted once on (AIRLINE_ID, FLIGHT_NUM, FL_DATE) and every
+flight number gets an offset range into the sorted columns, so a lookup is a
+binary search over the distinct flight numbers plus a slice: its history is
+already in date order and its statistics come from the slice alone, without
+scanning the flight frame.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+
+@dataclass(frozen=True)
+class FlightHistory:
+    """One flight number's arrival record over the indexed period."""
+
+    airline: str
+    flight_num: int
+    history: pd.DataFrame
+    avg_delay: float
+    on_time_rate: float
+    weekdays: pd.DataFrame
+
+
+def _flight_keys(airline_id: np.ndarray, flight_num: np.ndarray) -> np.ndarray:
+    """Pack airline ids and flight numbers into one sortable int64 key."""
+
+    return (airline_id.astype(np.int64) << 32) | flight_num.astype(np.int64)
+
+
+class FlightHistoryIndex:
+    """Flights sorted by airline, flight number and date, with per-flight offsets."""
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        airline_id = df["AIRLINE_ID"].to_numpy(dtype=np.int64)
+        flight_num = df["FLIGHT_NUM"].to_numpy(dtype=np.int64)
+        dates = df["FL_DATE"].to_numpy(dtype="datetime64[D]")
+        keys = _flight_keys(airline_id, flight_num)
+        order = np.lexsort((dates, keys))
+
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.diff(sorted_keys, prepend=sorted_keys[:1] - 1))
+        self.keys = sorted_keys[starts]
+        self.offsets = np.append(starts, len(sorted_keys))
+
+        self.dates = dates[order]
+        self.dep_delay = df["DEP_DELAY"].to_numpy(dtype=float, na_value=np.nan)[order]
+        self.arr_delay = df["ARR_DELAY"].to_numpy(dtype=float, na_value=np.nan)[order]
+        origin, self.origins = pd.factorize(df["ORIGIN_AIRPORT"])
+        dest, self.dests = pd.factorize(df["DEST_AIRPORT"])
+        self.origin = origin[order]
+        self.dest = dest[order]
+
+        # Every flight of an airline carries its name; read it off the
+        # airline's first row in sorted order.
+        airline_rows = order[starts[np.diff(self.keys >> 32, prepend=-1) != 0]]
+        self.airline_names: Dict[int, str] = {
+            int(airline): name
+            for airline, name in zip(airline_id[airline_rows], df["Airline_Name"].iloc[airline_rows])
+            if isinstance(name, str)
+        }
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def busiest_flight(self, airline_id: int) -> int | None:
+        """Return ``airline_id``'s flight number with the most flights, if it has any."""
+
+        lo, hi = np.searchsorted(self.keys, _flight_keys(np.array([airline_id, airline_id + 1]),
+                                                         np.zeros(2, dtype=np.int64)))
+        if lo == hi:
+            return None
+        counts = np.diff(self.offsets[lo:hi + 1])
+        return int(self.keys[lo + int(np.argmax(counts))] & 0xFFFFFFFF)
+
+    def lookup(self, airline_id: int, flight_num: int) -> FlightHistory | None:
+        """Return the history of ``flight_num`` operated by ``airline_id``, or ``None``."""
+
+        key = _flight_keys(np.array([airline_id]), np.array([flight_num]))[0]
+        position = int(np.searchsorted(self.keys, key))
+        if position == len(self.keys) or self.keys[position] != key:
+            return None
+        rows = slice(self.offsets[position], self.offsets[position + 1])
+
+        dates = self.dates[rows]
+        arr_delay = self.arr_delay[rows]
+        weekday = (dates.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+        timed = ~np.isnan(arr_delay)
+        on_time = timed & (arr_delay <= 0)
+        history = pd.DataFrame({
+            "Date": dates,
+            "Weekday": np.asarray(WEEKDAYS, dtype=object)[weekday],
+            "Route": [f"{self.origins[origin]} → {self.dests[dest]}"
+                      for origin, dest in zip(self.origin[rows], self.dest[rows])],
+            "Departure Delay (min)": self.dep_delay[rows],
+            "Arrival Delay (min)": arr_delay,
+        })
+
+        flights = np.bincount(weekday, minlength=7)
+        timed_by_day = np.bincount(weekday, weights=timed, minlength=7)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weekdays = pd.DataFrame({
+                "Weekday": WEEKDAYS,
+                "Flights": flights,
+                "Avg Arrival Delay (min)": (np.bincount(
+                    weekday, weights=np.where(timed, arr_delay, 0.0), minlength=7)
+                    / timed_by_day).round(1),
+                "On-Time %": (np.bincount(weekday, weights=on_time, minlength=7)
+                              / timed_by_day * 100).round(1),
+            })
+        n_timed = int(timed.sum())
+        return FlightHistory(
+            airline=self.airline_names.get(airline_id, str(airline_id)),
+            flight_num=flight_num,
+            history=history,
+            avg_delay=float(arr_delay[timed].mean()) if n_timed else float("nan"),
+            on_time_rate=float(on_time.sum() / n_timed * 100) if n_timed else float("nan"),
+            weekdays=weekdays,
+        )
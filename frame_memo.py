@@ -0,0 +1,117 @@
+"""Values derived from a flight frame, remembered for as long as the frame lives.
+
+The app hands every rerun the same frame objects: ``get_data`` shares the
+loaded frames and ``get_filtered_data`` keeps one frame per filter selection,
+and nothing modifies them. Anything computed from a frame's contents can so
+be keyed by the frame's identity and computed once, instead of once per
+rerun. ``FrameMemo`` holds such values and drops each one when its frame is
+garbage collected, so a recycled ``id`` can never return a stale value.
+
+``frame_fingerprint`` is the memoized content fingerprint that keys the
+on-disk figure cache and, through ``FRAME_HASH_FUNCS``, Streamlit caches
+that take frames: without it Streamlit samples and hashes every frame
+argument on every call.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import weakref
+from typing import Callable, Dict, Generic, Tuple, TypeVar
+
+import numpy as np
+import pandas as pd
+
+FINGERPRINT_SAMPLE_ROWS = 10_000
+
+T = TypeVar("T")
+
+
+class FrameMemo(Generic[T]):
+    """Thread-safe map from live DataFrame objects to values derived from them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[weakref.ref, T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, frame: pd.DataFrame) -> T | None:
+        with self._lock:
+            entry = self._entries.get(id(frame))
+        if entry is not None and entry[0]() is frame:
+            return entry[1]
+        return None
+
+    def set(self, frame: pd.DataFrame, value: T) -> None:
+        key = id(frame)
+
+        def forget(ref: weakref.ref) -> None:
+            with self._lock:
+                if key in self._entries and self._entries[key][0] is ref:
+                    del self._entries[key]
+
+        with self._lock:
+            self._entries[key] = (weakref.ref(frame, forget), value)
+
+    def get_or_compute(self, frame: pd.DataFrame, compute: Callable[[pd.DataFrame], T]) -> T:
+        """Return the value for ``frame``, computing and remembering it on a miss."""
+
+        value = self.get(frame)
+        if value is None:
+            value = compute(frame)
+            self.set(frame, value)
+        return value
+
+
+_FINGERPRINTS: FrameMemo[str] = FrameMemo()
+
+
+def frame_fingerprint(frame: pd.DataFrame) -> str:
+    """Return a content fingerprint of ``frame``, computed once per frame object.
+
+    Covers shape, column names and dtypes, a checksum of every numeric,
+    datetime and categorical column over all rows, and a full hash of an
+    evenly spaced sample of up to ``FINGERPRINT_SAMPLE_ROWS`` rows.
+    """
+
+    return _FINGERPRINTS.get_or_compute(frame, _compute_fingerprint)
+
+
+def _compute_fingerprint(frame: pd.DataFrame) -> str:
+    digest = hashlib.sha256()
+    digest.update(repr((frame.shape, list(frame.columns),
+                        [str(dtype) for dtype in frame.dtypes])).encode())
+    for column in frame.columns:
+        digest.update(_column_checksum(frame[column]))
+    sample = frame
+    if len(frame) > FINGERPRINT_SAMPLE_ROWS:
+        sample = frame.iloc[
+            np.linspace(0, len(frame) - 1, FINGERPRINT_SAMPLE_ROWS).astype(int)]
+    digest.update(pd.util.hash_pandas_object(sample, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _column_checksum(column: pd.Series) -> bytes:
+    """Return an order-insensitive checksum of a column's raw values.
+
+    Floats and datetimes are summed as their integer bit patterns, which is
+    cheap and needs no NaN handling; other object/string columns rely on the
+    row sample.
+    """
+
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        values = column.cat.codes.to_numpy()
+    elif isinstance(column.dtype, np.dtype) and column.dtype.kind in "biufmM":
+        values = column.to_numpy()
+        if values.dtype.kind in "fmM":
+            values = values.view(f"i{values.dtype.itemsize}")
+    else:
+        return b""
+    return np.array([values.sum(dtype=np.int64)]).tobytes()
+
+
+# ``hash_funcs`` for ``st.cache_data``/``st.cache_resource`` that take frames.
+FRAME_HASH_FUNCS = {pd.DataFrame: frame_fingerprint}
@@ -0,0 +1,249 @@
+"""Concurrent session load test for the dashboard, fully offline.
+
+Each simulated user is a Streamlit ``AppTest`` session driving ``app.py``: it
+loads the app, then repeatedly switches pages through ``page_selector`` and,
+on the Best Airline Suggester, changes the route through
+``best_airline_origin`` and ``best_airline_destination``. All sessions run as
+threads in this process and share its caches, just as sessions do inside one
+``streamlit run`` server, so rerun latency reflects contention for the same
+interpreter and the same cached data.
+
+The app loads a synthetic dataset written to a temporary directory, with the
+airline and airport references served from localhost; no network is needed.
+
+    python loadtest.py --sessions 1,4,8 --actions 20
+
+Reports p50/p95/p99 rerun latency (overall and per action), reruns per second
+and process RSS for each concurrency level.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from metrics import rss_bytes
+
+APP_PATH = str(Path(__file__).resolve().parent / "app.py")
+BEST_AIRLINE_PAGE = "Best Airline Suggester"
+# AppTest is not fully thread-safe: it resets a class-level pages flag on every
+# run, so a concurrent rerun occasionally executes with a different page hash
+# and loses its widget state, and now and then ``run()`` itself raises. Lost
+# inputs are reported as dropped and harness exceptions separately from app
+# exceptions; either way the session carries on from the page it is on. Only
+# exceptions raised by the app fail the run.
+
+
+@dataclass
+class SessionResult:
+    """Rerun latencies (seconds) recorded by one simulated user, per action."""
+
+    latencies: Dict[str, List[float]] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+    harness_errors: List[str] = field(default_factory=list)
+    dropped_inputs: int = 0
+
+    def record(self, action: str, seconds: float) -> None:
+        self.latencies.setdefault(action, []).append(seconds)
+
+
+class RSSSampler:
+    """Samples this process's resident set size in a background thread."""
+
+    def __init__(self, interval: float = 0.1) -> None:
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def __enter__(self) -> RSSSampler:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+
+def run_session(session_id: int, actions: int, think_time: float, timeout: float) -> SessionResult:
+    """Drive one user through ``actions`` scripted interactions."""
+
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(session_id)
+    result = SessionResult()
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    def rerun(action: str, interact, applied) -> bool:
+        """Apply one interaction and time the rerun; True if the input took effect."""
+
+        started = time.perf_counter()
+        try:
+            interact().run()
+        except Exception as exc:  # noqa: BLE001 - see the note on harness errors
+            result.harness_errors.append(f"{action}: {exc!r}")
+            return False
+        result.record(action, time.perf_counter() - started)
+        if app.exception:
+            result.errors.extend(f"{action}: {error.value}" for error in app.exception)
+            return False
+        try:
+            took_effect = applied()
+        except KeyError:
+            took_effect = False
+        result.dropped_inputs += not took_effect
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+        return took_effect
+
+    rerun("initial_load", lambda: app, lambda: True)
+    for _ in range(actions):
+        if result.errors:
+            break
+        try:
+            page = rng.choice(app.radio(key="page_selector").options)
+        except KeyError:
+            # A harness error left no page to act on; reload like a browser would.
+            rerun("initial_load", lambda: app, lambda: True)
+            continue
+        if not rerun("switch_page", lambda: app.radio(key="page_selector").set_value(page),
+                     lambda: app.radio(key="page_selector").value == page):
+            continue
+        if BEST_AIRLINE_PAGE not in page:
+            continue
+        for key, action in (("best_airline_origin", "change_origin"),
+                            ("best_airline_destination", "change_destination")):
+            try:
+                choice = rng.choice(app.selectbox(key=key).options)
+            except KeyError:
+                break
+            if not rerun(action, lambda: app.selectbox(key=key).set_value(choice),
+                         lambda: app.selectbox(key=key).value == choice):
+                break
+    return result
+
+
+def run_level(sessions: int, actions: int, think_time: float, timeout: float,
+              ramp_up: float) -> dict:
+    """Run ``sessions`` concurrent users and return the summary for that level."""
+
+    def start(session_id: int) -> SessionResult:
+        time.sleep(ramp_up * session_id / max(sessions, 1))
+        return run_session(session_id, actions, think_time, timeout)
+
+    with RSSSampler() as rss:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as pool:
+            results = list(pool.map(start, range(sessions)))
+        elapsed = time.perf_counter() - started
+
+    by_action: Dict[str, List[float]] = {}
+    for result in results:
+        for action, values in result.latencies.items():
+            by_action.setdefault(action, []).extend(values)
+    everything = [value for values in by_action.values() for value in values]
+    errors = [error for result in results for error in result.errors]
+    return {
+        "sessions": sessions,
+        "reruns": len(everything),
+        "elapsed_s": round(elapsed, 2),
+        "reruns_per_s": round(len(everything) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": _percentiles(everything),
+        "by_action_ms": {action: _percentiles(values)
+                         for action, values in sorted(by_action.items())},
+        "rss_mib": round(rss_bytes() / 2**20, 1),
+        "peak_rss_mib": round(rss.peak / 2**20, 1),
+        "dropped_inputs": sum(result.dropped_inputs for result in results),
+        "harness_errors": sum(len(result.harness_errors) for result in results),
+        "errors": len(errors),
+        "first_errors": errors[:5],
+    }
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    p50, p95, p99, top = np.percentile(np.asarray(values) * 1000, [50, 95, 99, 100])
+    return {"p50": round(p50, 1), "p95": round(p95, 1),
+            "p99": round(p99, 1), "max": round(top, 1)}
+
+
+def format_summary(summary: dict) -> str:
+    latency = summary["latency_ms"]
+    lines = [
+        f"{summary['sessions']:>3} sessions  {summary['reruns']:>5} reruns  "
+        f"{summary['reruns_per_s']:>6.2f}/s  p50 {latency['p50']:>7.1f}  "
+        f"p95 {latency['p95']:>7.1f}  p99 {latency['p99']:>7.1f} ms  "
+        f"RSS {summary['rss_mib']:.0f} MiB (peak {summary['peak_rss_mib']:.0f})  "
+        f"dropped {summary['dropped_inputs']}  harness errors {summary['harness_errors']}  "
+        f"errors {summary['errors']}"
+    ]
+    for action, stats in summary["by_action_ms"].items():
+        lines.append(f"      {action:<20} p50 {stats['p50']:>7.1f}  p95 {stats['p95']:>7.1f}  "
+                     f"p99 {stats['p99']:>7.1f} ms")
+    lines.extend(f"      ! {error}" for error in summary["first_errors"])
+    return "\n".join(lines)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", default="1,4,8",
+                        help="Comma-separated concurrency levels to run in turn.")
+    parser.add_argument("--actions", type=int, default=20,
+                        help="Page switches per session (route changes come on top).")
+    parser.add_argument("--flights", type=int, default=200_000,
+                        help="Size of the synthetic dataset.")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="Mean pause between a session's actions, in seconds.")
+    parser.add_argument("--ramp-up", type=float, default=1.0,
+                        help="Seconds over which each level's sessions start.")
+    parser.add_argument("--timeout", type=float, default=120.0,
+                        help="Per-rerun timeout, in seconds.")
+    parser.add_argument("--json", action="store_true",
+                        help="Print one JSON summary per level instead of a table.")
+    args = parser.parse_args(argv)
+    levels = [int(level) for level in args.sessions.split(",") if level.strip()]
+
+    # Keep the run self-contained: no background warm-up competing with the
+    # measured sessions, no sampled previews standing in for the pages, and a
+    # throwaway figure cache.
+    os.environ.setdefault("DASHBOARD_WARMUP", "0")
+    os.environ.setdefault("DASHBOARD_PROGRESSIVE", "0")
+    os.environ.setdefault("DASHBOARD_METRICS_PORT", "0")
+    from streamlit.logger import set_log_level
+
+    from synthetic import synthetic_sources, use_sources
+
+    set_log_level("error")
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="figure-cache-") as cache_dir, \
+            synthetic_sources(args.flights) as sources, use_sources(*sources):
+        os.environ.setdefault("DASHBOARD_FIGURE_CACHE_DIR", cache_dir)
+        for level in levels:
+            summary = run_level(level, args.actions, args.think_time,
+                                args.timeout, args.ramp_up)
+            failed = failed or summary["errors"] > 0
+            print(json.dumps(summary) if args.json else format_summary(summary), flush=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""Process metrics in the Prometheus text exposition format.
+
+A small self-contained registry of counters, gauges and histograms (no
+client library needed) served over HTTP at ``/metrics`` on
+``127.0.0.1:DASHBOARD_METRICS_PORT`` (9464 by default, ``0`` disables):
+
+    curl -s localhost:9464/metrics
+
+It covers dataset load and reference fetch times, rerun and per-page render
+latency, ``st.cache_data`` and figure cache hits and misses per builder, the
+size of the frames handed to builders that had to run, and the process RSS. ``cache_data`` is a
+drop-in for ``st.cache_data`` that does the per-builder accounting: the call
+counter sits outside Streamlit's cache and the miss counter inside it, so
+hits are calls that never reached the function body.
+
+    python metrics.py --flights 50000
+
+renders every page once on synthetic data and prints what a scrape returns.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+import pandas as pd
+
+from frame_memo import FRAME_HASH_FUNCS
+
+DEFAULT_METRICS_PORT = 9464
+METRICS_HOST = os.environ.get("DASHBOARD_METRICS_HOST", "127.0.0.1")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LOGGER = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    """A named metric family with fixed label names."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _labels(self, values: LabelValues, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def expose(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return super().expose() + [
+            f"{self.name}{self._labels(key)} {_number(value)}" for key, value in values]
+
+
+class Gauge(_Metric):
+    """A value read when scraped, from ``collect`` or the last ``set``."""
+
+    kind = "gauge"
+
+    def __init__(self, *args, collect: Callable[[], float] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._collect = collect
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def expose(self) -> List[str]:
+        if self._collect is not None:
+            self.set(self._collect())
+        with self._lock:
+            values = sorted(self._values.items())
+        return super().expose() + [
+            f"{self.name}{self._labels(key)} {_number(value)}" for key, value in values]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket (non-cumulative) counts, then sum and count.
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            position = next((i for i, bound in enumerate(self.buckets) if value <= bound),
+                            len(self.buckets))
+            series[position] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            return int(self._series.get(self._key(labels), [0.0])[-1])
+
+    def total(self, **labels: str) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), [0.0, 0.0])[-2]
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        lines = super().expose()
+        for key, values in series:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                labels = self._labels(key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {_number(cumulative)}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_number(values[-2])}")
+            lines.append(f"{self.name}_count{self._labels(key)} {_number(values[-1])}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def rss_bytes() -> int:
+    """Return the current RSS, falling back to the peak where /proc is missing.
+
+    Returns 0 where neither is available (Windows has no ``resource`` module).
+    """
+
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+DATASET_LOAD_SECONDS = Histogram(
+    "dashboard_dataset_load_seconds", "Time to read and clean the flight dataset.",
+    ["layout"])
+REFERENCE_FETCH_SECONDS = Histogram(
+    "dashboard_reference_fetch_seconds", "Time to fetch a reference table.", ["source"])
+RERUN_STAGE_SECONDS = Histogram(
+    "dashboard_rerun_stage_seconds", "Wall time of each stage of an app rerun.",
+    ["page", "stage"])
+PAGE_RENDER_SECONDS = Histogram(
+    "dashboard_page_render_seconds", "Wall time to render a page.", ["page"])
+BUILDER_CALLS = Counter(
+    "dashboard_builder_calls_total", "Calls to a cached builder.", ["builder"])
+BUILDER_MISSES = Counter(
+    "dashboard_builder_cache_misses_total", "Cached builder calls that ran the builder.",
+    ["builder"])
+BUILDER_SECONDS = Histogram(
+    "dashboard_builder_seconds", "Time spent running a builder on a cache miss.", ["builder"])
+BUILDER_INPUT_ROWS = Counter(
+    "dashboard_builder_input_rows_total", "Rows of the input frame of builders that ran.",
+    ["builder"])
+FIGURE_CACHE_REQUESTS = Counter(
+    "dashboard_figure_cache_requests_total", "Figure cache lookups by outcome.",
+    ["builder", "result"])
+PROCESS_RSS_BYTES = Gauge(
+    "dashboard_process_resident_memory_bytes", "Resident set size of the process.",
+    collect=rss_bytes)
+
+REGISTRY: List[_Metric] = [
+    DATASET_LOAD_SECONDS, REFERENCE_FETCH_SECONDS, RERUN_STAGE_SECONDS, PAGE_RENDER_SECONDS,
+    BUILDER_CALLS, BUILDER_MISSES, BUILDER_SECONDS, BUILDER_INPUT_ROWS, FIGURE_CACHE_REQUESTS,
+    PROCESS_RSS_BYTES,
+]
+
+
+def cache_data(func: Callable | None = None, **options) -> Callable:
+    """``st.cache_data`` with per-builder call, miss, time and row accounting.
+
+    The builder label is ``module.function``. Input rows are the length of
+    the first DataFrame argument, counted only when the builder runs. That
+    is the size of the frame handed over, not the work done: builders that
+    read ``flight_cells`` or ``month_rows`` touch far fewer rows.
+    ``__wrapped__`` is the undecorated builder, as with ``st.cache_data``.
+    DataFrame arguments are keyed by ``frame_fingerprint``, computed once
+    per frame, rather than re-hashed by Streamlit on every call.
+    """
+
+    if func is None:
+        return functools.partial(cache_data, **options)
+    # Imported here so modules that only record metrics, such as the
+    # preprocessing step behind ``route_api``, do not pull in Streamlit.
+    import streamlit as st
+
+    builder = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        BUILDER_MISSES.inc(builder=builder)
+        frame = next((value for value in (*args, *kwargs.values())
+                      if isinstance(value, pd.DataFrame)), None)
+        if frame is not None:
+            BUILDER_INPUT_ROWS.inc(len(frame), builder=builder)
+        with BUILDER_SECONDS.time(builder=builder):
+            return func(*args, **kwargs)
+
+    options.setdefault("hash_funcs", FRAME_HASH_FUNCS)
+    cached = st.cache_data(run, **options)
+
+    @functools.wraps(func)
+    def call(*args, **kwargs):
+        BUILDER_CALLS.inc(builder=builder)
+        return cached(*args, **kwargs)
+
+    call.clear = cached.clear
+    return call
+
+
+def render() -> str:
+    """Return every metric in the text exposition format."""
+
+    return "\n".join(line for metric in REGISTRY for line in metric.expose()) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - stdlib signature
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+
+def metrics_port() -> int:
+    """Return the configured endpoint port, 0 when disabled.
+
+    Read from the environment on each call rather than at import, so tools
+    that drive the app in-process (``rerun_costs.py``, ``loadtest.py``) can
+    turn the endpoint off after this module has been imported.
+    """
+
+    return int(os.environ.get("DASHBOARD_METRICS_PORT", str(DEFAULT_METRICS_PORT)))
+
+
+def start_metrics_server(port: int | None = None, host: str = METRICS_HOST) -> ThreadingHTTPServer | None:
+    """Serve ``/metrics`` on ``host:port`` in a daemon thread; None if the port is busy.
+
+    ``port`` defaults to ``metrics_port()``. Port 0 binds an ephemeral port,
+    read back from ``server.server_address``.
+    """
+
+    if port is None:
+        port = metrics_port()
+
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as exc:
+        LOGGER.warning("Metrics endpoint not started on %s:%s: %s", host, port, exc)
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    LOGGER.info("Serving metrics on http://%s:%s/metrics", host, server.server_address[1])
+    return server
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Render every page once and print a scrape.")
+    parser.add_argument("--flights", type=int, default=50_000,
+                        help="Size of the synthetic dataset.")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DASHBOARD_WARMUP", "0")
+    os.environ.setdefault("DASHBOARD_PROGRESSIVE", "0")
+    os.environ.setdefault("DASHBOARD_FIGURE_CACHE", "0")
+    os.environ.setdefault("DASHBOARD_METRICS_PORT", "0")
+    # The app records into the imported module, which is not ``__main__``.
+    import urllib.request
+
+    import metrics
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+
+    from synthetic import synthetic_sources, use_sources
+
+    set_log_level("error")
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    server = metrics.start_metrics_server(port=0)
+    try:
+        with synthetic_sources(args.flights) as sources, use_sources(*sources):
+            app = AppTest.from_file(metrics.__file__.replace("metrics.py", "app.py"),
+                                    default_timeout=120).run()
+            for option in app.radio(key="page_selector").options:
+                app.radio(key="page_selector").set_value(option).run()
+        url = f"http://{server.server_address[0]}:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=10) as response:
+            print(response.read().decode())
+    finally:
+        server.shutdown()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
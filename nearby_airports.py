@@ -0,0 +1,136 @@
+"""Nearby-airport alternatives from a latitude/longitude grid index.
+
+Airports are bucketed into square cells of ``cell_deg`` degrees and stored
+in cell order with a sorted array of cell keys, so the airports of a run of
+adjacent cells in one grid row are one contiguous slice. A radius query
+visits only the rows and columns the radius can reach, then keeps the
+candidates whose great-circle distance is within it. Alternatives pair the
+airports near the chosen origin with those near the chosen destination and
+read their statistics from the precomputed route leaderboard.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from route_leaderboard import RouteLeaderboard
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+GRID_CELL_DEG = 1.0
+NEARBY_RADIUS_KM = 200
+NEARBY_MIN_FLIGHTS = 30
+MAX_ALTERNATIVES = 10
+
+
+class AirportGrid:
+    """Grid index over airport coordinates for radius queries."""
+
+    def __init__(self, airports_us: pd.DataFrame, cell_deg: float = GRID_CELL_DEG) -> None:
+        located = airports_us.dropna(subset=["Latitude", "Longitude"]).drop_duplicates("IATA")
+        lat = located["Latitude"].to_numpy(dtype=float)
+        lon = located["Longitude"].to_numpy(dtype=float)
+        self.cell_deg = cell_deg
+        self.n_cols = int(np.ceil(360 / cell_deg)) + 1
+        keys = self._row(lat) * self.n_cols + self._col(lon)
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.iata = located["IATA"].to_numpy(dtype=object)[order]
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self.positions = {code: i for i, code in enumerate(self.iata)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _row(self, lat: np.ndarray) -> np.ndarray:
+        return np.floor((np.asarray(lat) + 90) / self.cell_deg).astype(np.int64)
+
+    def _col(self, lon: np.ndarray) -> np.ndarray:
+        return np.floor((np.asarray(lon) + 180) / self.cell_deg).astype(np.int64)
+
+    def nearby(self, iata: str, radius_km: float) -> pd.Series:
+        """Return the distance in km to every other airport within ``radius_km`` of ``iata``, nearest first.
+
+        Unknown airports have no neighbours. Queries do not wrap around the
+        antimeridian, which no US airport pair within a few hundred km crosses.
+        """
+
+        position = self.positions.get(iata)
+        if position is None:
+            return pd.Series(dtype=float)
+        lat, lon = self.lat[position], self.lon[position]
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = lat_span / max(np.cos(np.radians(min(abs(lat) + lat_span, 89.0))), 1e-6)
+        first_col, last_col = self._col([lon - lon_span, lon + lon_span])
+
+        candidates = []
+        for row in range(int(self._row(lat - lat_span)), int(self._row(lat + lat_span)) + 1):
+            lo, hi = np.searchsorted(
+                self.keys, [row * self.n_cols + first_col, row * self.n_cols + last_col + 1])
+            candidates.append(np.arange(lo, hi))
+        candidates = np.concatenate(candidates)
+        candidates = candidates[candidates != position]
+
+        distance = _haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        within = distance <= radius_km
+        result = pd.Series(distance[within], index=self.iata[candidates[within]])
+        return result.sort_values(kind="stable")
+
+
+def _haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Return the great-circle distances in km from (``lat``, ``lon``) to each point."""
+
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat, lon, lats, lons))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def nearby_alternatives(
+    grid: AirportGrid,
+    leaderboard: RouteLeaderboard,
+    origin: str,
+    destination: str,
+    radius_km: float = NEARBY_RADIUS_KM,
+    min_flights: int = NEARBY_MIN_FLIGHTS,
+    limit: int = MAX_ALTERNATIVES,
+) -> pd.DataFrame:
+    """Return flown routes between airports near ``origin`` and ``destination``, best first.
+
+    Either end may stay the same, but not both. Routes need ``min_flights``
+    flights, and when the chosen route has a best airline an alternative's
+    best airline must arrive earlier on average. Ranked by the best airline's
+    delay, then by how far the alternative airports are from the chosen ones.
+    """
+
+    origins = pd.concat([pd.Series({origin: 0.0}), grid.nearby(origin, radius_km)])
+    destinations = pd.concat([pd.Series({destination: 0.0}), grid.nearby(destination, radius_km)])
+    pairs = [
+        (position, origin_km + dest_km)
+        for alt_origin, origin_km in origins.items()
+        for alt_dest, dest_km in destinations.items()
+        if (alt_origin, alt_dest) != (origin, destination) and alt_origin != alt_dest
+        and (position := leaderboard.positions.get((alt_origin, alt_dest))) is not None
+    ]
+    if not pairs:
+        return pd.DataFrame()
+
+    positions, extra_km = zip(*pairs)
+    alternatives = leaderboard.table.iloc[list(positions)].assign(
+        **{"Distance Away (km)": np.round(extra_km).astype(int)})
+    alternatives = alternatives[
+        (alternatives["Flights"] >= min_flights) & alternatives["Best Airline"].notna()]
+    chosen = leaderboard.positions.get((origin, destination))
+    if chosen is not None:
+        chosen_delay = leaderboard.table["Best Airline Delay (min)"].iat[chosen]
+        if not np.isnan(chosen_delay):
+            alternatives = alternatives[alternatives["Best Airline Delay (min)"] < chosen_delay]
+    return (
+        alternatives.sort_values(["Best Airline Delay (min)", "Distance Away (km)"], kind="stable")
+        .head(limit)[["Route", "Distance Away (km)", "Flights", "Best Airline",
+                      "Best Airline Delay (min)", "On-Time %"]]
+        .rename(columns={"On-Time %": "Route On-Time %"})
+        .reset_index(drop=True)
+    )
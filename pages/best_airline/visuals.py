@@ -3,15 +3,27 @@
 from __future__ import annotations
 import plotly.graph_objects as go
 
-from typing import Tuple
+import weakref
+from functools import partial
+from typing import Callable, Dict, List, Tuple
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-<< << << < HEAD
+from calendar_keys import week_numbers
+from delay_forecast import FORECAST_WEEKS, DelayForecast
+from flight_history import FlightHistoryIndex
+from metrics import cache_data
+from nearby_airports import NEARBY_MIN_FLIGHTS, NEARBY_RADIUS_KM, AirportGrid, nearby_alternatives
+from route_graph import ConnectivityGraph
+from route_leaderboard import SORTABLE_COLUMNS, RouteLeaderboard
 
-== == == =
->>>>>> > 2d87f92f8ade310b0b4f0dbd74013cdbb40b6457
+ROUTE_MEMO_KEY = "_best_airline_route_memo"
+ROUTE_MEMO_SIZE = 32
+LEADERBOARD_PAGE_SIZES = (25, 50, 100)
+LEADERBOARD_MIN_FLIGHTS = 30
+FORECAST_COLUMN = f"Expected Delay, Next {FORECAST_WEEKS} Weeks (min)"
 
 
 def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
@@ -21,22 +33,28 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
     if df.empty:
         st.info("No flight records available. Load data to unlock suggestions.")
         return
+    _render_route_explorer(df, airports_us)
 
+    st.subheader("Route leaderboard")
+    _render_route_leaderboard(df, airports_us)
 
-<< << << < HEAD
-   # Build airport lookup by IATA to display full names
-   airports_lookup = {}
-    if airports_us is not None and not airports_us.empty:
-        for _, r in airports_us.iterrows():
-            iata = r.get("IATA")
-            name = r.get("Airport_Name")
-            city = r.get("City")
-            state = r.get("State")
-            airports_lookup[iata] = {
-                "name": name,
-                "city": city,
-                "state": state,
-            }
+    st.subheader("Flight number history")
+    _render_flight_history(df, airports_us)
+
+
+@st.fragment
+def _render_route_explorer(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
+    """Render the route selectors and their results.
+
+    Runs as a fragment: changing a selector reruns only this block, against
+    the frames passed in by the last full run. Lookups are memoized per
+    session, so revisiting a route skips even the cache-key hashing.
+    """
+
+    memo = _session_memo(df, airports_us)
+
+    # Build airport lookup by IATA to display full names
+    airports_lookup = _pinned(memo, ("airports",), _build_airports_lookup, airports_us)
 
     # State selector to filter origin airports
     states = [s for s in sorted(
@@ -46,7 +64,7 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
         "Filter by state (origin)", states_options, index=0, key="best_airline_state")
 
     # Build list of origins (IATA) present in dataset, optionally filter by state
-    origin_iatas = sorted(df["ORIGIN_AIRPORT"].dropna().unique())
+    origin_iatas = _pinned(memo, ("origins",), _list_origins, df)
     if state_choice != "All states":
         origin_iatas = [
             i for i in origin_iatas if i in airports_lookup and airports_lookup[i]["state"] == state_choice]
@@ -71,18 +89,25 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
         "Origin airport", origin_labels, index=0, key="best_airline_origin")
     origin_choice = label_by_iata[origin_label_choice]
 
-    # Available destinations from the selected IATA code
-    dest_iatas = sorted(df.loc[df["ORIGIN_AIRPORT"] ==
-                        origin_choice, "DEST_AIRPORT"].dropna().unique())
+    # Direct destinations first, then the airports only reachable through
+    # connections that the graph can actually build
+    dest_iatas = _memoized(
+        memo, ("destinations", origin_choice), _list_destinations, df, origin_choice)
+    direct_iatas = set(dest_iatas)
+    graph = _pinned(memo, ("graph",), _get_connectivity_graph, df)
+    connecting_iatas = [
+        i for i in graph.connection_destinations(origin_choice) if i not in direct_iatas]
     # Map destinations to readable labels
     dest_label_by_iata = {}
     dest_labels = []
-    for i in dest_iatas:
+    for i in dest_iatas + connecting_iatas:
         info = airports_lookup.get(i)
         if info:
             label = f"{i} — {info['name']} ({info['city']})"
         else:
             label = str(i)
+        if i not in direct_iatas:
+            label = f"{label} · connections only"
         dest_label_by_iata[label] = i
         dest_labels.append(label)
     if not dest_labels:
@@ -96,33 +121,26 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
         key="best_airline_destination",
     )
     destination_choice = dest_label_by_iata[destination_label_choice]
-== == == =
-   origins = sorted(df["ORIGIN_AIRPORT"].dropna().unique())
-    origin_choice = st.selectbox(
-        "Origin airport",
-        origins,
-        index=0,
-        key="best_airline_origin",
-    )
-    destinations = sorted(
-        df.loc[df["ORIGIN_AIRPORT"] == origin_choice,
-               "DEST_AIRPORT"].dropna().unique()
-    )
-    if not destinations:
-        st.warning(
-            "This origin currently has no destination records in the dataset.")
-        return
 
-    destination_choice = st.selectbox(
-        "Destination airport",
-        destinations,
-        index=0,
-        key="best_airline_destination",
-    )
->>>>>> > 2d87f92f8ade310b0b4f0dbd74013cdbb40b6457
+    if destination_choice not in direct_iatas:
+        itineraries = _memoized(
+            memo, ("connections", origin_choice, destination_choice),
+            graph.search, origin_choice, destination_choice,
+        )
+        _render_connections(itineraries)
+    else:
+        _render_direct_route(memo, df, origin_choice, destination_choice)
+    _render_nearby_alternatives(memo, df, airports_us, origin_choice, destination_choice)
+
+
+def _render_direct_route(
+    memo: Dict[str, object], df: pd.DataFrame, origin: str, destination: str
+) -> None:
+    """Render the airline ranking and summary chart of a directly flown route."""
 
-   recommendations, sample_size, weeks_observed = _get_route_recommendations(
-        df, origin_choice, destination_choice
+    recommendations, sample_size, weeks_observed = _memoized(
+        memo, ("route", origin, destination),
+        _get_route_recommendations, df, origin, destination,
     )
 
     if sample_size == 0:
@@ -150,14 +168,15 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
     st.write(
         f"Top {len(recommendations)} airlines for this route (about {total_weekly:.1f} flights/week combined)."
     )
-    st.dataframe(recommendations, width="stretch")
+    forecast = _pinned(memo, ("forecast",), _get_delay_forecast, df)
+    st.dataframe(_with_forecast(recommendations, forecast, origin, destination), width="stretch")
     st.caption(
-        "Avg delays below zero mean the airline typically arrives ahead of schedule. Flights/week reflects only the weeks present in the dataset."
+        "Avg delays below zero mean the airline typically arrives ahead of schedule. Flights/week reflects only the weeks present in the dataset. "
+        f"Expected delay averages the route's seasonal forecast plus the airline's effect on it over the {FORECAST_WEEKS} weeks from {forecast.start}."
     )
 
-<< << << < HEAD
-   # Summary chart based on the recommendations table
-   try:
+    # Summary chart based on the recommendations table
+    try:
         # Bar: Flights / Week, Line: Avg Arrival Delay (min) on secondary axis
         fig = go.Figure()
         fig.add_trace(go.Bar(
@@ -193,10 +212,320 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
         # If plotly is not available for some reason, do not break the page
         st.info("Install `plotly` to view the chart (pip install plotly).")
 
-== =====
->>>>>> > 2d87f92f8ade310b0b4f0dbd74013cdbb40b6457
 
+def _render_nearby_alternatives(
+    memo: Dict[str, object],
+    df: pd.DataFrame,
+    airports_us: pd.DataFrame,
+    origin: str,
+    destination: str,
+) -> None:
+    """Render better-performing routes between airports near the chosen ones."""
+
+    with st.expander("Nearby airport alternatives"):
+        radius_km = st.slider(
+            "Search radius (km)", min_value=50, max_value=500, value=NEARBY_RADIUS_KM,
+            step=25, key="best_airline_nearby_radius")
+        grid = _pinned(memo, ("airport_grid",), _get_airport_grid, airports_us)
+        leaderboard = _pinned(
+            memo, ("leaderboard",), _get_route_leaderboard, df, airports_us)
+        alternatives = _memoized(
+            memo, ("nearby", origin, destination, radius_km),
+            nearby_alternatives, grid, leaderboard, origin, destination, radius_km,
+        )
+        if alternatives.empty:
+            st.info(f"No better-performing routes between airports within {radius_km} km.")
+            return
+        st.dataframe(alternatives, width="stretch", hide_index=True)
+        st.caption(
+            f"Routes with at least {NEARBY_MIN_FLIGHTS} flights whose best airline arrives earlier on average than this route's. "
+            "Distance away adds up how far each alternative airport is from the one you picked."
+        )
+
+
+@st.fragment
+def _render_route_leaderboard(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
+    """Render one page of the nationwide route leaderboard.
+
+    Sorting, searching and paging read the shared ``RouteLeaderboard`` and
+    rerun only this fragment; only the visible page reaches the browser.
+    """
+
+    memo = _session_memo(df, airports_us)
+    leaderboard = _pinned(
+        memo, ("leaderboard",), _get_route_leaderboard, df, airports_us)
 
+    search_col, sort_col, order_col, min_col = st.columns((2, 2, 1, 1))
+    search = search_col.text_input(
+        "Search routes", placeholder="Airport, city or airline", key="leaderboard_search")
+    sort_by = sort_col.selectbox("Sort by", SORTABLE_COLUMNS, key="leaderboard_sort")
+    descending = order_col.radio(
+        "Order", ("Highest first", "Lowest first"), key="leaderboard_order") == "Highest first"
+    min_flights = min_col.number_input(
+        "Min flights", min_value=0, value=LEADERBOARD_MIN_FLIGHTS, step=10,
+        key="leaderboard_min_flights")
+
+    order = leaderboard.matching(sort_by, descending, search, int(min_flights))
+    if not len(order):
+        st.info("No routes match the search and minimum flights.")
+        return
+
+    size_col, page_col = st.columns(2)
+    page_size = size_col.selectbox(
+        "Routes per page", LEADERBOARD_PAGE_SIZES, key="leaderboard_page_size")
+    pages = -(-len(order) // page_size)
+    if st.session_state.get("leaderboard_page", 1) > pages:
+        st.session_state["leaderboard_page"] = pages
+    page = page_col.number_input(
+        f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, key="leaderboard_page")
+
+    rows = leaderboard.page(order, int(page) - 1, page_size)
+    st.dataframe(rows, width="stretch", hide_index=True)
+    start = (int(page) - 1) * page_size
+    st.caption(
+        f"Routes {start + 1:,}–{start + len(rows):,} of {len(order):,} matching "
+        f"({len(leaderboard):,} routes in total). Best airline follows the suggester's ranking."
+    )
+
+
+@st.fragment
+def _render_flight_history(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
+    """Render the delay history and weekday pattern of one flight number.
+
+    A lookup is a binary search and a slice of the shared
+    ``FlightHistoryIndex``, so picking another flight reruns only this block.
+    """
+
+    memo = _session_memo(df, airports_us)
+    index = _pinned(memo, ("flight_history",), _get_flight_history_index, df)
+    if not index.airline_names:
+        st.info("No flight numbers available for the selected period.")
+        return
+
+    airline_by_name = {name: airline for airline, name in index.airline_names.items()}
+    airline_col, number_col = st.columns(2)
+    airline_name = airline_col.selectbox(
+        "Airline", sorted(airline_by_name), key="flight_history_airline")
+    airline_id = airline_by_name[airline_name]
+    flight_num = number_col.number_input(
+        "Flight number", min_value=1, value=None, step=1,
+        placeholder="Busiest flight number", key="flight_history_number")
+    if flight_num is None:
+        flight_num = index.busiest_flight(airline_id)
+    if flight_num is None:
+        st.info("This airline has no flights in the selected period.")
+        return
+
+    flight = _memoized(
+        memo, ("flight", airline_id, int(flight_num)), index.lookup, airline_id, int(flight_num))
+    if flight is None:
+        st.warning(f"No flights numbered {int(flight_num)} for this airline in the selected period.")
+        return
+
+    left, middle, right = st.columns(3)
+    left.metric("Flights", f"{len(flight.history):,}")
+    middle.metric("Avg arrival delay", f"{flight.avg_delay:.1f} min")
+    right.metric("On-time arrivals", f"{flight.on_time_rate:.1f}%")
+
+    history_col, weekday_col = st.columns((3, 2))
+    fig = go.Figure(go.Scatter(
+        x=flight.history["Date"],
+        y=flight.history["Arrival Delay (min)"],
+        mode="markers",
+        marker=dict(size=5, color="steelblue"),
+        customdata=flight.history["Route"],
+        hovertemplate="%{x|%b %d, %Y} · %{customdata}<br>%{y:.0f} min<extra></extra>",
+    ))
+    fig.add_hline(y=0, line_dash="dot", line_color="gray")
+    fig.update_layout(
+        title=f"{flight.airline} flight {flight.flight_num}: arrival delay by date",
+        yaxis=dict(title="Arrival Delay (min)"),
+        margin=dict(t=60, b=20),
+        height=360,
+    )
+    history_col.plotly_chart(fig, width="stretch")
+
+    fig = go.Figure(go.Bar(
+        x=flight.weekdays["Weekday"],
+        y=flight.weekdays["Avg Arrival Delay (min)"],
+        customdata=flight.weekdays[["Flights", "On-Time %"]],
+        marker_color="firebrick",
+        hovertemplate="%{x}: %{y:.1f} min avg<br>%{customdata[0]} flights, "
+                      "%{customdata[1]:.1f}% on time<extra></extra>",
+    ))
+    fig.update_layout(
+        title="Weekday pattern",
+        yaxis=dict(title="Avg Arrival Delay (min)"),
+        margin=dict(t=60, b=20),
+        height=360,
+    )
+    weekday_col.plotly_chart(fig, width="stretch")
+
+    with st.expander("Every flight, most recent first"):
+        st.dataframe(flight.history.iloc[::-1], width="stretch", hide_index=True)
+
+
+def _render_connections(itineraries: pd.DataFrame) -> None:
+    """Show the best one- and two-stop itineraries for a route with no direct flights."""
+
+    if itineraries.empty:
+        st.warning(
+            "No direct flights on this route, and no one- or two-stop connection "
+            "with enough flights on every leg."
+        )
+        return
+
+    st.write("No direct flights on this route. Best-rated connections:")
+    st.dataframe(itineraries, width="stretch", hide_index=True)
+    st.caption(
+        "Combined delay adds up each leg's average arrival delay; all-legs on-time % is the chance every leg arrives on time. Connection times are not modelled."
+    )
+
+
+def export_datasets(df: pd.DataFrame, airports_us: pd.DataFrame) -> Dict[str, Callable[[], object]]:
+    """Return the downloadable datasets behind this page, built on demand."""
+
+    return {
+        "Route performance by airline": partial(_build_route_airline_summary, df),
+        "Route leaderboard": lambda: _get_route_leaderboard(df, airports_us).table,
+        "Filtered flights": lambda: df,
+    }
+
+
+def warmup_tasks(df: pd.DataFrame, airports_us: pd.DataFrame) -> List[Tuple[str, Callable[[], object]]]:
+    """Return the cached builders this page calls, bound to the page inputs."""
+
+    return [
+        ("best_airline.airports_lookup",
+         partial(_build_airports_lookup, airports_us)),
+        ("best_airline.default_route", partial(_warm_default_route, df)),
+        ("best_airline.connectivity_graph", partial(_get_connectivity_graph, df)),
+        ("best_airline.route_leaderboard",
+         partial(_get_route_leaderboard, df, airports_us)),
+        ("best_airline.flight_history_index",
+         partial(_get_flight_history_index, df)),
+        ("best_airline.delay_forecast", partial(_get_delay_forecast, df)),
+        ("best_airline.airport_grid", partial(_get_airport_grid, airports_us)),
+    ]
+
+
+def _session_memo(df: pd.DataFrame, airports_us: pd.DataFrame) -> Dict[str, object]:
+    """Return this session's memo of lookups, reset whenever the frames change.
+
+    ``get_data`` shares the same frames across reruns, so their identity
+    changes only with a new filter selection or a data reload. The memo is
+    tied to it via weak references and never outlives them. Per-dataset
+    objects (indexes, option lists) are pinned; per-route results share a
+    bounded LRU.
+    """
+
+    memo = st.session_state.get(ROUTE_MEMO_KEY)
+    if memo is None or memo["df"]() is not df or memo["airports"]() is not airports_us:
+        memo = {"df": weakref.ref(df), "airports": weakref.ref(airports_us),
+                "pinned": {}, "results": {}}
+        st.session_state[ROUTE_MEMO_KEY] = memo
+    return memo
+
+
+def _pinned(memo: Dict[str, object], key: tuple, builder: Callable, *args: object) -> object:
+    """Return ``builder(*args)`` from ``memo``, kept for as long as the frames are."""
+
+    pinned = memo["pinned"]
+    if key not in pinned:
+        pinned[key] = builder(*args)
+    return pinned[key]
+
+
+def _memoized(memo: Dict[str, object], key: tuple, builder: Callable, *args: object) -> object:
+    """Return ``builder(*args)`` from ``memo``, keeping the most recent per-route entries."""
+
+    results = memo["results"]
+    if key in results:
+        results[key] = results.pop(key)
+        return results[key]
+    results[key] = result = builder(*args)
+    while len(results) > ROUTE_MEMO_SIZE:
+        del results[next(iter(results))]
+    return result
+
+
+def _warm_default_route(df: pd.DataFrame) -> None:
+    """Compute the selector options and ranking a new session sees first."""
+
+    origins = _list_origins(df)
+    if not origins:
+        return
+    destinations = _list_destinations(df, origins[0])
+    if destinations:
+        _get_route_recommendations(df, origins[0], destinations[0])
+
+
+@st.cache_resource(show_spinner="Building the airport connectivity graph...")
+def _get_connectivity_graph(df: pd.DataFrame) -> ConnectivityGraph:
+    """Build the route graph once per dataset and share it across sessions."""
+
+    return ConnectivityGraph(df)
+
+
+@st.cache_resource(show_spinner="Ranking every route...")
+def _get_route_leaderboard(df: pd.DataFrame, airports_us: pd.DataFrame) -> RouteLeaderboard:
+    """Build the route leaderboard once per dataset and share it across sessions."""
+
+    return RouteLeaderboard(df, airports_us)
+
+
+@st.cache_resource(show_spinner=False)
+def _get_airport_grid(airports_us: pd.DataFrame) -> AirportGrid:
+    """Build the airport grid index once and share it across sessions."""
+
+    return AirportGrid(airports_us)
+
+
+@st.cache_resource(show_spinner="Fitting route delay forecasts...")
+def _get_delay_forecast(df: pd.DataFrame) -> DelayForecast:
+    """Fit the route delay forecasts once per dataset and share them across sessions."""
+
+    return DelayForecast(df)
+
+
+@st.cache_resource(show_spinner="Indexing flight numbers...")
+def _get_flight_history_index(df: pd.DataFrame) -> FlightHistoryIndex:
+    """Build the flight-number index once per dataset and share it across sessions."""
+
+    return FlightHistoryIndex(df)
+
+
+@cache_data(show_spinner=False)
+def _build_airports_lookup(airports_us: pd.DataFrame) -> Dict[str, dict]:
+    """Map IATA codes to airport name, city and state for display labels."""
+
+    if airports_us is None or airports_us.empty:
+        return {}
+    return {
+        row["IATA"]: {
+            "name": row["Airport_Name"],
+            "city": row["City"],
+            "state": row["State"],
+        }
+        for row in airports_us[["IATA", "Airport_Name", "City", "State"]].to_dict("records")
+    }
+
+
+@cache_data(show_spinner=False)
+def _list_origins(df: pd.DataFrame) -> List[str]:
+    """Return the sorted origin airports present in the dataset."""
+
+    return sorted(df["ORIGIN_AIRPORT"].dropna().unique())
+
+
+@cache_data(show_spinner=False)
+def _list_destinations(df: pd.DataFrame, origin: str) -> List[str]:
+    """Return the sorted destinations served from ``origin``."""
+
+    return sorted(df.loc[df["ORIGIN_AIRPORT"] == origin, "DEST_AIRPORT"].dropna().unique())
+
+
+@cache_data(show_spinner=False)
 def _get_route_recommendations(
     df: pd.DataFrame,
     origin: str,
@@ -212,24 +541,21 @@ def _get_route_recommendations(
     if not pd.api.types.is_datetime64_any_dtype(route_df["FL_DATE"]):
         route_df["FL_DATE"] = pd.to_datetime(route_df["FL_DATE"])
 
-    route_df["YearWeek"] = route_df["FL_DATE"].dt.to_period("W")
+    route_df["YearWeek"] = week_numbers(route_df["FL_DATE"])
+    route_df["OnTime"] = route_df["ARR_DELAY"] <= 0
     weeks_observed = max(int(route_df["YearWeek"].nunique()), 1)
 
     grouped = (
-        route_df.groupby(["AIRLINE_ID", "Airline_Name"], dropna=False)
+        route_df.groupby(["AIRLINE_ID", "Airline_Name"], dropna=False, observed=True)
         .aggregate(
             Flights=("ARR_DELAY", "size"),
             AvgArrivalDelay=("ARR_DELAY", "mean"),
-            OnTimeRate=("ARR_DELAY", lambda s: (s <= 0).mean()),
+            OnTimeRate=("OnTime", "mean"),
+            WeeksWithFlights=("YearWeek", "nunique"),
         )
         .reset_index()
     )
 
-    weeks_per_airline = (
-        route_df.groupby("AIRLINE_ID")["YearWeek"].nunique(
-        ).reset_index(name="WeeksWithFlights")
-    )
-    grouped = grouped.merge(weeks_per_airline, on="AIRLINE_ID", how="left")
     grouped["WeeksWithFlights"] = grouped["WeeksWithFlights"].clip(lower=1)
     grouped["FlightsPerWeek"] = (
         grouped["Flights"] / grouped["WeeksWithFlights"]).round(1)
@@ -259,3 +585,47 @@ def _get_route_recommendations(
         len(route_df),
         weeks_observed,
     )
+
+
+def _with_forecast(
+    recommendations: pd.DataFrame,
+    forecast: DelayForecast,
+    origin: str,
+    destination: str,
+) -> pd.DataFrame:
+    """Return ``recommendations`` with each airline's mean forecast delay appended.
+
+    Kept out of ``_get_route_recommendations`` so that cached ranking does
+    not depend on the shared forecast model.
+    """
+
+    expected = forecast.forecast(origin, destination, recommendations["Airline"].astype(object))
+    return recommendations.assign(
+        **{FORECAST_COLUMN: np.nan if expected is None else expected.mean(axis=1).round(1)})
+
+
+def _build_route_airline_summary(df: pd.DataFrame) -> pd.DataFrame:
+    """Return flights, average arrival delay and on-time rate per route and airline.
+
+    The statistics the suggester ranks, for every route at once. Built only
+    for downloads, so it is not cached.
+    """
+
+    work = pd.DataFrame({
+        "ARR_DELAY": df["ARR_DELAY"],
+        "OnTime": (df["ARR_DELAY"] <= 0).where(df["ARR_DELAY"].notna()),
+    })
+    grouped = work.groupby(
+        [df["ORIGIN_AIRPORT"], df["DEST_AIRPORT"], df["Airline_Name"]], observed=True)
+    summary = grouped.agg(
+        Flights=("ARR_DELAY", "size"),
+        AvgArrivalDelay=("ARR_DELAY", "mean"),
+        OnTimeRate=("OnTime", "mean"),
+    ).reset_index()
+    summary["AvgArrivalDelay"] = summary["AvgArrivalDelay"].round(1)
+    summary["OnTimeRate"] = (summary["OnTimeRate"] * 100).round(1)
+    return summary.rename(columns={
+        "Airline_Name": "Airline",
+        "AvgArrivalDelay": "Avg Arrival Delay (min)",
+        "OnTimeRate": "On-Time %",
+    })
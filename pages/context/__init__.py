@@ -1,5 +1,6 @@
 """Context page module."""
 
 from .page import render_page
+from .visuals import warmup_tasks
 
-__all__ = ["render_page"]
+__all__ = ["render_page", "warmup_tasks"]
@@ -2,10 +2,22 @@
 
 from __future__ import annotations
 
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
 import pandas as pd
+import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from concurrent_render import chart_slot
+from figure_cache import cached_figure, dataset_fingerprint
+from filters import flight_cells
+from metrics import cache_data
+from partitions import month_rows
+from preprocess import lookup_by_key
+
 try:
     from theme import ACCENT_GREEN, ACCENT_ORANGE, PRIMARY_COLOR
 except ModuleNotFoundError:  # Standalone execution fallback
@@ -13,6 +25,10 @@ except ModuleNotFoundError:  # Standalone execution fallback
     ACCENT_GREEN = "#34D399"
     ACCENT_ORANGE = "#F97316"
 
+DISTANCES_UNAVAILABLE = (
+    "Distance traveled visualizations are unavailable: required columns are "
+    "missing in the dataset or airports reference.")
+
 
 def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
     """Show overview cards and a quick look at airline coverage."""
@@ -21,126 +37,170 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
         st.info("Load the dataset to explore its structure and coverage.")
         return
 
-    work_df = df.copy()
-    if not pd.api.types.is_datetime64_any_dtype(work_df["FL_DATE"]):
-        work_df["FL_DATE"] = pd.to_datetime(work_df["FL_DATE"])
-
-    total_flights = len(work_df)
-    unique_airlines = work_df["Airline_Name"].nunique()
-    unique_routes = (work_df["ORIGIN_AIRPORT"] + " → " +
-                     work_df["DEST_AIRPORT"]).nunique()
+    total_flights, unique_airlines, unique_routes = _build_overview_metrics(df)
 
     col1, col2, col3 = st.columns(3)
     col1.metric("Total flights", _format_int(total_flights))
     col2.metric("Unique airlines", _format_int(unique_airlines))
     col3.metric("Unique routes", _format_int(unique_routes))
 
+    # Finished figures are cached on disk by data fingerprint, so a repeat
+    # view skips the aggregation and the figure construction entirely.
+    fingerprint = dataset_fingerprint(df, airports_us)
+
     st.subheader("Overall performance snapshot")
-    waterfall_data = _build_performance_waterfall_data(work_df)
-    if waterfall_data is None:
-        st.info("Need August 2018 and January 2020 data to compute performance totals.")
-    else:
-        st.plotly_chart(
-            _render_performance_waterfall(*waterfall_data),
-            use_container_width=True,
-        )
+    chart_slot()(cached_figure(
+        fingerprint, "context.performance_waterfall",
+        lambda: _plot_performance_waterfall(_build_performance_waterfall_data(df))))
 
     st.caption("Metrics reflect the currently loaded dataset slice.")
 
+    # --- Distance Traveled Visualizations ---
+    fig_pie = cached_figure(
+        fingerprint, "context.distance_pie",
+        lambda: _plot_distance_pie(_build_airline_distances(df, airports_us)))
+    if isinstance(fig_pie, str):
+        st.info(fig_pie)
+        return
+    st.plotly_chart(fig_pie, use_container_width=True)
+    chart_slot()(cached_figure(
+        fingerprint, "context.distance_line",
+        lambda: _plot_distance_line(_build_airline_distances(df, airports_us))))
 
-<< << << < HEAD
- # --- Distance Traveled Visualizations ---
- import plotly.express as px
-  import numpy as np
-
-   # Only run if required columns for merge are present
-   if all(col in df.columns for col in ["ORIGIN_AIRPORT", "DEST_AIRPORT", "Airline_Name"]) and not airports_us.empty:
-        # Merge airport coordinates for origin
-        origin_cols = ["IATA", "Latitude", "Longitude"]
-        airports_origin = airports_us[origin_cols].rename(columns={
-            "IATA": "ORIGIN_AIRPORT",
-            "Latitude": "Origin_Latitude",
-            "Longitude": "Origin_Longitude"
-        })
-        dfnew = df.merge(airports_origin, on="ORIGIN_AIRPORT", how="left")
-        # Merge airport coordinates for destination
-        dest_cols = ["IATA", "Latitude", "Longitude"]
-        airports_dest = airports_us[dest_cols].rename(columns={
-            "IATA": "DEST_AIRPORT",
-            "Latitude": "Destination_Latitude",
-            "Longitude": "Destination_Longitude"
-        })
-        dfnew = dfnew.merge(airports_dest, on="DEST_AIRPORT", how="left")
-
-        def haversine_distance(lat1, lon1, lat2, lon2):
-            R = 6371  # Earth radius in km
-            lat1_rad = np.radians(lat1)
-            lon1_rad = np.radians(lon1)
-            lat2_rad = np.radians(lat2)
-            lon2_rad = np.radians(lon2)
-            dlat = lat2_rad - lat1_rad
-            dlon = lon2_rad - lon1_rad
-            a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * \
-                np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
-            c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
-            return R * c
-
-        # Calculate distance for each flight
-        dfnew["DISTANCE_TRAVELED"] = dfnew.apply(lambda row: haversine_distance(
-            row["Origin_Latitude"], row["Origin_Longitude"],
-            row["Destination_Latitude"], row["Destination_Longitude"]), axis=1)
-
-        # Pie chart: Top 10 airlines by total distance traveled
-        airline_distances = dfnew.groupby('Airline_Name')[
-            'DISTANCE_TRAVELED'].sum().reset_index()
-        airline_distances = airline_distances.sort_values(
-            by='DISTANCE_TRAVELED', ascending=False)
-        top_10_airlines = airline_distances.head(10)
-        others_distance = airline_distances.iloc[10:]['DISTANCE_TRAVELED'].sum(
-        )
-        others_row = pd.DataFrame(
-            [{'Airline_Name': 'Others', 'DISTANCE_TRAVELED': others_distance}])
-        pie_data_airlines = pd.concat([top_10_airlines, others_row])
-
-        pie_colors = [PRIMARY_COLOR, ACCENT_GREEN,
-                      ACCENT_ORANGE] + px.colors.qualitative.Plotly * 3
-        fig_pie = px.pie(
-            pie_data_airlines,
-            values='DISTANCE_TRAVELED',
-            names='Airline_Name',
-            title='Distribution of Distance Traveled by Airline (Top 10 + Others)',
-            labels={'Airline_Name': 'Airline Name',
-                    'DISTANCE_TRAVELED': 'Total Distance Traveled (km)'},
-            color_discrete_sequence=pie_colors
-        )
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_pie, use_container_width=True)
-
-        # Line chart: Total distance traveled by airline (all airlines)
-        fig_line = px.line(
-            airline_distances,
-            x='Airline_Name',
-            y='DISTANCE_TRAVELED',
-            title='Total Distance Traveled by Airline',
-            labels={'Airline_Name': 'Airline Name',
-                    'DISTANCE_TRAVELED': 'Total Distance Traveled (km)'},
-            markers=True,
-            color_discrete_sequence=[PRIMARY_COLOR]
-        )
-        fig_line.update_layout(xaxis_tickangle=-45)
-        st.plotly_chart(fig_line, use_container_width=True)
-    else:
-        st.info("Distance traveled visualizations are unavailable: required columns are missing in the dataset or airports reference.")
 
-== == == =
->>>>>> > 2d87f92f8ade310b0b4f0dbd74013cdbb40b6457
+def _plot_performance_waterfall(waterfall_data: Tuple[list, list, list] | None) -> go.Figure | str:
+    """Plot the performance waterfall, or explain why it is unavailable."""
+
+    if waterfall_data is None:
+        return "Need August 2018 and January 2020 data to compute performance totals."
+    return _render_performance_waterfall(*waterfall_data)
+
+
+def _plot_distance_pie(airline_distances: pd.DataFrame | None) -> go.Figure | str:
+    """Pie chart: top 10 airlines by total distance traveled plus the rest."""
+
+    if airline_distances is None:
+        return DISTANCES_UNAVAILABLE
+    top_10_airlines = airline_distances.head(10)
+    others_distance = airline_distances.iloc[10:]['DISTANCE_TRAVELED'].sum()
+    others_row = pd.DataFrame(
+        [{'Airline_Name': 'Others', 'DISTANCE_TRAVELED': others_distance}])
+    pie_data_airlines = pd.concat([top_10_airlines, others_row])
+
+    pie_colors = [PRIMARY_COLOR, ACCENT_GREEN,
+                  ACCENT_ORANGE] + px.colors.qualitative.Plotly * 3
+    fig_pie = px.pie(
+        pie_data_airlines,
+        values='DISTANCE_TRAVELED',
+        names='Airline_Name',
+        title='Distribution of Distance Traveled by Airline (Top 10 + Others)',
+        labels={'Airline_Name': 'Airline Name',
+                'DISTANCE_TRAVELED': 'Total Distance Traveled (km)'},
+        color_discrete_sequence=pie_colors
+    )
+    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+    return fig_pie
+
+
+def _plot_distance_line(airline_distances: pd.DataFrame | None) -> go.Figure | str:
+    """Line chart: total distance traveled by every airline."""
+
+    if airline_distances is None:
+        return DISTANCES_UNAVAILABLE
+    fig_line = px.line(
+        airline_distances,
+        x='Airline_Name',
+        y='DISTANCE_TRAVELED',
+        title='Total Distance Traveled by Airline',
+        labels={'Airline_Name': 'Airline Name',
+                'DISTANCE_TRAVELED': 'Total Distance Traveled (km)'},
+        markers=True,
+        color_discrete_sequence=[PRIMARY_COLOR]
+    )
+    fig_line.update_layout(xaxis_tickangle=-45)
+    return fig_line
+
+
+def export_datasets(df: pd.DataFrame, airports_us: pd.DataFrame) -> Dict[str, Callable[[], object]]:
+    """Return the downloadable datasets behind this page, built on demand."""
+
+    return {
+        "Overview metrics": lambda: pd.DataFrame(
+            [_build_overview_metrics(df)],
+            columns=["Total flights", "Unique airlines", "Unique routes"]),
+        "Airline distances": partial(_build_airline_distances, df, airports_us),
+        "Filtered flights": lambda: df,
+    }
+
+
+def warmup_tasks(df: pd.DataFrame, airports_us: pd.DataFrame) -> List[Tuple[str, Callable[[], object]]]:
+    """Return the cached builders this page calls, bound to the page inputs."""
+
+    return [
+        ("context.overview_metrics", partial(_build_overview_metrics, df)),
+        ("context.performance_waterfall",
+         partial(_build_performance_waterfall_data, df)),
+        ("context.airline_distances",
+         partial(_build_airline_distances, df, airports_us)),
+    ]
+
+
+@cache_data(show_spinner=False)
+def _build_overview_metrics(df: pd.DataFrame) -> Tuple[int, int, int]:
+    """Return total flights, distinct airlines and distinct routes."""
+
+    unique_routes = len(
+        df[["ORIGIN_AIRPORT", "DEST_AIRPORT"]].dropna().drop_duplicates())
+    return len(df), int(df["Airline_Name"].nunique()), unique_routes
+
+
+@cache_data(show_spinner=False)
+def _build_airline_distances(df: pd.DataFrame, airports_us: pd.DataFrame) -> pd.DataFrame | None:
+    """Return total great-circle distance flown per airline, largest first."""
+
+    # Only run if required columns for merge are present
+    if not all(col in df.columns for col in ["ORIGIN_AIRPORT", "DEST_AIRPORT", "Airline_Name"]) or airports_us.empty:
+        return None
+
+    # Look coordinates up by airport key instead of merging them onto every flight
+    coordinates = airports_us.set_index("IATA")
+    distance = _haversine_distance(
+        lookup_by_key(df["ORIGIN_AIRPORT"], coordinates["Latitude"]),
+        lookup_by_key(df["ORIGIN_AIRPORT"], coordinates["Longitude"]),
+        lookup_by_key(df["DEST_AIRPORT"], coordinates["Latitude"]),
+        lookup_by_key(df["DEST_AIRPORT"], coordinates["Longitude"]))
+
+    airline_distances = (
+        pd.Series(distance, index=df.index, name="DISTANCE_TRAVELED")
+        .groupby(df["Airline_Name"], observed=True).sum().reset_index()
+    )
+    return airline_distances.sort_values(
+        by='DISTANCE_TRAVELED', ascending=False)
+
+
+def _haversine_distance(lat1, lon1, lat2, lon2):
+    """Return great-circle distance in km; works element-wise on arrays."""
+
+    R = 6371  # Earth radius in km
+    lat1_rad = np.radians(lat1)
+    lon1_rad = np.radians(lon1)
+    lat2_rad = np.radians(lat2)
+    lon2_rad = np.radians(lon2)
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * \
+        np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return R * c
 
 
+@cache_data(show_spinner=False)
 def _build_performance_waterfall_data(df: pd.DataFrame):
     """Return chart inputs for combined on-time vs delayed waterfall."""
 
-    aug = df[(df["FL_DATE"].dt.year == 2018) & (df["FL_DATE"].dt.month == 8)]
-    jan = df[(df["FL_DATE"].dt.year == 2020) & (df["FL_DATE"].dt.month == 1)]
+    cells = flight_cells(df)
+    aug = month_rows(cells, "2018-08")
+    jan = month_rows(cells, "2020-01")
     if aug.empty and jan.empty:
         return None
 
@@ -169,12 +229,12 @@ def _build_performance_waterfall_data(df: pd.DataFrame):
     return x, y, measures
 
 
-def _calculate_period_metrics(data_df: pd.DataFrame, period_name: str) -> pd.DataFrame:
-    """Return delayed vs on-time counts for a period."""
+def _calculate_period_metrics(cells: pd.DataFrame, period_name: str) -> pd.DataFrame:
+    """Return delayed vs on-time counts for a period's flight cells."""
 
-    total_flights = len(data_df)
-    delayed = (data_df["DEP_DELAY"] > 0).sum()
-    on_time = (data_df["DEP_DELAY"] <= 0).sum()
+    total_flights = cells["Flights"].sum()
+    delayed = cells["DEP_DELAYED"].sum()
+    on_time = cells["DEP_ON_TIME"].sum()
     return pd.DataFrame(
         {
             "Period": [period_name] * 3,
@@ -5,7 +5,9 @@ from __future__ import annotations
 import pandas as pd
 import streamlit as st
 
-from .visuals import render_visuals
+from exports import render_downloads
+
+from .visuals import export_datasets, render_visuals
 
 
 def render_page(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
@@ -16,3 +18,4 @@ def render_page(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
         "Track where and when delays emerge, and compare weather-driven disruptions with other causes."
     )
     render_visuals(df, airports_us)
+    render_downloads(export_datasets(df, airports_us), key="delay")
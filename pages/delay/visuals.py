@@ -2,25 +2,104 @@
 
 from __future__ import annotations
 
-from typing import List, Sequence, Tuple
+from functools import partial
+from typing import Callable, Dict, List, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from anomalies import ANOMALY_WINDOW, RollingRobustZ, daily_means
+from concurrent_render import chart_slot, render_concurrently
+from downsampling import lttb_indices, minmax_indices
+from figure_cache import cached_figure, dataset_fingerprint
+from filters import flight_cells
+from metrics import cache_data
+from partitions import month_rows
+
 
 def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
     """Render the Delay Analysis visuals in Streamlit."""
 
-    st.plotly_chart(create_delay_map(df, airports_us), width="stretch")
-    dep_fig, arr_fig, meta = create_delay_period_comparison(df)
+    mode_col, month_col = st.columns(2)
+    map_mode = mode_col.radio(
+        "Delay map", DELAY_MAP_MODES, horizontal=True, key="delay_map_mode")
+    months = _delay_map_months(df)
+    month = None
+    if map_mode == "Day by day" and months:
+        month = month_col.selectbox(
+            "Month", months,
+            index=months.index(DELAY_ANIMATION_DEFAULT_MONTH)
+            if DELAY_ANIMATION_DEFAULT_MONTH in months else len(months) - 1,
+            key="delay_map_month")
+
+    # Placeholders first; the map, the period comparison and the delay range
+    # are built concurrently and fill their slots as they finish.
+    map_slot = chart_slot()
     st.subheader("Daily Average Delays: August 2018 vs January 2020")
+    left_col, right_col = st.columns((1.5, 1.2))
+    period_slot = left_col.empty()
+    range_slot = chart_slot(right_col)
+
+    def render_period(result: Tuple[go.Figure | None, go.Figure | None, dict]) -> None:
+        dep_fig, arr_fig, meta = result
+        if dep_fig is None or arr_fig is None:
+            period_slot.info(
+                "Insufficient records for the selected months to draw a comparison.")
+            return
+        with period_slot.container():
+            st.plotly_chart(dep_fig, use_container_width=True)
+            st.plotly_chart(arr_fig, use_container_width=True)
+            st.caption(
+                f"Derived from {meta['records']:,} flights across {meta['days']} observed days."
+            )
+
+    st.subheader("Delay timeline")
+    timeline_box = st.container()
+
+    def render_timeline(daily: pd.DataFrame) -> None:
+        with timeline_box:
+            _render_delay_timeline(daily)
+
+    st.subheader("Delay anomalies")
+    anomalies_box = st.container()
+
+    def render_anomalies(anomalies: pd.DataFrame) -> None:
+        with anomalies_box:
+            _render_delay_anomalies(anomalies)
+
+    fingerprint = dataset_fingerprint(df, airports_us)
+    if month is None:
+        build_map = partial(cached_figure, fingerprint, "delay.delay_map",
+                            lambda: create_delay_map(df, airports_us))
+    else:
+        build_map = partial(cached_figure, fingerprint, "delay.delay_animation",
+                            lambda: create_delay_animation(df, airports_us, month), month=month)
+    render_concurrently(
+        [
+            (build_map, map_slot),
+            (lambda: _style_period_comparison(
+                *create_delay_period_comparison(df)), render_period),
+            (partial(cached_figure, fingerprint, "delay.airline_delay_range",
+                     lambda: _plot_airline_delay_range(df)), range_slot),
+            (lambda: _build_daily_delay_aggregates(df), render_timeline),
+            (lambda: _build_delay_anomalies(df, airports_us), render_anomalies),
+        ]
+    )
+
+
+def _style_period_comparison(
+    dep_fig: go.Figure | None,
+    arr_fig: go.Figure | None,
+    meta: dict,
+) -> Tuple[go.Figure | None, go.Figure | None, dict]:
+    """Apply the page's legend placement to the period comparison charts."""
+
     if dep_fig is None or arr_fig is None:
-        st.info("Insufficient records for the selected months to draw a comparison.")
-        return
+        return dep_fig, arr_fig, meta
 
-    left_col, right_col = st.columns((1.5, 1.2))
     dep_fig.update_layout(
         legend=dict(
             orientation="h",
@@ -33,129 +112,188 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
         )
     )
     arr_fig.update_layout(showlegend=False)
+    return dep_fig, arr_fig, meta
 
-    with left_col:
-        st.plotly_chart(dep_fig, use_container_width=True)
-        st.plotly_chart(arr_fig, use_container_width=True)
-        st.caption(
-            f"Derived from {meta['records']:,} flights across {meta['days']} observed days."
-        )
 
-    with right_col:
-        _render_airline_delay_range(df)
+def export_datasets(df: pd.DataFrame, airports_us: pd.DataFrame) -> Dict[str, Callable[[], object]]:
+    """Return the downloadable datasets behind this page, built on demand."""
+
+    return {
+        "Daily delays by airline": partial(_build_daily_delay_aggregates, df),
+        "Airline delay range": partial(_build_airline_delay_range, df),
+        "Delay anomalies": partial(_build_delay_anomalies, df, airports_us),
+        "Filtered flights": lambda: df,
+    }
+
+
+def warmup_tasks(df: pd.DataFrame, airports_us: pd.DataFrame) -> List[Tuple[str, Callable[[], object]]]:
+    """Return the cached builders this page calls, bound to the page inputs."""
+
+    return [
+        ("delay.delay_map", partial(create_delay_map, df, airports_us)),
+        ("delay.period_comparison", partial(create_delay_period_comparison, df)),
+        ("delay.airline_delay_range", partial(_build_airline_delay_range, df)),
+        ("delay.daily_aggregates", partial(_build_daily_delay_aggregates, df)),
+        ("delay.anomalies", partial(_build_delay_anomalies, df, airports_us)),
+    ]
+
+
+DELAY_MAP_KINDS = ("Weather", "Non-Weather")
+DELAY_MAP_ALL_AIRLINES = "All airlines"
+DELAY_MAP_STATS = ["Total", "Avg", "Median"]
+
+
+def _delay_map_stats(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return weather and non-weather delay stats per origin airport, overall and per airline.
+
+    A flight with a weather delay counts towards "Weather" with that delay; any
+    other late arrival counts towards "Non-Weather" with its arrival delay.
+    Both kinds and every airline come out of one grouped pass over integer
+    cell keys; the overall view needs a second, as medians do not combine.
+    """
+
+    weather = df["WEATHER_DELAY"].fillna(0).to_numpy()
+    arrival = df["ARR_DELAY"].fillna(0).to_numpy()
+    is_weather = weather > 0
+    keep = (is_weather | (arrival > 0)) & df["ORIGIN_AIRPORT"].notna().to_numpy()
+    delays = pd.Series(np.where(is_weather, weather, arrival)[keep])
+    kind = np.where(is_weather, 0, 1)[keep]
+    airline, airlines = pd.factorize(df["Airline_Name"].array[keep], sort=True)
+    origin, origins = pd.factorize(df["ORIGIN_AIRPORT"].array[keep], sort=True)
+    kinds, airlines, origins = (np.asarray(DELAY_MAP_KINDS), np.asarray(airlines),
+                                np.asarray(origins))
+    aggregations = ["sum", "mean", "median"]
+
+    # Airline position 0 holds flights with no known airline, which only
+    # count towards the overall view.
+    shape = (len(kinds), len(airlines) + 1, max(len(origins), 1))
+    cells = delays.groupby(np.ravel_multi_index((kind, airline + 1, origin), shape)).agg(aggregations)
+    stats = cells.to_numpy()
+    kind_pos, airline_pos, origin_pos = np.unravel_index(cells.index.to_numpy(), shape)
+    known = airline_pos > 0
+    by_airline = pd.DataFrame({
+        "Kind": kinds[kind_pos[known]],
+        "Airline": airlines[airline_pos[known] - 1],
+        "ORIGIN_AIRPORT": origins[origin_pos[known]],
+        **dict(zip(DELAY_MAP_STATS, stats[known].T)),
+    })
+    shape = (shape[0], shape[2])
+    cells = delays.groupby(np.ravel_multi_index((kind, origin), shape)).agg(aggregations)
+    stats = cells.to_numpy()
+    kind_pos, origin_pos = np.unravel_index(cells.index.to_numpy(), shape)
+    overall = pd.DataFrame({
+        "Kind": kinds[kind_pos],
+        "ORIGIN_AIRPORT": origins[origin_pos],
+        **dict(zip(DELAY_MAP_STATS, stats.T)),
+    })
+    return overall, by_airline
+
+
+def _pack_delay_map_views(
+    layers: Sequence[pd.DataFrame],
+    by_airline: pd.DataFrame,
+    multiplier: int,
+) -> Dict[str, Dict[str, List[list]]]:
+    """Return each view's per-trace marker sizes (one list per metric) and hover values.
+
+    Every view keeps the traces' airports, so switching views only swaps sizes
+    and hover values. Sizes are whole-pixel areas scaled to the view's largest
+    airport; an airport a view has no delays at gets size 0 and empty hovers.
+    """
+
+    airlines = np.sort(by_airline["Airline"].unique())
+    names = [DELAY_MAP_ALL_AIRLINES, *airlines]
+    views = {name: {key: [] for key in (*DELAY_MAP_STATS, "customdata")} for name in names}
+    for kind, layer in zip(DELAY_MAP_KINDS, layers):
+        stats = np.full((len(names), len(layer), len(DELAY_MAP_STATS)), np.nan)
+        stats[0] = layer[DELAY_MAP_STATS].to_numpy()
+        rows = by_airline[by_airline["Kind"] == kind]
+        column = pd.Index(layer["ORIGIN_AIRPORT"]).get_indexer(rows["ORIGIN_AIRPORT"])
+        found = column >= 0
+        view = np.searchsorted(airlines, rows["Airline"].to_numpy()[found]) + 1
+        stats[view, column[found]] = rows[DELAY_MAP_STATS].to_numpy()[found]
+
+        largest = np.fmax.reduce(stats, axis=1, keepdims=True, initial=np.nan)
+        sizes = np.nan_to_num(np.rint(stats / largest * multiplier)).astype(int)
+        hover = np.concatenate([np.round(stats[..., :1]), np.round(stats[..., 1:], 1)], axis=2)
+        for position, name in enumerate(names):
+            for metric, key in enumerate(DELAY_MAP_STATS):
+                views[name][key].append(sizes[position, :, metric].tolist())
+            views[name]["customdata"].append(
+                [[None if value != value else value for value in point]
+                 for point in hover[position].tolist()])
+    return views
+
+
+def _map_colors() -> Tuple[str, str]:
+    """Return the page and plot background colours of the current theme."""
+
+    def _get_theme_color(key: str, fallback: str) -> str:
+        try:
+            return st.get_option(key) or fallback
+        except RuntimeError:
+            return fallback
 
+    return (_get_theme_color("theme.backgroundColor", "#0e1117"),
+            _get_theme_color("theme.secondaryBackgroundColor", "#1c1f24"))
 
+
+@cache_data(show_spinner=False)
 def create_delay_map(
     df: pd.DataFrame,
     airports_us: pd.DataFrame,
     marker_multiplier: int = 1500,
 ) -> go.Figure:
-    """Build a geospatial view comparing weather vs non-weather delays."""
+    """Build a geospatial view comparing weather vs non-weather delays.
 
-    df = df.copy()
-    df["WEATHER_DELAY"] = df["WEATHER_DELAY"].fillna(0)
-    df["ARR_DELAY"] = df["ARR_DELAY"].fillna(0)
+    An airline dropdown restyles the markers in the browser. Every airline's
+    view keeps the overall view's airports, so it only swaps marker sizes
+    (scaled to that airline's largest airport) and hover values.
+    """
 
-    df_weather = df[df["WEATHER_DELAY"] > 0].copy()
-    stats_weather = (
-        df_weather.groupby("ORIGIN_AIRPORT")["WEATHER_DELAY"]
-        .agg(["sum", "mean", "median"])
-        .reset_index()
-    )
-    stats_weather.columns = ["ORIGIN_AIRPORT", "Total", "Avg", "Median"]
-    map_weather = stats_weather.merge(
-        airports_us[["IATA", "Latitude", "Longitude", "Airport_Name"]],
-        left_on="ORIGIN_AIRPORT",
-        right_on="IATA",
-    )
+    overall, by_airline = _delay_map_stats(df)
+    airports = airports_us[["IATA", "Latitude", "Longitude", "Airport_Name"]]
+    layers = [
+        overall[overall["Kind"] == kind].merge(
+            airports, left_on="ORIGIN_AIRPORT", right_on="IATA").reset_index(drop=True)
+        for kind in DELAY_MAP_KINDS
+    ]
 
-    df_other = df[(df["ARR_DELAY"] > 0) & (df["WEATHER_DELAY"] == 0)].copy()
-    stats_other = (
-        df_other.groupby("ORIGIN_AIRPORT")["ARR_DELAY"]
-        .agg(["sum", "mean", "median"])
-        .reset_index()
-    )
-    stats_other.columns = ["ORIGIN_AIRPORT", "Total", "Avg", "Median"]
-    map_other = stats_other.merge(
-        airports_us[["IATA", "Latitude", "Longitude", "Airport_Name"]],
-        left_on="ORIGIN_AIRPORT",
-        right_on="IATA",
-    )
+    views = _pack_delay_map_views(layers, by_airline, marker_multiplier)
 
-    def get_size_list(dataset: pd.DataFrame, col: str, multiplier: int) -> List[float]:
-        if dataset.empty:
-            return []
-        values = dataset[col]
-        return (values / values.max() * multiplier).fillna(0).tolist()
-
-    w_lon = map_weather["Longitude"].tolist()
-    w_lat = map_weather["Latitude"].tolist()
-    w_txt = (map_weather["Airport_Name"] + "<br>Code: " +
-             map_weather["ORIGIN_AIRPORT"]).tolist()
-    w_custom = map_weather[["Total", "Avg", "Median"]].values
-    w_size_tot = get_size_list(map_weather, "Total", marker_multiplier)
-    w_size_avg = get_size_list(map_weather, "Avg", marker_multiplier)
-    w_size_med = get_size_list(map_weather, "Median", marker_multiplier)
-
-    o_lon = map_other["Longitude"].tolist()
-    o_lat = map_other["Latitude"].tolist()
-    o_txt = (map_other["Airport_Name"] + "<br>Code: " +
-             map_other["ORIGIN_AIRPORT"]).tolist()
-    o_custom = map_other[["Total", "Avg", "Median"]].values
-    o_size_tot = get_size_list(map_other, "Total", marker_multiplier)
-    o_size_avg = get_size_list(map_other, "Avg", marker_multiplier)
-    o_size_med = get_size_list(map_other, "Median", marker_multiplier)
+    def metric_buttons(packed: Dict[str, List[list]]) -> List[dict]:
+        return [
+            dict(label=label, method="restyle", args=[{"marker.size": packed[col]}, [0, 1]])
+            for label, col in (("Median", "Median"), ("Average", "Avg"), ("Total", "Total"))
+        ]
 
     fig = go.Figure()
-
-    def _get_theme_color(key: str, fallback: str) -> str:
-        try:
-            return st.get_option(key) or fallback
-        except RuntimeError:
-            return fallback
-
-    bg_color = _get_theme_color("theme.backgroundColor", "#0e1117")
-    plot_color = _get_theme_color("theme.secondaryBackgroundColor", "#1c1f24")
-
-    fig.add_trace(
-        go.Scattergeo(
-            lon=w_lon,
-            lat=w_lat,
-            text=w_txt,
-            visible=True,
-            name="Weather Delays",
-            marker=dict(
-                size=w_size_tot,
-                color="#F4A261",
-                opacity=0.85,
-                sizemode="area",
-                line_width=0.4,
-                line_color="#6D6875",
-            ),
-            customdata=w_custom,
-            hovertemplate="<b>%{text}</b><br>Total: %{customdata[0]:,.0f}m\n<br>Avg: %{customdata[1]:.1f}m\n<br>Med: %{customdata[2]:.1f}m<extra></extra>",
-        )
-    )
-
-    fig.add_trace(
-        go.Scattergeo(
-            lon=o_lon,
-            lat=o_lat,
-            text=o_txt,
-            visible=False,
-            name="Non-Weather Delays",
-            marker=dict(
-                size=o_size_tot,
-                color="#87A8A4",
-                opacity=0.85,
-                sizemode="area",
-                line_width=0.4,
-                line_color="#6D6875",
-            ),
-            customdata=o_custom,
-            hovertemplate="<b>%{text}</b><br>Total: %{customdata[0]:,.0f}m\n<br>Avg: %{customdata[1]:.1f}m\n<br>Med: %{customdata[2]:.1f}m<extra></extra>",
+    bg_color, plot_color = _map_colors()
+
+    default = views[DELAY_MAP_ALL_AIRLINES]
+    for position, (layer, name, color) in enumerate(zip(
+        layers, ("Weather Delays", "Non-Weather Delays"), ("#F4A261", "#87A8A4"),
+    )):
+        fig.add_trace(
+            go.Scattergeo(
+                lon=layer["Longitude"].tolist(),
+                lat=layer["Latitude"].tolist(),
+                text=(layer["Airport_Name"] + "<br>Code: " +
+                      layer["ORIGIN_AIRPORT"].astype(str)).tolist(),
+                visible=position == 0,
+                name=name,
+                marker=dict(
+                    size=default["Total"][position],
+                    color=color,
+                    opacity=0.85,
+                    sizemode="area",
+                    line_width=0.4,
+                    line_color="#6D6875",
+                ),
+                customdata=default["customdata"][position],
+                hovertemplate="<b>%{text}</b><br>Total: %{customdata[0]:,.0f}m\n<br>Avg: %{customdata[1]:.1f}m\n<br>Med: %{customdata[2]:.1f}m<extra></extra>",
+            )
         )
-    )
 
     fig.update_layout(
         height=600,
@@ -205,22 +343,32 @@ def create_delay_map(
                 bgcolor="rgba(255, 255, 255, 0.9)",
                 active=2,
                 font=dict(color="black"),
+                buttons=metric_buttons(default),
+            ),
+            # Choosing an airline shows its totals and points the metric
+            # buttons above at that airline's sizes.
+            dict(
+                type="dropdown",
+                direction="down",
+                x=0.99,
+                y=1.0,
+                xanchor="right",
+                yanchor="top",
+                bgcolor="rgba(255, 255, 255, 0.9)",
+                active=0,
+                font=dict(color="black"),
                 buttons=[
                     dict(
-                        label="Median",
-                        method="restyle",
-                        args=[{"marker.size": [w_size_med, o_size_med]}, [0, 1]],
-                    ),
-                    dict(
-                        label="Average",
-                        method="restyle",
-                        args=[{"marker.size": [w_size_avg, o_size_avg]}, [0, 1]],
-                    ),
-                    dict(
-                        label="Total",
-                        method="restyle",
-                        args=[{"marker.size": [w_size_tot, o_size_tot]}, [0, 1]],
-                    ),
+                        label=airline,
+                        method="update",
+                        args=[
+                            {"marker.size": packed["Total"], "customdata": packed["customdata"]},
+                            {"updatemenus[1].active": 2,
+                             "updatemenus[1].buttons": metric_buttons(packed)},
+                            [0, 1],
+                        ],
+                    )
+                    for airline, packed in views.items()
                 ],
             ),
         ],
@@ -229,6 +377,136 @@ def create_delay_map(
     return fig
 
 
+DELAY_MAP_MODES = ("Totals", "Day by day")
+DELAY_ANIMATION_DEFAULT_MONTH = "2020-01"
+DELAY_ANIMATION_MAX_MARKER = 45
+DELAY_ANIMATION_FRAME_MS = 600
+
+
+def _delay_map_months(df: pd.DataFrame) -> List[str]:
+    """Return every month from the first to the last flight as ``"YYYY-MM"``."""
+
+    if df.empty:
+        return []
+    return [str(month) for month in pd.period_range(df["FL_DATE"].min(), df["FL_DATE"].max(), freq="M")]
+
+
+@cache_data(show_spinner=False)
+def create_delay_animation(
+    df: pd.DataFrame,
+    airports_us: pd.DataFrame,
+    month: str = DELAY_ANIMATION_DEFAULT_MONTH,
+) -> go.Figure | str:
+    """Build a day-by-day replay of arrival delay minutes per origin airport in ``month``.
+
+    Daily totals come from one ``bincount`` over (day, airport) keys. Marker
+    positions live in the base trace; each frame carries only that day's
+    sizes, as an int32 array of delay minutes. ``sizeref`` scales them to
+    the month's worst airport-day, so hovers show the minutes themselves.
+    """
+
+    rows = month_rows(df, month)
+    delays = rows["ARR_DELAY"].fillna(0).to_numpy()
+    late = delays > 0
+    airport, airports = pd.factorize(rows["ORIGIN_AIRPORT"].array[late], sort=True)
+    known = airport >= 0
+    if not known.any():
+        return f"No delayed flights in {month} to animate."
+
+    first = np.datetime64(pd.Period(month, "M").start_time.date(), "D")
+    day = (pd.to_datetime(rows["FL_DATE"]).to_numpy()[late].astype("datetime64[D]") - first).astype(np.int64)
+    n_days = pd.Period(month, "M").days_in_month
+    minutes = np.bincount(
+        day[known] * len(airports) + airport[known],
+        weights=delays[late][known],
+        minlength=n_days * len(airports),
+    ).reshape(n_days, len(airports))
+
+    located = pd.DataFrame({"IATA": np.asarray(airports), "position": np.arange(len(airports))}).merge(
+        airports_us[["IATA", "Latitude", "Longitude", "Airport_Name"]], on="IATA")
+    minutes = np.rint(minutes[:, located["position"].to_numpy()]).astype(np.int32)
+    dates = pd.date_range(first, periods=n_days, freq="D")
+    labels = [date.strftime("%b %d") for date in dates]
+
+    largest = max(int(minutes.max()), 1)
+    bg_color, plot_color = _map_colors()
+    fig = go.Figure(
+        go.Scattergeo(
+            lon=located["Longitude"].to_numpy(),
+            lat=located["Latitude"].to_numpy(),
+            text=(located["Airport_Name"] + "<br>Code: " + located["IATA"]).tolist(),
+            name="Arrival delay minutes",
+            marker=dict(
+                size=minutes[0],
+                sizemode="area",
+                sizeref=2.0 * largest / DELAY_ANIMATION_MAX_MARKER ** 2,
+                color="#E76F51",
+                opacity=0.8,
+                line_width=0.4,
+                line_color="#6D6875",
+            ),
+            hovertemplate="<b>%{text}</b><br>Delay minutes: %{marker.size:,}<extra></extra>",
+        ),
+        frames=[
+            go.Frame(name=label, data=[go.Scattergeo(marker=dict(size=sizes))], traces=[0])
+            for label, sizes in zip(labels, minutes)
+        ],
+    )
+
+    play = dict(frame=dict(duration=DELAY_ANIMATION_FRAME_MS, redraw=True),
+                transition=dict(duration=0), fromcurrent=True, mode="immediate")
+    fig.update_layout(
+        height=600,
+        title=dict(text=f"Daily arrival delay minutes, {pd.Period(month, 'M').strftime('%B %Y')}",
+                   y=0.98, x=0.5, xanchor="center"),
+        geo=dict(
+            scope="usa",
+            projection_type="albers usa",
+            showland=True,
+            landcolor="rgb(230, 230, 230)",
+            bgcolor=plot_color,
+        ),
+        margin=dict(t=30, l=0, r=0, b=0),
+        paper_bgcolor=bg_color,
+        plot_bgcolor=plot_color,
+        updatemenus=[
+            dict(
+                type="buttons",
+                direction="left",
+                x=0.01,
+                y=0.01,
+                xanchor="left",
+                yanchor="bottom",
+                bgcolor="rgba(255, 255, 255, 0.9)",
+                font=dict(color="black"),
+                showactive=False,
+                buttons=[
+                    dict(label="Play", method="animate", args=[None, play]),
+                    dict(label="Pause", method="animate",
+                         args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")]),
+                ],
+            ),
+        ],
+        sliders=[
+            dict(
+                active=0,
+                x=0.12,
+                len=0.86,
+                y=0.0,
+                yanchor="top",
+                currentvalue=dict(prefix="Day: "),
+                steps=[
+                    dict(label=label, method="animate",
+                         args=[[label], dict(play, frame=dict(duration=0, redraw=True))])
+                    for label in labels
+                ],
+            ),
+        ],
+    )
+    return fig
+
+
+@cache_data(show_spinner=False)
 def create_delay_period_comparison(
     df: pd.DataFrame,
     periods: Sequence[str] = ("2018-08", "2020-01"),
@@ -238,24 +516,29 @@ def create_delay_period_comparison(
     if df.empty:
         return None, None, {"records": 0, "days": 0}
 
-    work_df = df.copy()
-    if not pd.api.types.is_datetime64_any_dtype(work_df["FL_DATE"]):
-        work_df["FL_DATE"] = pd.to_datetime(work_df["FL_DATE"])
-
-    work_df["Period"] = work_df["FL_DATE"].dt.to_period("M").astype(str)
-    work_df["day_of_month"] = work_df["FL_DATE"].dt.day
-    filtered = work_df[work_df["Period"].isin(periods)]
-    if filtered.empty:
+    # Only the compared months are touched: each is a date-ordered slice of
+    # the (day, airline, state) cells, whose delay totals add up per day.
+    cells = flight_cells(df)
+    months = [(period, month_rows(cells, period)) for period in periods]
+    filtered = pd.concat(
+        [rows.assign(Period=period, day_of_month=rows["FL_DATE"].dt.day)
+         for period, rows in months],
+        ignore_index=True,
+    )
+    if not filtered["Flights"].sum():
         return None, None, {"records": 0, "days": 0}
 
-    daily = (
-        filtered.groupby(["Period", "day_of_month"], dropna=False)
-        .aggregate(
-            DEP_DELAY=("DEP_DELAY", "mean"),
-            ARR_DELAY=("ARR_DELAY", "mean"),
-        )
-        .reset_index()
+    totals = filtered.groupby(["Period", "day_of_month"]).agg(
+        Flights=("Flights", "sum"),
+        DEP_DELAY_SUM=("DEP_DELAY_SUM", "sum"),
+        DEP_DELAY_COUNT=("DEP_DELAY_COUNT", "sum"),
+        ARR_DELAY_SUM=("ARR_DELAY_SUM", "sum"),
+        ARR_DELAY_COUNT=("ARR_DELAY_COUNT", "sum"),
     )
+    daily = pd.DataFrame({
+        "DEP_DELAY": totals["DEP_DELAY_SUM"] / totals["DEP_DELAY_COUNT"].replace(0, np.nan),
+        "ARR_DELAY": totals["ARR_DELAY_SUM"] / totals["ARR_DELAY_COUNT"].replace(0, np.nan),
+    }).reset_index()
 
     color_map = {periods[0]: "skyblue", periods[-1]: "salmon"}
 
@@ -286,18 +569,17 @@ def create_delay_period_comparison(
         tickmode="linear", dtick=1, range=[0.5, 31.5]))
 
     return dep_fig, arr_fig, {
-        "records": len(filtered),
+        "records": int(totals["Flights"].sum()),
         "days": daily["day_of_month"].nunique(),
     }
 
 
-def _render_airline_delay_range(df: pd.DataFrame) -> None:
+def _plot_airline_delay_range(df: pd.DataFrame) -> go.Figure | str:
     """Plot min/max departure delay per airline."""
 
     delay_range = _build_airline_delay_range(df)
     if delay_range.empty:
-        st.info("Not enough delay data to chart airline ranges.")
-        return
+        return "Not enough delay data to chart airline ranges."
 
     traces = []
     for _, row in delay_range.iterrows():
@@ -323,9 +605,10 @@ def _render_airline_delay_range(df: pd.DataFrame) -> None:
         height=len(delay_range) * 25 + 200,
         margin=dict(l=80, r=20, t=50, b=20),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
+@cache_data(show_spinner=False)
 def _build_airline_delay_range(df: pd.DataFrame) -> pd.DataFrame:
     """Compute min and max departure delay per airline sorted by max delay."""
 
@@ -337,9 +620,229 @@ def _build_airline_delay_range(df: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame()
 
     summary = (
-        work_df.groupby("Airline_Name")["DEP_DELAY"]
+        work_df.groupby("Airline_Name", observed=True)["DEP_DELAY"]
         .agg(["min", "max"])
         .reset_index()
         .sort_values("max", ascending=False)
     )
     return summary
+
+
+TIMELINE_METRICS = {"Departure": "DEP_DELAY", "Arrival": "ARR_DELAY"}
+TIMELINE_METHODS = ("LTTB", "Min/max buckets")
+
+
+@cache_data(show_spinner=False)
+def _build_daily_delay_aggregates(df: pd.DataFrame) -> pd.DataFrame:
+    """Return flights and summed delays per day and airline.
+
+    One row per (day, airline) keeps years of history small enough to slice
+    and downsample on every interaction without touching the flight frame.
+    """
+
+    if df.empty:
+        return pd.DataFrame()
+
+    return (
+        flight_cells(df).groupby(["FL_DATE", "Airline_Name"], observed=True)
+        .agg(
+            Flights=("Flights", "sum"),
+            DEP_DELAY=("DEP_DELAY_SUM", "sum"),
+            ARR_DELAY=("ARR_DELAY_SUM", "sum"),
+        )
+        .reset_index()
+    )
+
+
+def create_delay_timeline(
+    daily: pd.DataFrame,
+    metric: str = "ARR_DELAY",
+    airlines: Sequence[str] = (),
+    window: Tuple[pd.Timestamp, pd.Timestamp] | None = None,
+    max_points: int = 500,
+    method: str = TIMELINE_METHODS[0],
+) -> Tuple[go.Figure, int, int]:
+    """Plot daily average delay for all airlines plus each selected airline.
+
+    Only the visible ``window`` is considered and every line is reduced to
+    about ``max_points`` points, so the payload is bounded by the number of
+    lines rather than the length of the history. Narrowing the window brings
+    back detail down to one point per day. Returns the figure and the number
+    of points drawn versus available.
+    """
+
+    if window is not None:
+        start, end = pd.Timestamp(window[0]), pd.Timestamp(window[1])
+        daily = daily[(daily["FL_DATE"] >= start) & (daily["FL_DATE"] <= end)]
+
+    series = [("All airlines", daily.groupby("FL_DATE")[["Flights", metric]].sum())]
+    selected = daily[daily["Airline_Name"].isin(airlines)]
+    for airline, group in selected.groupby("Airline_Name", observed=True):
+        series.append((airline, group.set_index("FL_DATE")[["Flights", metric]]))
+
+    fig = go.Figure()
+    drawn = available = 0
+    for name, data in series:
+        dates = data.index.to_numpy()
+        values = (data[metric] / data["Flights"]).to_numpy(dtype=float)
+        if method == TIMELINE_METHODS[1]:
+            keep = minmax_indices(values, max(max_points // 2, 1))
+        else:
+            keep = lttb_indices(dates.astype("datetime64[D]").astype("int64"),
+                                values, max_points)
+        drawn += len(keep)
+        available += len(values)
+        fig.add_trace(
+            go.Scattergl(
+                x=dates[keep],
+                y=values[keep].round(2),
+                mode="lines",
+                name=name,
+                line=dict(width=2.5 if name == "All airlines" else 1.2),
+                hovertemplate="%{x|%Y-%m-%d}<br>%{y:.1f} min<extra>"
+                + name + "</extra>",
+            )
+        )
+
+    label = next(k for k, v in TIMELINE_METRICS.items() if v == metric)
+    fig.update_layout(
+        title=f"Daily Average {label} Delay",
+        xaxis_title="Date",
+        yaxis_title=f"Avg {label.lower()} delay (min)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0),
+        height=450,
+    )
+    return fig, drawn, available
+
+
+def _render_delay_timeline(daily: pd.DataFrame) -> None:
+    """Draw the timeline controls and the downsampled chart."""
+
+    if daily.empty:
+        st.info("No flights available to build a delay timeline.")
+        return
+
+    metric_col, method_col, points_col = st.columns(3)
+    metric = metric_col.radio(
+        "Delay", list(TIMELINE_METRICS), index=1, horizontal=True,
+        key="delay_timeline_metric")
+    method = method_col.selectbox(
+        "Downsampling", TIMELINE_METHODS, key="delay_timeline_method")
+    max_points = points_col.slider(
+        "Points per line", 100, 2000, 500, step=100, key="delay_timeline_points")
+
+    by_volume = (
+        daily.groupby("Airline_Name", observed=True)["Flights"].sum()
+        .sort_values(ascending=False).index.tolist()
+    )
+    airlines = st.multiselect(
+        "Airlines", by_volume, default=by_volume[:3], key="delay_timeline_airlines")
+
+    first = daily["FL_DATE"].min().date()
+    last = daily["FL_DATE"].max().date()
+    window = (first, last)
+    if first < last:
+        window = st.slider(
+            "Zoom window", min_value=first, max_value=last, value=(first, last),
+            key="delay_timeline_window")
+
+    fig, drawn, available = create_delay_timeline(
+        daily, TIMELINE_METRICS[metric], airlines, window, max_points, method)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"Showing {drawn:,} of {available:,} daily points; narrow the window for more detail."
+    )
+
+
+ANOMALY_MIN_FLIGHTS = 20
+ANOMALY_MIN_Z = 3.0
+ANOMALY_TABLE_ROWS = 50
+ANOMALY_KINDS = {"Airports and airlines": None, "Airports": "Airport", "Airlines": "Airline"}
+
+
+@cache_data(show_spinner=False)
+def _build_delay_anomalies(df: pd.DataFrame, airports_us: pd.DataFrame) -> pd.DataFrame:
+    """Return airport and airline days with abnormally high average arrival delay.
+
+    Daily means for every origin airport and every airline form one matrix
+    that ``RollingRobustZ`` scores in a single pass. Days with fewer than
+    ``ANOMALY_MIN_FLIGHTS`` flights are skipped, and only days scoring at
+    least ``ANOMALY_MIN_Z`` are kept, most anomalous first.
+    """
+
+    if df.empty:
+        return pd.DataFrame()
+
+    days = pd.to_datetime(df["FL_DATE"]).to_numpy().astype("datetime64[D]")
+    first = days.min()
+    day = (days - first).astype(np.int64)
+    n_days = int(day.max()) + 1
+    delay = df["ARR_DELAY"].to_numpy(dtype=float, na_value=np.nan)
+    airport_names = airports_us.set_index("IATA")["Airport_Name"].to_dict()
+
+    kinds, labels, means, counts = [], [], [], []
+    for kind, column in (("Airport", "ORIGIN_AIRPORT"), ("Airline", "Airline_Name")):
+        codes, uniques = pd.factorize(df[column])
+        mean, count = daily_means(
+            day, codes, delay, n_days, len(uniques), ANOMALY_MIN_FLIGHTS)
+        kinds += [kind] * len(uniques)
+        labels += [
+            f"{value} — {airport_names[value]}" if value in airport_names else str(value)
+            for value in uniques
+        ]
+        means.append(mean)
+        counts.append(count)
+
+    matrix, counts = np.hstack(means), np.hstack(counts)
+    z, baseline, _ = RollingRobustZ(matrix.shape[1]).update(matrix)
+    with np.errstate(invalid="ignore"):
+        flagged_day, flagged = np.nonzero(z >= ANOMALY_MIN_Z)
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(first + flagged_day.astype("timedelta64[D]")),
+            "Kind": np.asarray(kinds)[flagged],
+            "Name": np.asarray(labels, dtype=object)[flagged],
+            "Flights": counts[flagged_day, flagged],
+            "Avg Arrival Delay (min)": matrix[flagged_day, flagged].round(1),
+            "Baseline (min)": baseline[flagged_day, flagged].round(1),
+            "Robust z": z[flagged_day, flagged].round(1),
+        }
+    ).sort_values("Robust z", ascending=False, ignore_index=True)
+
+
+def _render_delay_anomalies(anomalies: pd.DataFrame) -> None:
+    """Draw the anomaly controls, the flagged-day chart and its table."""
+
+    if anomalies.empty:
+        st.info("No abnormal delay days found for the selected flights.")
+        return
+
+    kind_col, threshold_col = st.columns(2)
+    kind = kind_col.radio(
+        "Show", list(ANOMALY_KINDS), horizontal=True, key="delay_anomaly_kind")
+    threshold = threshold_col.slider(
+        "Robust z-score at least", ANOMALY_MIN_Z, 10.0, 4.0, step=0.5,
+        key="delay_anomaly_threshold")
+
+    shown = anomalies[anomalies["Robust z"] >= threshold]
+    if ANOMALY_KINDS[kind] is not None:
+        shown = shown[shown["Kind"] == ANOMALY_KINDS[kind]]
+    if shown.empty:
+        st.info("No days reach this score; lower the threshold to see more.")
+        return
+
+    fig = px.scatter(
+        shown,
+        x="Date",
+        y="Robust z",
+        color="Kind",
+        size="Flights",
+        hover_name="Name",
+        hover_data={"Avg Arrival Delay (min)": True, "Baseline (min)": True, "Flights": True},
+        title=f"{len(shown):,} flagged days",
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(shown.head(ANOMALY_TABLE_ROWS), width="stretch", hide_index=True)
+    st.caption(
+        f"Each day's average arrival delay is compared with the median of the previous {ANOMALY_WINDOW} days for the same airport or airline, scaled by their median absolute deviation. Days with fewer than {ANOMALY_MIN_FLIGHTS} flights are skipped."
+    )
@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
 
+from concurrent_render import chart_slot, render_concurrently
+from figure_cache import cached_figure, dataset_fingerprint
+from filters import flight_cells
+from metrics import cache_data
+from partitions import month_rows
+from preprocess import lookup_by_key
 from theme import COLOR_SEQUENCE, PRIMARY_COLOR
 
 BLUE_GRADIENT = [
@@ -24,6 +33,13 @@ BLUE_GRADIENT = [
     "#CCE0F5",
 ]
 
+ROUTE_FLOW_WEIGHTS = {"Flights": "Flights", "Delay minutes": "DelayMinutes"}
+ROUTE_FLOW_MIN = 25
+ROUTE_FLOW_DEFAULT = 250
+ROUTE_FLOW_MAX = 5000
+# Edges are drawn as a few line traces of increasing width, heaviest last.
+ROUTE_FLOW_WIDTHS = (0.6, 1.2, 2.0, 3.2)
+
 
 def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
     """Render flight volume charts."""
@@ -32,82 +48,134 @@ def render_visuals(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
         st.info("No flight records available to analyze volumes.")
         return
 
-    work_df = df.copy()
-    if not pd.api.types.is_datetime64_any_dtype(work_df["FL_DATE"]):
-        work_df["FL_DATE"] = pd.to_datetime(work_df["FL_DATE"])
-
+    # Lay out every placeholder first; the charts are built concurrently and
+    # dropped into their slots as they finish.
     st.subheader("Top airports & airlines")
     airports_col, airlines_col = st.columns(2)
-    with airports_col:
-        _render_busiest_airports(work_df, airports_us)
-    with airlines_col:
-        _render_airline_snapshot(work_df)
+    busiest_slot = chart_slot(airports_col)
+    snapshot_slot = chart_slot(airlines_col)
 
     st.subheader("Day-of-week distribution")
-    work_df["Day"] = work_df["FL_DATE"].dt.day_name()
-    day_counts = (
-        work_df.groupby("Day").size().reindex(
-            [
-                "Monday",
-                "Tuesday",
-                "Wednesday",
-                "Thursday",
-                "Friday",
-                "Saturday",
-                "Sunday",
-            ]
-        )
-    )
-    day_counts = day_counts.dropna().reset_index(name="Flights")
-    if day_counts.empty:
-        st.info("Cannot compute day-of-week distribution for this slice of data.")
-    else:
-        fig = px.area(
-            day_counts,
-            x="Day",
-            y="Flights",
-            title="Flights by day of week",
-            color_discrete_sequence=[PRIMARY_COLOR],
-        )
-        st.plotly_chart(fig, use_container_width=True)
+    day_slot = chart_slot()
 
     st.subheader("Airline & state comparison")
-    airlines_data = _build_airline_comparison(work_df)
-    states_data = _build_state_comparison(work_df, airports_us)
-    if airlines_data.empty and states_data.empty:
-        st.info(
-            "Need August 2018 and January 2020 data to compare airlines and states.")
-    else:
+    comparison = st.empty()
+    with comparison.container():
         left, right = st.columns(2)
-        with left:
-            _render_airline_period_chart(airlines_data)
-        with right:
-            _render_state_period_chart(states_data)
+    airline_slot = chart_slot(left)
+    state_slot = chart_slot(right)
 
     st.subheader("Airline volume shift Sankey")
-    sankey_result = _build_airline_sankey_data(work_df)
-    if sankey_result is None:
-        st.info("Need both August 2018 and January 2020 data to build the Sankey view.")
-    else:
-        fig = _render_airline_sankey(*sankey_result)
-        st.plotly_chart(fig, use_container_width=True)
+    sankey_slot = chart_slot()
+
+    st.subheader("Route flows")
+    routes_box = st.container()
+
+    # Finished figures are cached on disk by data fingerprint, so a repeat
+    # view skips the aggregation and the figure construction entirely.
+    fingerprint = dataset_fingerprint(df, airports_us)
+
+    def render_routes(routes: pd.DataFrame) -> None:
+        with routes_box:
+            _render_route_flows(routes, fingerprint)
+
+    results = render_concurrently(
+        [
+            (partial(cached_figure, fingerprint, "volume.busiest_airports",
+                     lambda: _plot_busiest_airports(
+                         _build_busiest_airports(df, airports_us), airports_us)), busiest_slot),
+            (partial(cached_figure, fingerprint, "volume.airline_snapshot",
+                     lambda: _plot_airline_snapshot(_build_airline_snapshot(df))), snapshot_slot),
+            (partial(cached_figure, fingerprint, "volume.day_of_week",
+                     lambda: _plot_day_of_week(_build_day_of_week_counts(df))), day_slot),
+            (partial(cached_figure, fingerprint, "volume.airline_comparison",
+                     lambda: _plot_airline_period_chart(_build_airline_comparison(df))), airline_slot),
+            (partial(cached_figure, fingerprint, "volume.state_comparison",
+                     lambda: _plot_state_period_chart(
+                         _build_state_comparison(df, airports_us))), state_slot),
+            (partial(cached_figure, fingerprint, "volume.airline_sankey",
+                     lambda: _plot_airline_sankey(_build_airline_sankey_data(df))), sankey_slot),
+            (lambda: _build_route_flows(df, airports_us), render_routes),
+        ]
+    )
+    if isinstance(results[3], str) and isinstance(results[4], str):
+        comparison.info(
+            "Need August 2018 and January 2020 data to compare airlines and states.")
+
+
+def export_datasets(df: pd.DataFrame, airports_us: pd.DataFrame) -> Dict[str, Callable[[], object]]:
+    """Return the downloadable datasets behind this page, built on demand."""
+
+    return {
+        "Busiest airports": partial(_build_busiest_airports, df, airports_us),
+        "Flights by airline": partial(_build_airline_snapshot, df),
+        "Flights by day of week": partial(_build_day_of_week_counts, df),
+        "Airline comparison": partial(_build_airline_comparison, df),
+        "State comparison": partial(_build_state_comparison, df, airports_us),
+        "Route flows": partial(_build_route_flows, df, airports_us),
+        "Filtered flights": lambda: df,
+    }
+
+
+def warmup_tasks(df: pd.DataFrame, airports_us: pd.DataFrame) -> List[Tuple[str, Callable[[], object]]]:
+    """Return the cached builders this page calls, bound to the page inputs."""
+
+    return [
+        ("volume.busiest_airports",
+         partial(_build_busiest_airports, df, airports_us)),
+        ("volume.airline_snapshot", partial(_build_airline_snapshot, df)),
+        ("volume.day_of_week", partial(_build_day_of_week_counts, df)),
+        ("volume.airline_comparison", partial(_build_airline_comparison, df)),
+        ("volume.state_comparison",
+         partial(_build_state_comparison, df, airports_us)),
+        ("volume.airline_sankey", partial(_build_airline_sankey_data, df)),
+        ("volume.route_flows", partial(_build_route_flows, df, airports_us)),
+    ]
+
 
+@cache_data(show_spinner=False)
+def _build_day_of_week_counts(df: pd.DataFrame) -> pd.DataFrame:
+    """Return flights per weekday in Monday-to-Sunday order."""
 
+    cells = flight_cells(df)
+    counts = np.bincount(cells["FL_DATE"].dt.dayofweek.to_numpy(),
+                         weights=cells["Flights"].to_numpy(), minlength=7).astype(np.int64)
+    day_counts = pd.DataFrame({
+        "Day": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+        "Flights": counts,
+    })
+    return day_counts[day_counts["Flights"] > 0].reset_index(drop=True)
+
+
+def _plot_day_of_week(day_counts: pd.DataFrame) -> go.Figure | str:
+    """Plot the weekday distribution as an area chart."""
+
+    if day_counts.empty:
+        return "Cannot compute day-of-week distribution for this slice of data."
+    return px.area(
+        day_counts,
+        x="Day",
+        y="Flights",
+        title="Flights by day of week",
+        color_discrete_sequence=[PRIMARY_COLOR],
+    )
+
+
+@cache_data(show_spinner=False)
 def _build_airline_comparison(df: pd.DataFrame) -> pd.DataFrame:
     """Return airline totals for August 2018 vs January 2020."""
 
     if df.empty:
         return pd.DataFrame()
+    cells = flight_cells(df)
 
-    aug_2018 = df[(df["FL_DATE"].dt.year == 2018)
-                  & (df["FL_DATE"].dt.month == 8)]
-    jan_2020 = df[(df["FL_DATE"].dt.year == 2020)
-                  & (df["FL_DATE"].dt.month == 1)]
+    aug_2018 = month_rows(cells, "2018-08")
+    jan_2020 = month_rows(cells, "2020-01")
     if aug_2018.empty and jan_2020.empty:
         return pd.DataFrame()
 
     def _summarize(data: pd.DataFrame, label: str) -> pd.DataFrame:
-        counts = data.groupby("Airline_Name").size(
+        counts = data.groupby("Airline_Name", observed=True)["Flights"].sum(
         ).reset_index(name="Total_Flights")
         counts["Period"] = label
         return counts
@@ -120,18 +188,17 @@ def _build_airline_comparison(df: pd.DataFrame) -> pd.DataFrame:
 
     combined = pd.concat(frames, ignore_index=True)
     top_airlines = (
-        combined.groupby("Airline_Name")[
+        combined.groupby("Airline_Name", observed=True)[
             "Total_Flights"].sum().nlargest(10).index
     )
     return combined[combined["Airline_Name"].isin(top_airlines)]
 
 
-def _render_airline_period_chart(data: pd.DataFrame) -> None:
+def _plot_airline_period_chart(data: pd.DataFrame) -> go.Figure | str:
     """Plot grouped bar chart for airline volume comparison."""
 
     if data.empty:
-        st.info("Missing data for August 2018 or January 2020 airline comparison.")
-        return
+        return "Missing data for August 2018 or January 2020 airline comparison."
 
     contrast_colors = [COLOR_SEQUENCE[0], COLOR_SEQUENCE[-1]]
     fig = px.bar(
@@ -146,30 +213,26 @@ def _render_airline_period_chart(data: pd.DataFrame) -> None:
         color_discrete_sequence=contrast_colors,
     )
     fig.update_layout(xaxis_title="Airline", yaxis_title="Total flights")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def _render_busiest_airports(df: pd.DataFrame, airports_us: pd.DataFrame) -> None:
-    """Render bar chart for busiest origin airports."""
+@cache_data(show_spinner=False)
+def _build_busiest_airports(df: pd.DataFrame, airports_us: pd.DataFrame) -> pd.DataFrame:
+    """Return the ten busiest origin airports labelled with their names."""
 
-    if df.empty:
-        st.info("No flight records available to rank airports.")
-        return
-    if airports_us.empty:
-        st.info("Airport metadata missing; cannot show names.")
-        return
+    if df.empty or airports_us.empty:
+        return pd.DataFrame()
 
     column = "ORIGIN_AIRPORT"
     top_airports = (
-        df.groupby(column)
+        df.groupby(column, observed=True)
         .size()
         .reset_index(name="Flights")
         .sort_values("Flights", ascending=False)
         .head(10)
     )
     if top_airports.empty:
-        st.info("Not enough airport records to rank volume.")
-        return
+        return top_airports
 
     merged = top_airports.merge(
         airports_us[["IATA", "Airport_Name", "City"]],
@@ -178,8 +241,19 @@ def _render_busiest_airports(df: pd.DataFrame, airports_us: pd.DataFrame) -> Non
         how="left",
     )
     merged["Label"] = merged["Airport_Name"].fillna(merged[column])
+    return merged
+
+
+def _plot_busiest_airports(data: pd.DataFrame, airports_us: pd.DataFrame) -> go.Figure | str:
+    """Plot bar chart for busiest origin airports."""
+
+    if airports_us.empty:
+        return "Airport metadata missing; cannot show names."
+    if data.empty:
+        return "Not enough airport records to rank volume."
+
     fig = px.bar(
-        merged,
+        data,
         x="Flights",
         y="Label",
         orientation="h",
@@ -188,26 +262,30 @@ def _render_busiest_airports(df: pd.DataFrame, airports_us: pd.DataFrame) -> Non
         color_discrete_sequence=[PRIMARY_COLOR],
     )
     fig.update_layout(yaxis=dict(autorange="reversed"))
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
-def _render_airline_snapshot(df: pd.DataFrame) -> None:
-    """Show top airlines by total flights in current dataset."""
+@cache_data(show_spinner=False)
+def _build_airline_snapshot(df: pd.DataFrame) -> pd.DataFrame:
+    """Return the top airlines by total flights in the current dataset."""
 
     if df.empty:
-        st.info("No flights available to rank airlines.")
-        return
+        return pd.DataFrame()
 
-    flights_by_airline = (
-        df.groupby("Airline_Name")
-        .size()
+    return (
+        flight_cells(df).groupby("Airline_Name", observed=True)["Flights"]
+        .sum()
         .reset_index(name="Flights")
         .sort_values("Flights", ascending=False)
         .head(10)
     )
+
+
+def _plot_airline_snapshot(flights_by_airline: pd.DataFrame) -> go.Figure | str:
+    """Plot top airlines by total flights in current dataset."""
+
     if flights_by_airline.empty:
-        st.info("Not enough airline records to visualize volume.")
-        return
+        return "Not enough airline records to visualize volume."
 
     fig = px.bar(
         flights_by_airline,
@@ -219,29 +297,27 @@ def _render_airline_snapshot(df: pd.DataFrame) -> None:
         color_discrete_sequence=[PRIMARY_COLOR],
     )
     fig.update_layout(yaxis=dict(autorange="reversed"))
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
+@cache_data(show_spinner=False)
 def _build_state_comparison(df: pd.DataFrame, airports_us: pd.DataFrame) -> pd.DataFrame:
     """Return flights per state for the two target periods."""
 
     if df.empty or airports_us.empty:
         return pd.DataFrame()
+    # The cells already carry each flight's origin state.
+    cells = flight_cells(df, airports_us)
 
-    airport_states = airports_us[["IATA", "State"]].dropna()
-    merged = df.merge(airport_states, left_on="ORIGIN_AIRPORT",
-                      right_on="IATA", how="left")
-    merged = merged.dropna(subset=["State"])
-
-    aug_2018 = merged[(merged["FL_DATE"].dt.year == 2018)
-                      & (merged["FL_DATE"].dt.month == 8)]
-    jan_2020 = merged[(merged["FL_DATE"].dt.year == 2020)
-                      & (merged["FL_DATE"].dt.month == 1)]
+    aug_2018 = month_rows(cells, "2018-08")
+    jan_2020 = month_rows(cells, "2020-01")
     if aug_2018.empty and jan_2020.empty:
         return pd.DataFrame()
 
     def _summarize(data: pd.DataFrame, label: str) -> pd.DataFrame:
-        counts = data.groupby("State").size().reset_index(name="Total_Flights")
+        counts = (data.groupby("State", observed=True)["Flights"].sum()
+                  .reset_index(name="Total_Flights"))
+        counts["State"] = counts["State"].astype(str)
         counts["Period"] = label
         return counts
 
@@ -258,12 +334,11 @@ def _build_state_comparison(df: pd.DataFrame, airports_us: pd.DataFrame) -> pd.D
     return combined[combined["State"].isin(top_states)]
 
 
-def _render_state_period_chart(data: pd.DataFrame) -> None:
+def _plot_state_period_chart(data: pd.DataFrame) -> go.Figure | str:
     """Plot grouped bar chart for state-level flight comparison."""
 
     if data.empty:
-        st.info("Missing data for August 2018 or January 2020 state comparison.")
-        return
+        return "Missing data for August 2018 or January 2020 state comparison."
 
     contrast_colors = [COLOR_SEQUENCE[0], COLOR_SEQUENCE[-1]]
     fig = px.bar(
@@ -278,19 +353,21 @@ def _render_state_period_chart(data: pd.DataFrame) -> None:
         color_discrete_sequence=contrast_colors,
     )
     fig.update_layout(xaxis_title="State", yaxis_title="Total flights")
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 
+@cache_data(show_spinner=False)
 def _build_airline_sankey_data(df: pd.DataFrame):
     """Prepare node labels and links for airline Sankey comparing 2018 vs 2020."""
 
-    aug = df[(df["FL_DATE"].dt.year == 2018) & (df["FL_DATE"].dt.month == 8)]
-    jan = df[(df["FL_DATE"].dt.year == 2020) & (df["FL_DATE"].dt.month == 1)]
+    cells = flight_cells(df)
+    aug = month_rows(cells, "2018-08")
+    jan = month_rows(cells, "2020-01")
     if aug.empty or jan.empty:
         return None
 
     def summarize(data: pd.DataFrame) -> pd.DataFrame:
-        counts = data.groupby("Airline_Name").size(
+        counts = data.groupby("Airline_Name", observed=True)["Flights"].sum(
         ).reset_index(name="Flight_Count")
         counts = counts.sort_values("Flight_Count", ascending=False)
         top = counts.head(10)
@@ -364,6 +441,14 @@ def _build_airline_sankey_data(df: pd.DataFrame):
     return node_labels_2018, node_labels_2020, all_labels, links
 
 
+def _plot_airline_sankey(sankey_result) -> go.Figure | str:
+    """Return the Sankey figure, or a message when a period is missing."""
+
+    if sankey_result is None:
+        return "Need both August 2018 and January 2020 data to build the Sankey view."
+    return _render_airline_sankey(*sankey_result)
+
+
 def _render_airline_sankey(
     node_labels_2018: list[str],
     node_labels_2020: list[str],
@@ -436,3 +521,137 @@ def _render_airline_sankey(
     fig.update_layout(
         title="Airline flight volume shift: 2018 vs 2020", height=800)
     return fig
+
+
+@cache_data(show_spinner=False)
+def _build_route_flows(df: pd.DataFrame, airports_us: pd.DataFrame) -> pd.DataFrame:
+    """Return flights and arrival-delay minutes per directed route, heaviest first.
+
+    Aggregated once per dataset with both endpoints' coordinates attached, so
+    changing the weight or the number of routes only ranks this small table.
+    Routes with an endpoint missing from ``airports_us`` are dropped.
+    """
+
+    if df.empty or airports_us.empty:
+        return pd.DataFrame()
+
+    delay = df["ARR_DELAY"].clip(lower=0)
+    grouped = delay.groupby([df["ORIGIN_AIRPORT"], df["DEST_AIRPORT"]], observed=True)
+    routes = pd.DataFrame(
+        {"Flights": grouped.size(), "DelayMinutes": grouped.sum()}).reset_index()
+
+    coordinates = airports_us.set_index("IATA")
+    for prefix, column in (("Origin", "ORIGIN_AIRPORT"), ("Dest", "DEST_AIRPORT")):
+        routes[f"{prefix}Lat"] = lookup_by_key(routes[column], coordinates["Latitude"])
+        routes[f"{prefix}Lon"] = lookup_by_key(routes[column], coordinates["Longitude"])
+    routes = routes.dropna(subset=["OriginLat", "OriginLon", "DestLat", "DestLon"])
+    return routes.sort_values("Flights", ascending=False, ignore_index=True)
+
+
+def create_route_flow_map(
+    routes: pd.DataFrame,
+    weight: str = "Flights",
+    top_n: int = ROUTE_FLOW_DEFAULT,
+) -> go.Figure:
+    """Draw the ``top_n`` heaviest routes by ``weight`` as great-circle lines.
+
+    All edges of a width tier share one trace, with each edge's endpoints
+    followed by a NaN that breaks the line, so the figure holds a handful of
+    traces however many routes are shown. Hover labels sit on an invisible
+    marker at each edge's midpoint.
+    """
+
+    values = routes[weight].to_numpy()
+    shown = routes.iloc[np.argsort(-values, kind="stable")[:top_n]]
+    origin_lon, origin_lat = shown["OriginLon"].to_numpy(), shown["OriginLat"].to_numpy()
+    dest_lon, dest_lat = shown["DestLon"].to_numpy(), shown["DestLat"].to_numpy()
+
+    fig = go.Figure()
+    tiers = np.array_split(np.arange(len(shown)), len(ROUTE_FLOW_WIDTHS))
+    # Lightest tier first so heavier routes are drawn on top.
+    for rows, width in zip(reversed(tiers), ROUTE_FLOW_WIDTHS):
+        if not len(rows):
+            continue
+        breaks = np.full(len(rows), np.nan)
+        fig.add_trace(go.Scattergeo(
+            lon=np.column_stack([origin_lon[rows], dest_lon[rows], breaks]).ravel(),
+            lat=np.column_stack([origin_lat[rows], dest_lat[rows], breaks]).ravel(),
+            mode="lines",
+            line=dict(width=width, color=PRIMARY_COLOR),
+            opacity=0.35 + 0.15 * ROUTE_FLOW_WIDTHS.index(width),
+            hoverinfo="skip",
+            showlegend=False,
+        ))
+
+    fig.add_trace(go.Scattergeo(
+        lon=(origin_lon + dest_lon) / 2,
+        lat=(origin_lat + dest_lat) / 2,
+        mode="markers",
+        marker=dict(size=6, opacity=0),
+        customdata=np.column_stack([
+            shown["ORIGIN_AIRPORT"].astype(str), shown["DEST_AIRPORT"].astype(str),
+            shown["Flights"], shown["DelayMinutes"],
+        ]),
+        hovertemplate=("<b>%{customdata[0]} → %{customdata[1]}</b><br>"
+                       "Flights: %{customdata[2]:,}<br>"
+                       "Arrival delay: %{customdata[3]:,.0f} min<extra></extra>"),
+        showlegend=False,
+    ))
+
+    endpoints = pd.concat([
+        shown[["ORIGIN_AIRPORT", "OriginLon", "OriginLat"]].set_axis(["IATA", "Lon", "Lat"], axis=1),
+        shown[["DEST_AIRPORT", "DestLon", "DestLat"]].set_axis(["IATA", "Lon", "Lat"], axis=1),
+    ]).drop_duplicates("IATA")
+    fig.add_trace(go.Scattergeo(
+        lon=endpoints["Lon"],
+        lat=endpoints["Lat"],
+        text=endpoints["IATA"].astype(str),
+        mode="markers",
+        marker=dict(size=4, color=COLOR_SEQUENCE[1]),
+        hovertemplate="%{text}<extra></extra>",
+        showlegend=False,
+    ))
+
+    label = "flights" if weight == "Flights" else "arrival-delay minutes"
+    fig.update_layout(
+        height=600,
+        title=f"Top {len(shown):,} routes by {label}",
+        geo=dict(
+            scope="usa",
+            projection_type="albers usa",
+            showland=True,
+            landcolor="rgb(230, 230, 230)",
+        ),
+        margin=dict(t=40, l=0, r=0, b=0),
+    )
+    return fig
+
+
+def _render_route_flows(routes: pd.DataFrame, fingerprint: str) -> None:
+    """Draw the route-flow controls and the map for the chosen cap."""
+
+    if routes.empty:
+        st.info("Airport coordinates are needed to draw route flows.")
+        return
+
+    weight_col, count_col = st.columns((1, 2))
+    weight = weight_col.radio(
+        "Weight routes by", list(ROUTE_FLOW_WEIGHTS), horizontal=True, key="volume_routes_weight")
+    total = len(routes)
+    top_n = total
+    if total > ROUTE_FLOW_MIN:
+        top_n = count_col.slider(
+            "Routes shown", ROUTE_FLOW_MIN, min(total, ROUTE_FLOW_MAX),
+            min(ROUTE_FLOW_DEFAULT, total), key="volume_routes_top")
+
+    column = ROUTE_FLOW_WEIGHTS[weight]
+    fig = cached_figure(fingerprint, "volume.route_flows",
+                        lambda: create_route_flow_map(routes, column, top_n),
+                        weight=column, top_n=top_n)
+    st.plotly_chart(fig, use_container_width=True)
+    cutoff = np.partition(routes[column].to_numpy(), total - top_n)[total - top_n]
+    st.caption(
+        f"Showing the {top_n:,} heaviest of {total:,} routes (each at least {cutoff:,.0f} "
+        f"{weight.lower()}); raise the cap for more detail."
+    )
+
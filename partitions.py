@@ -0,0 +1,211 @@
+"""Year/month partitioned storage for the cleaned flight dataset.
+
+The cleaned frame is written as one Parquet file per month in a Hive-style
+layout::
+
+    flights/year=2018/month=08/part-0.parquet
+    flights/year=2020/month=01/part-0.parquet
+
+A ``DatePredicate`` picks months by looking at directory names alone, so a
+two-month comparison over a ten-year archive opens two files instead of all
+of them. Categoricals (airline names, airport codes) are stored as Parquet
+dictionaries and come back as categoricals. Within the app, where the frame
+is already in memory and date-ordered, ``month_rows`` gives the same pruning:
+one binary search per month instead of a scan of every row.
+
+    python partitions.py Airline_dataset.csv flights/
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PARTITION_FILE = "part-0.parquet"
+PARTITION_DIR = re.compile(r"year=(\d{4})/month=(\d{1,2})$")
+# Categorical columns that must share one category set after a partial read.
+SHARED_CATEGORIES = ("ORIGIN_AIRPORT", "DEST_AIRPORT")
+
+
+@dataclass(frozen=True)
+class DatePredicate:
+    """Months to read: an inclusive ``start``/``end`` range and/or a month list.
+
+    Months are ``"YYYY-MM"`` strings; open bounds and an empty ``months``
+    mean "no restriction". Hashable, so it can key ``st.cache_data``.
+    """
+
+    start: str | None = None
+    end: str | None = None
+    months: Tuple[str, ...] = ()
+
+    @classmethod
+    def parse(cls, text: str) -> DatePredicate:
+        """Parse ``"2018-08,2020-01"`` (a month list) or ``"2018-01:2019-12"`` (a range)."""
+
+        text = text.strip()
+        if ":" in text:
+            start, _, end = text.partition(":")
+            return cls(start=str(pd.Period(start, "M")) if start.strip() else None,
+                       end=str(pd.Period(end, "M")) if end.strip() else None)
+        return cls(months=tuple(str(pd.Period(month, "M"))
+                                for month in text.split(",") if month.strip()))
+
+    def __call__(self, month: pd.Period) -> bool:
+        label = str(month)
+        return ((self.start is None or label >= self.start)
+                and (self.end is None or label <= self.end)
+                and (not self.months or label in self.months))
+
+    def mask(self, dates: pd.Series) -> np.ndarray:
+        """Return a row mask selecting ``dates`` in the chosen months."""
+
+        months = pd.to_datetime(dates).to_numpy().astype("datetime64[M]")
+        keep = np.ones(len(months), dtype=bool)
+        if self.start is not None:
+            keep &= months >= np.datetime64(self.start, "M")
+        if self.end is not None:
+            keep &= months <= np.datetime64(self.end, "M")
+        if self.months:
+            keep &= np.isin(months, np.array(self.months, dtype="datetime64[M]"))
+        return keep
+
+
+def list_partitions(root: str | Path) -> Dict[pd.Period, Path]:
+    """Return every month stored under ``root`` with its file, in date order."""
+
+    root = Path(root)
+    found = {}
+    for path in root.glob(f"year=*/month=*/{PARTITION_FILE}"):
+        match = PARTITION_DIR.search(path.parent.relative_to(root).as_posix())
+        if match:
+            found[pd.Period(year=int(match[1]), month=int(match[2]), freq="M")] = path
+    return dict(sorted(found.items()))
+
+
+def is_partitioned(path: str | Path) -> bool:
+    """Return True when ``path`` is a directory holding a partitioned dataset."""
+
+    return Path(path).is_dir() and bool(list_partitions(path))
+
+
+def read_partitioned(
+    root: str | Path,
+    predicate: DatePredicate | None = None,
+    columns: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """Read the months of ``root`` matching ``predicate`` into one date-ordered frame."""
+
+    paths = [path for month, path in list_partitions(root).items()
+             if predicate is None or predicate(month)]
+    if not paths:
+        schema = _any_schema(root)
+        empty = schema.empty_table().to_pandas() if schema is not None else pd.DataFrame()
+        return empty if columns is None else empty[list(columns)]
+
+    frames = [pq.read_table(path, columns=columns).to_pandas() for path in paths]
+    for column in frames[0].columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            _unify_categories(frames, column)
+    df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    shared = [column for column in SHARED_CATEGORIES if column in df.columns]
+    if len(shared) > 1:
+        airports = df[shared[0]].cat.categories
+        for column in shared[1:]:
+            airports = airports.union(df[column].cat.categories)
+        for column in shared:
+            df[column] = df[column].cat.set_categories(airports)
+    return df
+
+
+def _unify_categories(frames: List[pd.DataFrame], column: str) -> None:
+    """Give ``column`` the same categories in every frame so ``concat`` keeps them."""
+
+    categories = frames[0][column].cat.categories
+    if all(frame[column].cat.categories.equals(categories) for frame in frames[1:]):
+        return
+    for frame in frames[1:]:
+        categories = categories.union(frame[column].cat.categories)
+    for frame in frames:
+        frame[column] = frame[column].cat.set_categories(categories)
+
+
+def _any_schema(root: str | Path) -> pa.Schema | None:
+    partitions = list_partitions(root)
+    if not partitions:
+        return None
+    return pq.read_schema(next(iter(partitions.values())))
+
+
+def write_partitioned(df: pd.DataFrame, root: str | Path) -> List[Path]:
+    """Write ``df`` under ``root`` as one Parquet file per month; return the files.
+
+    Months present in ``df`` replace their existing partitions; other months
+    already under ``root`` are left alone.
+    """
+
+    root = Path(root)
+    if not df["FL_DATE"].is_monotonic_increasing:
+        df = df.sort_values("FL_DATE", kind="stable", ignore_index=True)
+    months = df["FL_DATE"].to_numpy().astype("datetime64[M]")
+    bounds = np.flatnonzero(np.r_[True, months[1:] != months[:-1], True])
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    written = []
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        month = pd.Period(months[lo], "M")
+        directory = root / f"year={month.year:04d}" / f"month={month.month:02d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / PARTITION_FILE
+        partial = target.with_suffix(".tmp")
+        pq.write_table(pa.Table.from_pandas(df.iloc[lo:hi], schema=schema, preserve_index=False),
+                       partial)
+        partial.replace(target)
+        written.append(target)
+    return written
+
+
+def month_rows(df: pd.DataFrame, month: str | pd.Period) -> pd.DataFrame:
+    """Return the rows of ``df`` falling in ``month`` (``"YYYY-MM"``).
+
+    The loader keeps flights in date order, so the month is found with two
+    binary searches; an unordered frame falls back to a comparison mask.
+    """
+
+    period = pd.Period(month, "M")
+    start = np.datetime64(period.start_time.date(), "D")
+    end = np.datetime64((period + 1).start_time.date(), "D")
+    dates = df["FL_DATE"]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    values = dates.to_numpy()
+    if dates.is_monotonic_increasing:
+        lo, hi = np.searchsorted(values, [start, end], side="left")
+        return df.iloc[lo:hi]
+    return df[(values >= start) & (values < end)]
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert the raw CSV into the partitioned layout.")
+    parser.add_argument("source", help="Raw airline CSV, as read by the app.")
+    parser.add_argument("target", help="Directory to write year=/month= partitions into.")
+    args = parser.parse_args(argv)
+
+    from preprocess import load_preprocessed_data
+
+    df, _ = load_preprocessed_data(args.source)
+    written = write_partitioned(df, args.target)
+    print(f"Wrote {len(df):,} flights to {len(written)} monthly partitions under {args.target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,34 @@
 
 from __future__ import annotations
 
-from io import StringIO
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Tuple
+from typing import Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-AIRLINE_DATA_PATH = "Airline_dataset.csv"
+from metrics import DATASET_LOAD_SECONDS, REFERENCE_FETCH_SECONDS
+from partitions import DatePredicate, is_partitioned, read_partitioned
+
+AIRLINE_DATA_PATH = os.environ.get("DASHBOARD_DATA_PATH", "Airline_dataset.csv")
+# Months the app loads, e.g. "2018-08,2020-01" or "2018-01:2020-12"; unset loads all.
+DATA_MONTHS = (DatePredicate.parse(os.environ["DASHBOARD_DATA_MONTHS"])
+               if os.environ.get("DASHBOARD_DATA_MONTHS", "").strip() else None)
 AIRLINES_LOOKUP_URL = "https://query.data.world/s/wpnzpdbcchgnj4vqacqww66vdhpovr?dws=00000"
 AIRPORTS_URL = "https://ourairports.com/data/airports.csv"
+REFERENCE_FETCH_TIMEOUT = float(os.environ.get("DASHBOARD_FETCH_TIMEOUT", "30"))
+REFERENCE_FETCH_RETRIES = int(os.environ.get("DASHBOARD_FETCH_RETRIES", "3"))
+AIRPORT_KEY_COLUMNS = ("ORIGIN_AIRPORT", "DEST_AIRPORT")
 
 IATA_CODES = {
     'ABE', 'ABI', 'ABQ', 'ABR', 'ABY', 'ACK', 'ACT', 'ACV', 'ACY', 'ADK', 'ADQ', 'AEX', 'AGS',
@@ -51,6 +69,8 @@ def _load_main_dataset(dataset_path: Path) -> pd.DataFrame:
 
     df = pd.read_csv(dataset_path)
     df['FL_DATE'] = pd.to_datetime(df['FL_DATE'], format='%m/%d/%y')
+    # Date order lets the global filters select a date range by binary search.
+    df = df.sort_values('FL_DATE', kind='stable', ignore_index=True)
 
     cols_to_int = ["AIRLINE_ID", "FLIGHT_NUM", "ORIGIN_SEQ_ID", "DEST_SEQ_ID"]
     df[cols_to_int] = df[cols_to_int].astype(int)
@@ -66,18 +86,42 @@ def _load_main_dataset(dataset_path: Path) -> pd.DataFrame:
     return df
 
 
+@lru_cache(maxsize=None)
+def _http_session() -> requests.Session:
+    """Return the process's pooled HTTP session, retrying transient failures."""
+
+    retry = Retry(
+        total=REFERENCE_FETCH_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _fetch_csv(url: str, source: str) -> pd.DataFrame:
+    """Download a reference CSV, recording the time under ``source``."""
+
+    with REFERENCE_FETCH_SECONDS.time(source=source):
+        response = _http_session().get(url, timeout=REFERENCE_FETCH_TIMEOUT)
+        response.raise_for_status()
+        return pd.read_csv(BytesIO(response.content))
+
+
 def _load_airlines_lookup() -> pd.DataFrame:
     """Fetch the airline description lookup table."""
 
-    return pd.read_csv(AIRLINES_LOOKUP_URL)
+    return _fetch_csv(AIRLINES_LOOKUP_URL, "airlines")
 
 
 def _load_airports_dataset() -> pd.DataFrame:
     """Download airport metadata and keep the subset of US commercial airports."""
 
-    response = requests.get(AIRPORTS_URL, timeout=30)
-    response.raise_for_status()
-    airports = pd.read_csv(StringIO(response.text))
+    airports = _fetch_csv(AIRPORTS_URL, "airports")
 
     airports_us = airports[airports['iso_country'] == 'US'].copy()
     airports_us = airports_us[airports_us['iata_code'].isin(IATA_CODES)]
@@ -96,11 +140,67 @@ def _load_airports_dataset() -> pd.DataFrame:
     return airports_us
 
 
-def load_preprocessed_data(dataset_path: str | Path = AIRLINE_DATA_PATH) -> Tuple[pd.DataFrame, pd.DataFrame]:
+def _encode_airline_names(airline_ids: pd.Series, airlines_lookup: pd.DataFrame) -> pd.Categorical:
+    """Resolve airline IDs to names as a categorical keyed by position.
+
+    Each flight stores a small integer code into the lookup's names instead of
+    its own copy of the string, and no merge over the flight frame is needed.
+    """
+
+    lookup = airlines_lookup.drop_duplicates("Code")
+    name_codes, names = pd.factorize(lookup["Description"])
+    positions = pd.Index(lookup["Code"]).get_indexer(airline_ids)
+    codes = np.where(positions >= 0, name_codes[positions], -1)
+    return pd.Categorical.from_codes(codes, categories=names)
+
+
+def _encode_airports(df: pd.DataFrame) -> pd.DataFrame:
+    """Store origin and destination as categoricals over one shared airport set."""
+
+    encoded = {column: pd.factorize(df[column]) for column in AIRPORT_KEY_COLUMNS}
+    airports = encoded["ORIGIN_AIRPORT"][1].union(encoded["DEST_AIRPORT"][1])
+    for column, (codes, uniques) in encoded.items():
+        # Remap per-column codes onto the shared airport set; -1 stays missing.
+        remap = np.append(airports.get_indexer(uniques), -1)
+        df[column] = pd.Categorical.from_codes(remap[codes], categories=airports)
+    return df
+
+
+def lookup_by_key(keys: pd.Series, dimension: pd.Series) -> np.ndarray:
+    """Return ``dimension[key]`` for every row of ``keys``, NaN where missing.
+
+    Each distinct key is resolved once against the small ``dimension`` table
+    and the result is expanded to the rows by position, which replaces a
+    merge over the whole flight frame. Categorical keys reuse their codes.
+    """
+
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        codes, categories = keys.cat.codes.to_numpy(), keys.cat.categories
+    else:
+        codes, categories = pd.factorize(keys)
+    dimension = dimension[~dimension.index.duplicated()]
+    return pd.api.extensions.take(
+        dimension.reindex(categories).to_numpy(), codes, allow_fill=True)
+
+
+def load_preprocessed_data(
+    dataset_path: str | Path = AIRLINE_DATA_PATH,
+    predicate: DatePredicate | None = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """Load and clean the airline dataset along with the US airports reference data.
 
     Returns a tuple containing the cleaned flight dataframe and the filtered airports
-    dataframe that share the same IATA coverage used in the dashboards.
+    dataframe that share the same IATA coverage used in the dashboards. Airline
+    names and airport codes are categoricals, so flights carry integer keys into
+    small dimension tables rather than repeated strings.
+
+    ``dataset_path`` is either the raw CSV or a directory written by
+    ``partitions.write_partitioned``, which is already cleaned and encoded.
+    ``predicate`` keeps only the chosen months; with a partitioned directory
+    the other months' files are never opened.
+
+    The reference downloads run on worker threads while the dataset is read,
+    so a cold load takes about as long as the slowest of the three.
     """
 
     dataset_path = Path(dataset_path)
@@ -108,12 +208,51 @@ def load_preprocessed_data(dataset_path: str | Path = AIRLINE_DATA_PATH) -> Tupl
         raise FileNotFoundError(
             f"Dataset not found at {dataset_path.resolve()}")
 
-    df = _load_main_dataset(dataset_path)
-    airlines_lookup = _load_airlines_lookup()
-    df = df.merge(airlines_lookup, left_on='AIRLINE_ID',
-                  right_on='Code', how='left')
-    df = df.rename(columns={'Description': 'Airline_Name'})
-
-    airports_us = _load_airports_dataset()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="reference-fetch") as pool:
+        airports_future = pool.submit(_load_airports_dataset)
+        if is_partitioned(dataset_path):
+            with DATASET_LOAD_SECONDS.time(layout="partitioned"):
+                df = read_partitioned(dataset_path, predicate)
+        else:
+            airlines_future = pool.submit(_load_airlines_lookup)
+            with DATASET_LOAD_SECONDS.time(layout="csv"):
+                df = _load_main_dataset(dataset_path)
+                if predicate is not None:
+                    df = df[predicate.mask(df["FL_DATE"])].reset_index(drop=True)
+            df['Airline_Name'] = _encode_airline_names(df['AIRLINE_ID'], airlines_future.result())
+            df = _encode_airports(df)
+        airports_us = airports_future.result()
 
     return df, airports_us
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Time a cold load against local stand-ins for the remote references.")
+    parser.add_argument("--flights", type=int, default=1_000_000,
+                        help="Size of the synthetic dataset.")
+    parser.add_argument("--latency", type=float, default=1.0,
+                        help="Seconds the stub server waits before answering each request.")
+    parser.add_argument("--failures", type=int, default=0,
+                        help="Requests per file the stub server answers with 503 first.")
+    args = parser.parse_args(argv)
+
+    # ``use_sources`` patches the imported module, which is not ``__main__``.
+    import metrics
+    import preprocess
+    from synthetic import synthetic_sources, use_sources
+
+    with synthetic_sources(args.flights, latency=args.latency, failures=args.failures) as sources, \
+            use_sources(*sources):
+        started = time.perf_counter()
+        df, _ = preprocess.load_preprocessed_data(sources[0])
+        total = time.perf_counter() - started
+    print(f"Loaded {len(df):,} flights in {total:.2f}s")
+    print(f"  dataset   {metrics.DATASET_LOAD_SECONDS.total(layout='csv'):.2f}s")
+    for source in ("airlines", "airports"):
+        print(f"  {source:<9} {metrics.REFERENCE_FETCH_SECONDS.total(source=source):.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,342 @@
+"""Sampled previews that stand in for a page until its exact results are cached.
+
+On large datasets a page's first render waits for every aggregation over the
+full frame. In progressive mode the app keeps a stratified sample of the
+flights (by airline x month x origin airport) and, while a page's cached
+builders are still cold for the current filters, shows a preview computed
+from that sample instead: scaled flight counts and average delays with 95%
+confidence intervals, overall and per airline. The exact builders run in the
+background as a one-page warm-up; a small fragment polls it and reruns the
+app once they are cached, so the real page swaps in without any input.
+
+Estimates use the stratified (domain) estimator: each sampled flight stands
+for ``N_h / n_h`` flights of its stratum, and intervals come from the
+per-stratum variances with the finite population correction, so strata that
+were sampled in full contribute no uncertainty.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from functools import partial
+from typing import Callable, Hashable, List, Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+from filters import FilterSpec, get_filter_index
+from frame_memo import FRAME_HASH_FUNCS
+from metrics import cache_data
+from theme import COLOR_SEQUENCE
+from warmup import TaskFactory, WarmupProgress, start_warmup
+
+PROGRESSIVE_ENABLED = os.environ.get("DASHBOARD_PROGRESSIVE", "1") != "0"
+# Smaller datasets render exactly fast enough that a preview would only flash.
+PROGRESSIVE_MIN_ROWS = int(os.environ.get("DASHBOARD_PROGRESSIVE_MIN_ROWS", "2000000"))
+SAMPLE_FRACTION = float(os.environ.get("DASHBOARD_SAMPLE_FRACTION", "0.02"))
+SAMPLE_MIN_PER_STRATUM = 3
+SAMPLE_SEED = 0
+PROGRESSIVE_POLL_SECONDS = 1.0
+EXACT_BUILDS_KEPT = 32
+Z_95 = 1.959964
+
+SAMPLE_STRATUM = "_SAMPLE_STRATUM"
+SAMPLE_SIZE = "_SAMPLE_SIZE"
+SAMPLE_WEIGHT = "_SAMPLE_WEIGHT"
+
+
+def stratified_sample(
+    df: pd.DataFrame,
+    fraction: float = SAMPLE_FRACTION,
+    min_per_stratum: int = SAMPLE_MIN_PER_STRATUM,
+    seed: int = SAMPLE_SEED,
+) -> pd.DataFrame:
+    """Return a stratified random sample of ``df`` in its original row order.
+
+    Each airline x month x origin stratum keeps ``fraction`` of its flights
+    but at least ``min_per_stratum`` (all of them when it is smaller), so
+    small carriers and airports are never missing from a preview. Extra
+    columns record each row's stratum, the stratum's sample size and its
+    weight (stratum size over sample size).
+    """
+
+    if df.empty:
+        return df.iloc[:0].assign(**{SAMPLE_STRATUM: np.int64(0), SAMPLE_SIZE: np.int64(0),
+                                     SAMPLE_WEIGHT: 1.0})
+
+    airline, airlines = pd.factorize(df["Airline_Name"])
+    origin, origins = pd.factorize(df["ORIGIN_AIRPORT"])
+    month, months = pd.factorize(
+        pd.to_datetime(df["FL_DATE"]).to_numpy().astype("datetime64[M]"))
+    key = ((airline.astype(np.int64) + 1) * (len(months) + 1) + month + 1) \
+        * (len(origins) + 1) + origin + 1
+    stratum, strata = pd.factorize(key)
+    sizes = np.bincount(stratum, minlength=len(strata))
+    take = np.minimum(
+        sizes, np.maximum(np.rint(sizes * fraction).astype(np.int64), min_per_stratum))
+
+    # A random priority within each stratum; the first ``take`` rows are kept.
+    rng = np.random.default_rng(seed)
+    order = np.argsort(stratum + rng.random(len(df)), kind="stable")
+    starts = np.cumsum(sizes) - sizes
+    rank = np.arange(len(df)) - starts[stratum[order]]
+    keep = np.sort(order[rank < take[stratum[order]]])
+
+    sample = df.take(keep).reset_index(drop=True)
+    sample[SAMPLE_STRATUM] = stratum[keep]
+    sample[SAMPLE_SIZE] = take[stratum[keep]]
+    sample[SAMPLE_WEIGHT] = sizes[stratum[keep]] / take[stratum[keep]]
+    return sample
+
+
+def domain_estimates(
+    sample: pd.DataFrame,
+    groups: np.ndarray,
+    n_groups: int,
+    values: np.ndarray | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(estimate, half_width)`` per group from a filtered sample.
+
+    Without ``values`` the estimate is each group's scaled flight count;
+    with them it is the group's mean of ``values`` (NaN ignored). Rows with
+    a negative group are left out. ``half_width`` is the 95% interval.
+    """
+
+    cells = _stratum_cells(sample, np.asarray(groups, dtype=np.int64))
+    if values is None:
+        total, variance = _domain_totals(cells, n_groups, np.ones(len(sample)))
+        return total, Z_95 * np.sqrt(variance)
+
+    # A missing value takes its flight out of the group's domain.
+    values = np.asarray(values, dtype=float)
+    observed = ~np.isnan(values)
+    values = np.where(observed, values, 0.0)
+    count, _ = _domain_totals(cells, n_groups, observed.astype(float))
+    total, _ = _domain_totals(cells, n_groups, values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        # Linearise the ratio: the mean's variance is that of the residual total.
+        residual = np.where(observed, values - np.append(mean, np.nan)[groups], 0.0)
+        _, variance = _domain_totals(cells, n_groups, residual)
+        return mean, Z_95 * np.sqrt(variance) / count
+
+
+StratumCells = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+def _stratum_cells(sample: pd.DataFrame, groups: np.ndarray) -> StratumCells:
+    """Return ``(rows, cell, cell_group, n, big_n)`` for the group x stratum cells.
+
+    ``rows`` selects the sampled rows in some group and ``cell`` numbers
+    their cells; ``n`` and ``big_n`` are each cell's stratum sample and
+    population sizes.
+    """
+
+    rows = np.flatnonzero(groups >= 0)
+    stratum = sample[SAMPLE_STRATUM].to_numpy()[rows]
+    n_strata = int(stratum.max()) + 1 if len(rows) else 1
+    cell, keys = pd.factorize(groups[rows] * n_strata + stratum)
+    first = np.empty(len(keys), dtype=np.int64)
+    first[cell[::-1]] = rows[::-1]
+    n = sample[SAMPLE_SIZE].to_numpy(dtype=float)[first]
+    big_n = sample[SAMPLE_WEIGHT].to_numpy()[first] * n
+    return rows, cell, np.asarray(keys) // n_strata, n, big_n
+
+
+def _domain_totals(cells: StratumCells, n_groups: int, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the estimated total of ``values`` per group and its variance."""
+
+    rows, cell, cell_group, n, big_n = cells
+    sums = np.bincount(cell, weights=values[rows], minlength=len(n))
+    squares = np.bincount(cell, weights=values[rows] ** 2, minlength=len(n))
+    # Rows of a stratum outside the group count as zeros in its variance.
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = np.where(n > 1, (squares - sums ** 2 / n) / (n - 1), 0.0)
+    total = np.bincount(cell_group, weights=big_n / n * sums, minlength=n_groups)
+    variance = np.bincount(
+        cell_group, weights=big_n ** 2 * (1 - n / big_n) * np.maximum(spread, 0) / n,
+        minlength=n_groups)
+    return total, variance
+
+
+@st.cache_resource(show_spinner="Sampling flights for quick previews...",
+                   hash_funcs=FRAME_HASH_FUNCS)
+def get_stratified_sample(df: pd.DataFrame) -> pd.DataFrame:
+    """Build the preview sample once per dataset and share it across sessions.
+
+    Like every cache here that is looked up on each rerun, it is keyed by
+    the frame's memoized fingerprint rather than by hashing the frame.
+    """
+
+    return stratified_sample(df)
+
+
+@cache_data(show_spinner=False)
+def build_preview(sample: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return overall and per-airline estimates, each with a 95% half-width."""
+
+    metrics = (
+        ("Flights", None),
+        ("Avg departure delay (min)", sample["DEP_DELAY"].to_numpy(dtype=float)),
+        ("Avg arrival delay (min)", sample["ARR_DELAY"].to_numpy(dtype=float)),
+        ("On-time arrivals (%)", np.where(
+            sample["ARR_DELAY"].isna(), np.nan, (sample["ARR_DELAY"] <= 0) * 100.0)),
+    )
+    everyone = np.zeros(len(sample), dtype=np.int64)
+    overall = pd.DataFrame(
+        [(name, *(value[0] for value in domain_estimates(sample, everyone, 1, values)))
+         for name, values in metrics],
+        columns=["Metric", "Estimate", "Half-width"],
+    )
+
+    codes, airlines = pd.factorize(sample["Airline_Name"], sort=True)
+    flights, flights_ci = domain_estimates(sample, codes, len(airlines))
+    delay, delay_ci = domain_estimates(
+        sample, codes, len(airlines), sample["ARR_DELAY"].to_numpy(dtype=float))
+    by_airline = pd.DataFrame(
+        {
+            "Airline_Name": airlines.astype(str),
+            "Flights": flights,
+            "Flights CI": flights_ci,
+            "ARR_DELAY": delay,
+            "ARR_DELAY CI": delay_ci,
+        }
+    ).sort_values("Flights", ascending=False, ignore_index=True)
+    return overall, by_airline
+
+
+def _plot_preview(by_airline: pd.DataFrame) -> go.Figure:
+    """Plot scaled flights and average arrival delay per airline with error bars."""
+
+    fig = make_subplots(rows=1, cols=2, horizontal_spacing=0.12, subplot_titles=(
+        "Flights by airline (estimated)", "Average arrival delay (estimated)"))
+    fig.add_trace(go.Bar(
+        x=by_airline["Airline_Name"], y=by_airline["Flights"],
+        error_y=dict(type="data", array=by_airline["Flights CI"], visible=True),
+        marker_color=COLOR_SEQUENCE[0], name="Flights",
+        hovertemplate="%{x}<br>%{y:,.0f} ± %{error_y.array:,.0f} flights<extra></extra>",
+    ), row=1, col=1)
+    fig.add_trace(go.Scatter(
+        x=by_airline["Airline_Name"], y=by_airline["ARR_DELAY"], mode="markers",
+        error_y=dict(type="data", array=by_airline["ARR_DELAY CI"], visible=True),
+        marker=dict(color=COLOR_SEQUENCE[-1], size=9), name="Avg arrival delay",
+        hovertemplate="%{x}<br>%{y:.1f} ± %{error_y.array:.1f} min<extra></extra>",
+    ), row=1, col=2)
+    fig.update_layout(showlegend=False, height=420, margin=dict(t=60, b=10))
+    fig.update_yaxes(title_text="Flights", row=1, col=1)
+    fig.update_yaxes(title_text="Minutes", row=1, col=2)
+    return fig
+
+
+def render_preview(sample: pd.DataFrame) -> None:
+    """Draw the sampled preview for the filtered ``sample``."""
+
+    if sample.empty:
+        st.info("No flights match the current filters.")
+        return
+    overall, by_airline = build_preview(sample)
+    st.info(
+        f"Quick preview from a {SAMPLE_FRACTION:.0%} stratified sample of the flights; "
+        "± values are 95% confidence intervals. The exact page replaces it as soon "
+        "as its results are ready."
+    )
+    for column, row in zip(st.columns(len(overall)), overall.itertuples(index=False)):
+        precision = 0 if row.Metric == "Flights" else 1
+        column.metric(row.Metric, f"{row.Estimate:,.{precision}f}",
+                      f"± {row[2]:,.{precision}f}", delta_color="off", delta_arrow="off")
+    st.plotly_chart(_plot_preview(by_airline), use_container_width=True)
+
+
+class ExactBuilds:
+    """Background builds of one page's cached builders, keyed by page and filters."""
+
+    def __init__(self, kept: int = EXACT_BUILDS_KEPT) -> None:
+        self.kept = kept
+        self._lock = threading.Lock()
+        self._builds: OrderedDict[Hashable, WarmupProgress] = OrderedDict()
+
+    def ensure(
+        self,
+        key: Hashable,
+        factory: TaskFactory,
+        df: pd.DataFrame,
+        airports_us: pd.DataFrame,
+    ) -> WarmupProgress:
+        """Return the build for ``key``, starting it if it has not run yet."""
+
+        with self._lock:
+            progress = self._builds.get(key)
+            if progress is None:
+                progress = start_warmup(lambda: (df, airports_us), [factory], cpu_budget=1.0)
+                self._builds[key] = progress
+                while len(self._builds) > self.kept:
+                    self._builds.popitem(last=False)
+            self._builds.move_to_end(key)
+            return progress
+
+
+@st.cache_resource(show_spinner=False, hash_funcs=FRAME_HASH_FUNCS)
+def get_exact_builds(df: pd.DataFrame) -> ExactBuilds:
+    """Share one build registry per dataset across sessions."""
+
+    return ExactBuilds()
+
+
+def progressive_applies(df: pd.DataFrame) -> bool:
+    return PROGRESSIVE_ENABLED and len(df) >= PROGRESSIVE_MIN_ROWS
+
+
+def render_preview_until_exact(
+    page: str,
+    factory: TaskFactory,
+    df: pd.DataFrame,
+    filtered_df: pd.DataFrame,
+    airports_us: pd.DataFrame,
+    spec: FilterSpec,
+    exact_cached: bool = False,
+) -> bool:
+    """Show the preview while ``page``'s builders warm up; True if it was shown.
+
+    ``exact_cached`` skips the preview when the caller knows the builders are
+    already cached for this selection (e.g. the global warm-up has finished
+    and no filter is set). Otherwise the page's warm-up tasks run in the
+    background for ``filtered_df``, and the app reruns when they finish.
+    """
+
+    if exact_cached:
+        return False
+    progress = get_exact_builds(df).ensure(
+        (page, spec), factory, filtered_df, airports_us)
+    if progress.finished:
+        return False
+
+    sample = get_stratified_sample(df)
+    render_preview(get_filter_index(sample, airports_us).apply(sample, spec))
+    _await_exact(progress)
+    return True
+
+
+@st.fragment(run_every=PROGRESSIVE_POLL_SECONDS)
+def _await_exact(progress: WarmupProgress) -> None:
+    """Rerun the whole app once the exact build has finished."""
+
+    if progress.finished:
+        st.rerun()
+    st.progress(progress.fraction, text="Computing exact results...")
+
+
+def warmup_tasks(df: pd.DataFrame, airports_us: pd.DataFrame) -> List[Tuple[str, Callable[[], object]]]:
+    """Return the preview sample build so it is ready before the first page view."""
+
+    if not PROGRESSIVE_ENABLED:
+        return []
+    return [("progressive.preview", partial(_warm_preview, df))]
+
+
+def _warm_preview(df: pd.DataFrame) -> object:
+    return build_preview(get_stratified_sample(df))
@@ -0,0 +1,175 @@
+"""Per-rerun cost accounting for the app shell and the active page.
+
+Every rerun of ``app.py`` times its stages (theme, data, navigation, filters,
+page) with a ``RerunCosts`` and records them in the process-wide
+``RERUN_STATS``. Set ``DASHBOARD_RERUN_REPORT=1`` to show the current rerun's
+breakdown and the running percentiles in the sidebar, or measure offline:
+
+    python rerun_costs.py --flights 1000000 --reruns 30
+
+which drives the app with ``AppTest`` on synthetic data and prints p50/p95
+per stage for reruns that change nothing, i.e. the fixed cost of a rerun.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Sequence
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from metrics import PAGE_RENDER_SECONDS, RERUN_STAGE_SECONDS
+
+RERUN_REPORT_ENABLED = os.environ.get("DASHBOARD_RERUN_REPORT", "0") == "1"
+RERUN_STATS_KEPT = 500
+APP_PATH = str(Path(__file__).resolve().parent / "app.py")
+
+LOGGER = logging.getLogger(__name__)
+
+
+class RerunStats:
+    """Thread-safe record of the most recent reruns' stage timings."""
+
+    def __init__(self, kept: int = RERUN_STATS_KEPT) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Deque[float]] = {}
+        self._kept = kept
+
+    def record(self, stages: Dict[str, float]) -> None:
+        with self._lock:
+            for name, seconds in stages.items():
+                self._stages.setdefault(name, deque(maxlen=self._kept)).append(seconds)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+    def summary(self) -> pd.DataFrame:
+        """Return reruns, p50, p95 and max in milliseconds per stage."""
+
+        with self._lock:
+            stages = {name: np.asarray(values) * 1000 for name, values in self._stages.items()}
+        rows = [
+            (name, len(values), *np.percentile(values, [50, 95, 100]))
+            for name, values in stages.items() if len(values)
+        ]
+        return pd.DataFrame(rows, columns=["Stage", "Reruns", "p50 ms", "p95 ms", "max ms"]).round(1)
+
+
+RERUN_STATS = RerunStats()
+
+
+class RerunCosts:
+    """Wall time of each stage of one rerun, in execution order."""
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def finish(self, page: str = "") -> None:
+        """Record this rerun, including a ``total`` stage, and show the report if enabled.
+
+        ``page`` labels the rerun's stage and page latency metrics.
+        """
+
+        self.stages["total"] = time.perf_counter() - self._started
+        RERUN_STATS.record(self.stages)
+        for name, seconds in self.stages.items():
+            RERUN_STAGE_SECONDS.observe(seconds, page=page, stage=name)
+        if "page" in self.stages:
+            PAGE_RENDER_SECONDS.observe(self.stages["page"], page=page)
+        LOGGER.debug("Rerun cost: %s", ", ".join(
+            f"{name} {seconds * 1000:.1f}ms" for name, seconds in self.stages.items()))
+        if RERUN_REPORT_ENABLED:
+            _render_report(self.stages)
+
+
+def _render_report(stages: Dict[str, float]) -> None:
+    with st.sidebar.expander("Rerun cost"):
+        st.dataframe(
+            pd.DataFrame({"Stage": list(stages),
+                          "This rerun (ms)": [round(s * 1000, 1) for s in stages.values()]}),
+            hide_index=True,
+        )
+        st.dataframe(RERUN_STATS.summary(), hide_index=True)
+
+
+def measure_reruns(reruns: int, pages: Sequence[int] = (), timeout: float = 120.0) -> pd.DataFrame:
+    """Rerun the app ``reruns`` times per page without changing any input.
+
+    ``pages`` are positions in the page selector (all pages when empty). The
+    first render of each page fills the caches and is not counted.
+    """
+
+    from streamlit.testing.v1 import AppTest
+
+    # The app records into the imported module, which is not ``__main__``.
+    from rerun_costs import RERUN_STATS as stats
+
+    app = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    options = app.radio(key="page_selector").options
+    rows: List[pd.DataFrame] = []
+    for position in pages or range(len(options)):
+        app.radio(key="page_selector").set_value(options[position]).run()
+        if app.exception:
+            raise RuntimeError(f"{options[position]}: {app.exception[0].value}")
+        stats.clear()
+        for _ in range(reruns):
+            app.run()
+        summary = stats.summary()
+        summary.insert(0, "Page", options[position].split("  ", 1)[-1])
+        rows.append(summary)
+    return pd.concat(rows, ignore_index=True)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure the fixed cost of an app rerun.")
+    parser.add_argument("--flights", type=int, default=1_000_000,
+                        help="Size of the synthetic dataset.")
+    parser.add_argument("--reruns", type=int, default=20,
+                        help="Unchanged reruns measured per page.")
+    parser.add_argument("--pages", default="",
+                        help="Comma-separated page positions to measure (default: all).")
+    args = parser.parse_args(argv)
+
+    # Measure the app itself: no background warm-up, no sampled previews, and
+    # a throwaway figure cache.
+    os.environ.setdefault("DASHBOARD_WARMUP", "0")
+    os.environ.setdefault("DASHBOARD_PROGRESSIVE", "0")
+    os.environ.setdefault("DASHBOARD_METRICS_PORT", "0")
+    from streamlit.logger import set_log_level
+
+    from synthetic import synthetic_sources, use_sources
+
+    set_log_level("error")
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    pages = [int(page) for page in args.pages.split(",") if page.strip()]
+    with tempfile.TemporaryDirectory(prefix="figure-cache-") as cache_dir, \
+            synthetic_sources(args.flights) as sources, use_sources(*sources):
+        os.environ.setdefault("DASHBOARD_FIGURE_CACHE_DIR", cache_dir)
+        report = measure_reruns(args.reruns, pages)
+    print(report.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+"""Local JSON API exposing the Best Airline Suggester recommendations.
+
+Run ``python route_api.py`` to serve ``Airline_dataset.csv`` on localhost, or
+``python route_api.py --synthetic 500000 --benchmark`` to measure throughput and
+tail latency offline against generated data. Only the standard library is used
+for the HTTP layer.
+
+Endpoints:
+
+* ``GET /health``
+* ``GET /recommendations?origin=ATL&destination=LAX``
+* ``POST /recommendations`` with ``{"routes": [{"origin": "ATL", "destination": "LAX"}, ...]}``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from http import HTTPStatus
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from calendar_keys import week_numbers
+from preprocess import AIRLINE_DATA_PATH, load_preprocessed_data
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BATCH_SIZE = 1000
+# Generous for ``{"origin": "ATL", "destination": "LAX"}`` plus whitespace.
+MAX_ROUTE_BYTES = 256
+MAX_BODY_BYTES = MAX_BATCH_SIZE * MAX_ROUTE_BYTES
+ROUTE_KEYS = ["ORIGIN_AIRPORT", "DEST_AIRPORT"]
+TOP_AIRLINES = 3
+
+
+class RouteIndex:
+    """Per-route airline aggregates computed once, shared by every request.
+
+    One grouped pass over the flight frame produces the same statistics that
+    ``_get_route_recommendations`` derives for a single route; rows are sorted
+    by route and then by the suggester's ranking, so answering a request is a
+    slice of a few precomputed rows instead of a scan of the flight frame.
+    """
+
+    def __init__(self, df: pd.DataFrame, cache_size: int = 65536) -> None:
+        work = pd.DataFrame(
+            {
+                "ORIGIN_AIRPORT": df["ORIGIN_AIRPORT"].to_numpy(),
+                "DEST_AIRPORT": df["DEST_AIRPORT"].to_numpy(),
+                "AIRLINE_ID": df["AIRLINE_ID"].to_numpy(),
+                "Airline_Name": df["Airline_Name"].to_numpy(),
+                "ARR_DELAY": df["ARR_DELAY"].to_numpy(),
+                "OnTime": (df["ARR_DELAY"] <= 0).to_numpy(),
+                "YearWeek": week_numbers(pd.to_datetime(df["FL_DATE"])),
+            }
+        )
+        per_route = work.groupby(ROUTE_KEYS).agg(
+            Flights=("ARR_DELAY", "size"),
+            Weeks=("YearWeek", "nunique"),
+        )
+        per_airline = (
+            work.groupby(ROUTE_KEYS + ["AIRLINE_ID", "Airline_Name"], dropna=False)
+            .agg(
+                Flights=("ARR_DELAY", "size"),
+                AvgArrivalDelay=("ARR_DELAY", "mean"),
+                OnTimeRate=("OnTime", "mean"),
+                WeeksWithFlights=("YearWeek", "nunique"),
+            )
+            .reset_index()
+            .sort_values(
+                ROUTE_KEYS + ["AvgArrivalDelay", "OnTimeRate"],
+                ascending=[True, True, True, False],
+            )
+        )
+
+        origins = per_airline["ORIGIN_AIRPORT"].to_numpy()
+        destinations = per_airline["DEST_AIRPORT"].to_numpy()
+        if len(per_airline):
+            changed = (origins[1:] != origins[:-1]) | (
+                destinations[1:] != destinations[:-1])
+            starts = np.concatenate(([0], np.flatnonzero(changed) + 1))
+        else:
+            starts = np.array([], dtype=int)
+
+        self._airlines = per_airline["Airline_Name"].to_numpy()
+        self._avg_delay = per_airline["AvgArrivalDelay"].to_numpy()
+        self._on_time_pct = (per_airline["OnTimeRate"].to_numpy() * 100).round(1)
+        self._per_week = (
+            per_airline["Flights"].to_numpy()
+            / per_airline["WeeksWithFlights"].clip(lower=1).to_numpy()
+        ).round(1)
+        route_totals = per_route.to_dict("index")
+        self._routes: Dict[Tuple[str, str], Tuple[int, int, int, int]] = {}
+        for start in starts:
+            key = (origins[start], destinations[start])
+            totals = route_totals[key]
+            stop = min(int(start) + TOP_AIRLINES, len(per_airline))
+            while stop > start and (origins[stop - 1], destinations[stop - 1]) != key:
+                stop -= 1
+            self._routes[key] = (int(start), stop, int(totals["Flights"]),
+                                 max(int(totals["Weeks"]), 1))
+        self._cached_recommend = lru_cache(maxsize=cache_size)(self._recommend)
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def routes(self) -> List[Tuple[str, str]]:
+        """Return every (origin, destination) pair present in the data."""
+
+        return list(self._routes)
+
+    def recommend(self, origin: str, destination: str) -> dict:
+        """Return the JSON-ready recommendation payload for one route."""
+
+        return self._cached_recommend(str(origin).upper(), str(destination).upper())
+
+    def cache_info(self):
+        return self._cached_recommend.cache_info()
+
+    def _recommend(self, origin: str, destination: str) -> dict:
+        entry = self._routes.get((origin, destination))
+        if entry is None:
+            return {"origin": origin, "destination": destination,
+                    "flights": 0, "weeks_observed": 0, "airlines": []}
+
+        start, stop, flights, weeks = entry
+        return {
+            "origin": origin,
+            "destination": destination,
+            "flights": flights,
+            "weeks_observed": weeks,
+            "airlines": [
+                {
+                    "airline": None if pd.isna(self._airlines[i]) else str(self._airlines[i]),
+                    "flights_per_week": float(self._per_week[i]),
+                    "on_time_pct": float(self._on_time_pct[i]),
+                    "avg_arrival_delay_min": round(float(self._avg_delay[i]), 2),
+                }
+                for i in range(start, stop)
+            ],
+        }
+
+
+class RouteAPIServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one warm ``RouteIndex`` across handlers."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], index: RouteIndex) -> None:
+        super().__init__(address, RouteAPIHandler)
+        self.index = index
+
+
+class RouteAPIHandler(BaseHTTPRequestHandler):
+    """Serve single and batched route recommendation requests."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; without TCP_NODELAY keep-alive
+    # clients stall ~40 ms per request on delayed ACKs.
+    disable_nagle_algorithm = True
+    server: RouteAPIServer
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        url = urlparse(self.path)
+        if url.path == "/health":
+            self._send_json({"status": "ok", "routes": len(self.server.index)})
+            return
+        if url.path != "/recommendations":
+            self._send_error(HTTPStatus.NOT_FOUND, "Unknown endpoint.")
+            return
+
+        query = parse_qs(url.query)
+        origin = query.get("origin", [""])[0]
+        destination = query.get("destination", [""])[0]
+        if not origin or not destination:
+            self._send_error(HTTPStatus.BAD_REQUEST,
+                             "Both origin and destination are required.")
+            return
+        self._send_json(self.server.index.recommend(origin, destination))
+
+    def do_POST(self) -> None:  # noqa: N802 - http.server naming
+        if urlparse(self.path).path != "/recommendations":
+            self._send_error(HTTPStatus.NOT_FOUND, "Unknown endpoint.")
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError as exc:
+            self._reject(HTTPStatus.BAD_REQUEST, str(exc))
+            return
+        if length < 0:
+            self._reject(HTTPStatus.BAD_REQUEST, "Content-Length must not be negative.")
+            return
+        if length > MAX_BODY_BYTES:
+            self._reject(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                         f"Request bodies are limited to {MAX_BODY_BYTES} bytes.")
+            return
+
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            routes = _parse_routes(body)
+        except (ValueError, TypeError, KeyError) as exc:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(exc))
+            return
+        if len(routes) > MAX_BATCH_SIZE:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                             f"At most {MAX_BATCH_SIZE} routes per request.")
+            return
+
+        index = self.server.index
+        self._send_json({"results": [index.recommend(o, d) for o, d in routes]})
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        """Keep the console quiet; the benchmark issues thousands of requests."""
+
+    def _send_json(self, payload: dict, status: HTTPStatus = HTTPStatus.OK) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send_json({"error": message}, status)
+
+    def _reject(self, status: HTTPStatus, message: str) -> None:
+        """Send an error without reading the body, then close the connection.
+
+        The unread body would otherwise be parsed as the next request.
+        """
+
+        self.close_connection = True
+        self._send_error(status, message)
+
+
+def _parse_routes(body: dict) -> List[Tuple[str, str]]:
+    """Validate a batch body and return its (origin, destination) pairs.
+
+    Each route is ``{"origin": ..., "destination": ...}`` or a two-item list
+    of strings; anything else raises ``ValueError``.
+    """
+
+    routes = body["routes"]
+    if not isinstance(routes, list):
+        raise ValueError("'routes' must be a list.")
+    pairs = []
+    for position, route in enumerate(routes):
+        if isinstance(route, dict):
+            route = (route.get("origin"), route.get("destination"))
+        elif not (isinstance(route, (list, tuple)) and len(route) == 2):
+            raise ValueError(f"Route {position} must be an object with origin and "
+                             "destination or an [origin, destination] pair.")
+        origin, destination = route
+        if not (isinstance(origin, str) and isinstance(destination, str)):
+            raise ValueError(f"Route {position} needs string origin and destination codes.")
+        pairs.append((origin, destination))
+    return pairs
+
+
+def create_server(
+    df: pd.DataFrame,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+) -> RouteAPIServer:
+    """Build the warm route index and bind the API server (port 0 picks a free port)."""
+
+    return RouteAPIServer((host, port), RouteIndex(df))
+
+
+def run_benchmark(
+    server: RouteAPIServer,
+    concurrency: int = 16,
+    requests_per_worker: int = 200,
+    batch_size: int = 20,
+    seed: int = 0,
+) -> dict:
+    """Fire concurrent batched requests at ``server`` and return latency stats."""
+
+    host, port = server.server_address[:2]
+    routes = server.index.routes()
+
+    def worker(worker_id: int) -> List[float]:
+        worker_rng = np.random.default_rng(seed + worker_id + 1)
+        connection = HTTPConnection(host, port, timeout=30)
+        latencies = []
+        for _ in range(requests_per_worker):
+            picks = worker_rng.integers(0, len(routes), batch_size)
+            body = json.dumps(
+                {"routes": [list(routes[i]) for i in picks]}).encode("utf-8")
+            started = time.perf_counter()
+            connection.request("POST", "/recommendations", body,
+                               {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - started)
+            if response.status != HTTPStatus.OK:
+                raise RuntimeError(f"Unexpected status {response.status}")
+        connection.close()
+        return latencies
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = np.concatenate(results) * 1000
+    total_requests = len(latencies_ms)
+    return {
+        "requests": total_requests,
+        "routes_per_request": batch_size,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(total_requests / elapsed, 1),
+        "routes_per_s": round(total_requests * batch_size / elapsed, 1),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 2),
+    }
+
+
+def _load_frame(args: argparse.Namespace) -> pd.DataFrame:
+    if args.synthetic:
+        from synthetic import make_synthetic_data
+
+        df, _ = make_synthetic_data(n_flights=args.synthetic)
+        return df
+    df, _ = load_preprocessed_data(args.dataset)
+    return df
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dataset", default=AIRLINE_DATA_PATH)
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Serve N generated flights instead of the dataset.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Run a concurrent load benchmark and exit.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200,
+                        help="Requests per benchmark worker.")
+    parser.add_argument("--batch-size", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    df = _load_frame(args)
+    server = create_server(
+        df, args.host, 0 if args.benchmark else args.port)
+    print(f"Indexed {len(server.index):,} routes from {len(df):,} flights "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    if not args.benchmark:
+        print(f"Serving on http://{args.host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        return
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        for phase in ("cold", "warm"):
+            stats = run_benchmark(server, args.concurrency,
+                                  args.requests, args.batch_size)
+            print(phase, json.dumps(stats))
+        print("cache", server.index.cache_info())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
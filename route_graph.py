@@ -0,0 +1,211 @@
+"""Airport connectivity graph for connecting-itinerary suggestions.
+
+Airports become integer ids and every route flown in the data becomes an edge
+of a CSR adjacency (``indptr``/``indices``), with a transposed copy for the
+routes arriving at an airport. Each edge keeps its best ``leg_options``
+airlines by average arrival delay, stored as dense ``(edges, leg_options)``
+arrays. A search enumerates every one- and two-stop path with array
+operations and scores all airline combinations on those paths at once by
+broadcasting the per-leg arrays, so no Python loop runs per path. Which
+airports a search can reach from each origin is worked out once, from the
+same adjacency, so selectors can offer only destinations with an itinerary.
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+LEG_OPTIONS = 3
+MIN_LEG_FLIGHTS = 10
+MAX_ITINERARIES = 10
+ITINERARY_COLUMNS = [
+    "Itinerary",
+    "Airlines",
+    "Stops",
+    "Combined Avg Delay (min)",
+    "All Legs On-Time %",
+    "Thinnest Leg (flights)",
+]
+
+
+class ConnectivityGraph:
+    """Directed route graph with per-leg airline statistics.
+
+    Only airline legs with at least ``min_leg_flights`` flights are kept, so
+    a handful of lucky flights cannot make a connection look reliable.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        leg_options: int = LEG_OPTIONS,
+        min_leg_flights: int = MIN_LEG_FLIGHTS,
+    ) -> None:
+        self.airports = pd.Index(sorted(
+            set(df["ORIGIN_AIRPORT"].dropna().unique())
+            | set(df["DEST_AIRPORT"].dropna().unique())))
+        airline_codes, self.airlines = pd.factorize(df["Airline_Name"], sort=True)
+        delay = df["ARR_DELAY"].to_numpy(dtype=float, na_value=np.nan)
+        work = pd.DataFrame(
+            {
+                "origin": self.airports.get_indexer(df["ORIGIN_AIRPORT"]),
+                "dest": self.airports.get_indexer(df["DEST_AIRPORT"]),
+                "airline": airline_codes,
+                "delay": delay,
+                "on_time": delay <= 0,
+            }
+        )
+        work = work[(work["origin"] >= 0) & (work["dest"] >= 0)
+                    & (work["origin"] != work["dest"])
+                    & (work["airline"] >= 0) & ~np.isnan(delay)]
+
+        legs = (
+            work.groupby(["origin", "dest", "airline"], sort=False)
+            .agg(flights=("delay", "size"), delay=("delay", "mean"), on_time=("on_time", "mean"))
+            .reset_index()
+        )
+        legs = legs[legs["flights"] >= min_leg_flights].sort_values(
+            ["origin", "dest", "delay", "on_time"], ascending=[True, True, True, False],
+            ignore_index=True)
+        legs["option"] = legs.groupby(["origin", "dest"]).cumcount()
+        legs = legs[legs["option"] < leg_options]
+
+        # Edges in (origin, dest) order: edge ids are CSR positions.
+        route_key = legs["origin"].to_numpy(np.int64) * len(self.airports) + legs["dest"].to_numpy()
+        edge_of_leg, edge_keys = pd.factorize(route_key, sort=True)
+        self.edge_origin = (edge_keys // len(self.airports)).astype(np.int64)
+        self.edge_dest = (edge_keys % len(self.airports)).astype(np.int64)
+        self.indptr = np.searchsorted(self.edge_origin, np.arange(len(self.airports) + 1))
+        self.indices = self.edge_dest
+        self.in_edges = np.argsort(self.edge_dest, kind="stable")
+        self.in_indptr = np.searchsorted(
+            self.edge_dest[self.in_edges], np.arange(len(self.airports) + 1))
+
+        shape = (len(edge_keys), leg_options)
+        option = legs["option"].to_numpy()
+        self.leg_delay = np.full(shape, np.nan)
+        self.leg_on_time = np.full(shape, np.nan)
+        self.leg_flights = np.zeros(shape, dtype=np.int64)
+        self.leg_airline = np.full(shape, -1, dtype=np.int64)
+        self.leg_delay[edge_of_leg, option] = legs["delay"].to_numpy()
+        self.leg_on_time[edge_of_leg, option] = legs["on_time"].to_numpy()
+        self.leg_flights[edge_of_leg, option] = legs["flights"].to_numpy()
+        self.leg_airline[edge_of_leg, option] = legs["airline"].to_numpy()
+
+        # reachable[a, b]: some one- or two-stop path runs from a to b.
+        adjacency = np.zeros((len(self.airports),) * 2, dtype=np.float32)
+        adjacency[self.edge_origin, self.indices] = 1.0
+        one_stop = adjacency @ adjacency
+        self.reachable = (one_stop + one_stop @ adjacency) > 0
+        np.fill_diagonal(self.reachable, False)
+
+    def connection_destinations(self, origin: str) -> List[str]:
+        """Return the airports reachable from ``origin`` with one or two stops, in airport order.
+
+        Airports also flown to directly are included; a search to any of
+        these finds at least one connecting itinerary.
+        """
+
+        source = self.airports.get_indexer([origin])[0]
+        if source < 0:
+            return []
+        return list(self.airports[self.reachable[source]])
+
+    def search(
+        self,
+        origin: str,
+        destination: str,
+        max_stops: int = 2,
+        limit: int = MAX_ITINERARIES,
+    ) -> pd.DataFrame:
+        """Return the best itineraries of up to ``max_stops`` stops, best first.
+
+        An itinerary's delay is the sum of its legs' average arrival delays and
+        its on-time rate the product of theirs, i.e. the chance that every leg
+        arrives on time. Fewer stops rank first, then lower delay, then higher
+        on-time rate.
+        """
+
+        source, target = self.airports.get_indexer([origin, destination])
+        if source < 0 or target < 0 or source == target:
+            return pd.DataFrame(columns=ITINERARY_COLUMNS)
+
+        candidates = [
+            self._score(paths, limit)
+            for paths in self._paths(source, target, max_stops)
+            if len(paths[0])
+        ]
+        if not candidates:
+            return pd.DataFrame(columns=ITINERARY_COLUMNS)
+
+        rows = [row for group in candidates for row in group]
+        rows.sort(key=lambda row: (row[2], row[3], -row[4]))
+        return pd.DataFrame(rows[:limit], columns=ITINERARY_COLUMNS)
+
+    def _paths(self, source: int, target: int, max_stops: int) -> List[Tuple[np.ndarray, ...]]:
+        """Return edge-id arrays, one per leg, for the 0-, 1- and 2-stop paths."""
+
+        out_edges = np.arange(self.indptr[source], self.indptr[source + 1])
+        first_hop = self.indices[out_edges]
+        # into_target[a] is the edge a -> target, or -1 when there is none.
+        into_target = np.full(len(self.airports), -1, dtype=np.int64)
+        incoming = self.in_edges[self.in_indptr[target]:self.in_indptr[target + 1]]
+        into_target[self.edge_origin[incoming]] = incoming
+
+        paths: List[Tuple[np.ndarray, ...]] = [(out_edges[first_hop == target],)]
+        if max_stops >= 1:
+            via = (first_hop != target) & (into_target[first_hop] >= 0)
+            paths.append((out_edges[via], into_target[first_hop[via]]))
+        if max_stops >= 2:
+            first = out_edges[first_hop != target]
+            starts = self.indptr[self.indices[first]]
+            counts = self.indptr[self.indices[first] + 1] - starts
+            # Expand every first leg into all edges leaving its stop.
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            second = np.repeat(starts, counts) + offsets
+            first = np.repeat(first, counts)
+            stop = self.indices[second]
+            via = (stop != source) & (stop != target) & (into_target[stop] >= 0)
+            paths.append((first[via], second[via], into_target[stop[via]]))
+        return paths
+
+    def _score(self, paths: Sequence[np.ndarray], limit: int) -> List[tuple]:
+        """Score every airline combination on ``paths`` and return the best rows."""
+
+        legs = len(paths)
+        options = self.leg_delay.shape[1]
+        delay = np.zeros((len(paths[0]),) + (1,) * legs)
+        on_time = np.ones_like(delay)
+        for position, edges in enumerate(paths):
+            shape = [len(edges)] + [1] * legs
+            shape[position + 1] = options
+            delay = delay + self.leg_delay[edges].reshape(shape)
+            on_time = on_time * self.leg_on_time[edges].reshape(shape)
+
+        delay = np.where(np.isnan(delay), np.inf, delay).ravel()
+        on_time = on_time.ravel()
+        best = np.flatnonzero(np.isfinite(delay))
+        if len(best) > limit:
+            best = best[np.argpartition(delay[best], limit)[:limit]]
+        best = best[np.lexsort((-on_time[best], delay[best]))]
+
+        path_index, *choices = np.unravel_index(best, (len(paths[0]),) + (options,) * legs)
+        rows = []
+        for row, path in enumerate(path_index):
+            edges = [leg_edges[path] for leg_edges in paths]
+            picks = [choice[row] for choice in choices]
+            stops = [self.airports[self.edge_origin[edges[0]]]] + [
+                self.airports[self.edge_dest[edge]] for edge in edges]
+            rows.append((
+                " → ".join(stops),
+                " / ".join(str(self.airlines[self.leg_airline[edge, pick]])
+                           for edge, pick in zip(edges, picks)),
+                legs - 1,
+                round(float(delay[best[row]]), 1),
+                round(float(on_time[best[row]]) * 100, 1),
+                int(min(self.leg_flights[edge, pick] for edge, pick in zip(edges, picks))),
+            ))
+        return rows
@@ -0,0 +1,126 @@
+"""Nationwide route leaderboard with precomputed sort orders.
+
+One grouped pass over the flight frame gives every (origin, destination,
+airline) cell its flights, delay sum and on-time count; routes are rolled up
+from those cells, and each route's best airline is the first cell in the
+suggester's ranking (lowest average arrival delay, then highest on-time
+rate). Every sortable column keeps an ascending and a descending row order,
+so a page of the leaderboard is a filter of a precomputed order plus a slice:
+no sort, and no scan of the flight frame, per request.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+SORTABLE_COLUMNS = ("Avg Arrival Delay (min)", "On-Time %", "Flights", "Best Airline Delay (min)")
+
+
+class RouteLeaderboard:
+    """Per-route volume, delay, on-time rate and best airline for every route."""
+
+    def __init__(self, df: pd.DataFrame, airports_us: pd.DataFrame | None = None) -> None:
+        origin, origins = pd.factorize(df["ORIGIN_AIRPORT"], sort=True)
+        dest, dests = pd.factorize(df["DEST_AIRPORT"], sort=True)
+        airline, airlines = pd.factorize(df["Airline_Name"], sort=True)
+        delay = df["ARR_DELAY"].to_numpy(dtype=float, na_value=np.nan)
+        valid = (origin >= 0) & (dest >= 0)
+
+        # Airline position 0 holds flights with no known airline: they count
+        # towards their route but can never be its best airline.
+        shape = (len(origins), len(dests), len(airlines) + 1)
+        cells = pd.DataFrame({
+            "cell": np.ravel_multi_index((origin[valid], dest[valid], airline[valid] + 1), shape),
+            "delay": delay[valid],
+            "on_time": (delay[valid] <= 0).astype(np.int64),
+            "timed": (~np.isnan(delay[valid])).astype(np.int64),
+        }).groupby("cell").agg(
+            flights=("delay", "size"), delay=("delay", "sum"),
+            on_time=("on_time", "sum"), timed=("timed", "sum"),
+        )
+        cell_origin, cell_dest, cell_airline = np.unravel_index(cells.index.to_numpy(), shape)
+        cell_route = cell_origin * len(dests) + cell_dest
+        route_of_cell, route_keys = pd.factorize(cell_route, sort=True)
+
+        def per_route(values: np.ndarray) -> np.ndarray:
+            return np.bincount(route_of_cell, weights=values, minlength=len(route_keys))
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            timed = per_route(cells["timed"].to_numpy())
+            route_delay = per_route(cells["delay"].to_numpy()) / timed
+            route_on_time = per_route(cells["on_time"].to_numpy()) / timed * 100
+            cell_delay = cells["delay"].to_numpy() / cells["timed"].to_numpy()
+            cell_on_time = cells["on_time"].to_numpy() / cells["timed"].to_numpy()
+
+        # The suggester's ranking within each route; the first ranked cell
+        # with a known airline is the route's best.
+        ranked = np.lexsort((-cell_on_time, cell_delay, cell_airline == 0, route_of_cell))
+        first = ranked[np.flatnonzero(np.diff(route_of_cell[ranked], prepend=-1))]
+        has_best = (cell_airline[first] > 0) & ~np.isnan(cell_delay[first])
+
+        route_origin = np.asarray(origins)[route_keys // len(dests)]
+        route_dest = np.asarray(dests)[route_keys % len(dests)]
+        best_airline = np.where(has_best, np.asarray(airlines, dtype=object)[
+            np.maximum(cell_airline[first] - 1, 0)], None)
+        self.table = pd.DataFrame({
+            "Route": [f"{origin} → {dest}" for origin, dest in zip(route_origin, route_dest)],
+            "Origin": route_origin,
+            "Destination": route_dest,
+            "Flights": per_route(cells["flights"].to_numpy()).astype(np.int64),
+            "Avg Arrival Delay (min)": route_delay.round(1),
+            "On-Time %": route_on_time.round(1),
+            "Best Airline": best_airline,
+            "Best Airline Delay (min)": np.where(has_best, cell_delay[first], np.nan).round(1),
+        })
+
+        self.flights = self.table["Flights"].to_numpy()
+        self.positions: Dict[Tuple[str, str], int] = {
+            (origin, dest): i for i, (origin, dest) in enumerate(zip(route_origin, route_dest))}
+        self.orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        for column in SORTABLE_COLUMNS:
+            values = self.table[column].to_numpy(dtype=float)
+            # NaN sorts last in both directions.
+            self.orders[column, False] = np.argsort(values, kind="stable")
+            self.orders[column, True] = np.argsort(-values, kind="stable")
+
+        cities = {}
+        if airports_us is not None and not airports_us.empty:
+            cities = dict(zip(airports_us["IATA"], airports_us["City"].fillna("")))
+        self.search_text = [
+            f"{route} {cities.get(origin, '')} {cities.get(dest, '')} {airline or ''}".lower()
+            for route, origin, dest, airline in zip(
+                self.table["Route"], route_origin, route_dest, best_airline)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def matching(
+        self,
+        sort_by: str = "Avg Arrival Delay (min)",
+        descending: bool = True,
+        search: str = "",
+        min_flights: int = 0,
+    ) -> np.ndarray:
+        """Return the positions of the routes matching ``search`` and ``min_flights``, sorted.
+
+        ``search`` is a case-insensitive substring of the route, either
+        airport's city or the best airline.
+        """
+
+        order = self.orders[sort_by, descending]
+        keep = self.flights >= min_flights
+        term = search.strip().lower()
+        if term:
+            keep &= np.fromiter((term in text for text in self.search_text),
+                                dtype=bool, count=len(self.search_text))
+        return order[keep[order]]
+
+    def page(self, order: np.ndarray, page: int = 0, page_size: int = 25) -> pd.DataFrame:
+        """Return rows ``page * page_size`` onwards of ``order``, at most ``page_size`` of them."""
+
+        start = max(page, 0) * page_size
+        return self.table.iloc[order[start:start + page_size]].reset_index(drop=True)
@@ -0,0 +1,249 @@
+"""Synthetic flight data shaped like the output of ``load_preprocessed_data``.
+
+Used by the offline tooling (benchmarks, load tests, budgets) so it can run
+without the local CSV or the remote reference downloads. ``write_synthetic_sources``
+writes the same data in the raw formats ``preprocess`` reads, and
+``synthetic_sources`` serves them on localhost in place of the remote URLs.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+import preprocess
+from preprocess import IATA_CODES
+
+SYNTHETIC_AIRLINES = {
+    19393: "Southwest Airlines Co.: WN",
+    19790: "Delta Air Lines Inc.: DL",
+    19805: "American Airlines Inc.: AA",
+    19977: "United Air Lines Inc.: UA",
+    20304: "SkyWest Airlines Inc.: OO",
+    20409: "JetBlue Airways: B6",
+    19930: "Alaska Airlines Inc.: AS",
+    20416: "Spirit Air Lines: NK",
+    20436: "Frontier Airlines Inc.: F9",
+    20378: "Mesa Airlines Inc.: YV",
+    20398: "Envoy Air: MQ",
+    20452: "Republic Airline: YX",
+}
+SYNTHETIC_STATES = (
+    "US-CA", "US-TX", "US-FL", "US-NY", "US-IL", "US-GA", "US-CO", "US-WA",
+    "US-AZ", "US-NC", "US-MI", "US-MA", "US-NV", "US-MN", "US-OR", "US-PA",
+)
+
+
+def make_synthetic_airports(n_airports: int = 120, seed: int = 0) -> pd.DataFrame:
+    """Return an ``airports_us``-shaped frame with plausible CONUS coordinates."""
+
+    rng = np.random.default_rng(seed)
+    codes = sorted(IATA_CODES)[:n_airports]
+    return pd.DataFrame(
+        {
+            "IATA": codes,
+            "Airport_Name": [f"{code} International Airport" for code in codes],
+            "City": [f"{code.title()} City" for code in codes],
+            "State": rng.choice(SYNTHETIC_STATES, size=len(codes)),
+            "Latitude": rng.uniform(26.0, 48.0, size=len(codes)).round(4),
+            "Longitude": rng.uniform(-122.0, -71.0, size=len(codes)).round(4),
+        }
+    )
+
+
+def make_synthetic_data(
+    n_flights: int = 200_000,
+    n_airports: int = 120,
+    seed: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Return ``(df, airports_us)`` with the columns the dashboard pages use.
+
+    Flights cover 2018-2020 (so the August 2018 and January 2020 views have
+    data), traffic is skewed towards a handful of hubs, and each airline has
+    its own delay bias so the rankings are not flat.
+    """
+
+    rng = np.random.default_rng(seed)
+    airports_us = make_synthetic_airports(n_airports, seed)
+    codes = airports_us["IATA"].to_numpy()
+
+    weights = 1.0 / np.arange(1, len(codes) + 1) ** 0.8
+    weights /= weights.sum()
+    origin_idx = rng.choice(len(codes), size=n_flights, p=weights)
+    dest_idx = rng.choice(len(codes), size=n_flights, p=weights)
+    same = origin_idx == dest_idx
+    dest_idx[same] = (dest_idx[same] + 1 + rng.integers(0, len(codes) - 1, same.sum())) % len(codes)
+
+    airline_ids = np.array(list(SYNTHETIC_AIRLINES))
+    airline_weights = np.linspace(2.0, 0.5, len(airline_ids))
+    airline_idx = rng.choice(
+        len(airline_ids), size=n_flights, p=airline_weights / airline_weights.sum())
+    airline_bias = np.linspace(-4.0, 9.0, len(airline_ids))[airline_idx]
+
+    start = np.datetime64("2018-01-01")
+    span = int((np.datetime64("2020-12-31") - start).astype(int)) + 1
+    fl_date = start + rng.integers(0, span, n_flights).astype("timedelta64[D]")
+
+    dep_delay = (rng.normal(0.0, 8.0, n_flights) + airline_bias
+                 + rng.exponential(12.0, n_flights) * (rng.random(n_flights) < 0.25))
+    arr_delay = dep_delay + rng.normal(-3.0, 6.0, n_flights)
+    weather = np.where(rng.random(n_flights) < 0.04,
+                       rng.exponential(25.0, n_flights), np.nan)
+
+    flight_num = (origin_idx * 131 + dest_idx * 17 + airline_idx * 7) % 6000 + 1
+
+    df = pd.DataFrame(
+        {
+            "FL_DATE": pd.to_datetime(fl_date),
+            "AIRLINE_ID": airline_ids[airline_idx],
+            "FLIGHT_NUM": flight_num,
+            "ORIGIN_SEQ_ID": 1_000_000 + origin_idx * 100,
+            "DEST_SEQ_ID": 1_000_000 + dest_idx * 100,
+            "ORIGIN_AIRPORT": pd.Categorical.from_codes(origin_idx, categories=codes),
+            "DEST_AIRPORT": pd.Categorical.from_codes(dest_idx, categories=codes),
+            "DEP_DELAY": dep_delay.round(0),
+            "ARR_DELAY": arr_delay.round(0),
+            "WEATHER_DELAY": weather.round(0),
+        }
+    )
+    df["Airline_Name"] = pd.Categorical(df["AIRLINE_ID"].map(SYNTHETIC_AIRLINES))
+    df = df.sort_values("FL_DATE", kind="stable", ignore_index=True)
+    return df, airports_us
+
+
+def write_synthetic_sources(
+    directory: str | Path,
+    n_flights: int = 200_000,
+    seed: int = 0,
+) -> Tuple[Path, Path, Path]:
+    """Write the raw flights CSV, airline lookup and airports file to ``directory``.
+
+    Returns ``(dataset, airlines, airports)`` paths laid out like the real
+    sources, so ``load_preprocessed_data`` runs its full parsing path on them.
+    """
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    df, airports_us = make_synthetic_data(n_flights, seed=seed)
+
+    dataset_path = directory / "Airline_dataset.csv"
+    raw = df.drop(columns=["Airline_Name"])
+    raw["FL_DATE"] = raw["FL_DATE"].dt.strftime("%m/%d/%y")
+    raw.to_csv(dataset_path, index=False)
+
+    airlines_path = directory / "airlines.csv"
+    pd.DataFrame(
+        {"Code": list(SYNTHETIC_AIRLINES), "Description": list(SYNTHETIC_AIRLINES.values())}
+    ).to_csv(airlines_path, index=False)
+
+    airports_path = directory / "airports.csv"
+    foreign = pd.DataFrame(
+        {"IATA": ["YYZ", "MEX"], "Airport_Name": ["Toronto Pearson", "Mexico City"],
+         "City": ["Toronto", "Mexico City"], "State": ["CA-ON", "MX-DIF"],
+         "Latitude": [43.68, 19.44], "Longitude": [-79.63, -99.07]}
+    )
+    airports = pd.concat([airports_us, foreign], ignore_index=True).rename(columns={
+        "IATA": "iata_code",
+        "Airport_Name": "name",
+        "City": "municipality",
+        "State": "iso_region",
+        "Latitude": "latitude_deg",
+        "Longitude": "longitude_deg",
+    })
+    airports.insert(0, "iso_country", ["US"] * len(airports_us) + ["CA", "MX"])
+    airports.to_csv(airports_path, index=False)
+    return dataset_path, airlines_path, airports_path
+
+
+_FAILURES_LOCK = threading.Lock()
+
+
+class _StubHandler(SimpleHTTPRequestHandler):
+    """Serves files like a slow, flaky remote: ``latency`` seconds per request,
+    and the first ``failures`` requests for each path answered with 503."""
+
+    def __init__(self, *args, latency: float, failures: Dict[str, int], **kwargs) -> None:
+        self.latency = latency
+        self.failures = failures
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib signature
+        time.sleep(self.latency)
+        with _FAILURES_LOCK:
+            remaining = self.failures.get(self.path, self.failures.get("*", 0))
+            self.failures[self.path] = max(remaining - 1, 0)
+        if remaining > 0:
+            self.send_error(503)
+            return
+        super().do_GET()
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - stdlib signature
+        pass
+
+
+def serve_directory(
+    directory: str | Path,
+    host: str = "127.0.0.1",
+    latency: float = 0.0,
+    failures: int = 0,
+) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve ``directory`` over HTTP on a free local port in a daemon thread.
+
+    ``latency`` and ``failures`` make it stand in for a slow or flaky remote.
+    Returns the server (call ``shutdown()`` when done) and its base URL.
+    """
+
+    server = ThreadingHTTPServer((host, 0), partial(
+        _StubHandler, directory=str(directory), latency=latency, failures={"*": failures}))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+Sources = Tuple[Path, str, str]
+
+
+@contextmanager
+def synthetic_sources(
+    n_flights: int = 200_000,
+    seed: int = 0,
+    latency: float = 0.0,
+    failures: int = 0,
+) -> Iterator[Sources]:
+    """Write the raw synthetic sources and serve the two remote ones locally.
+
+    Yields ``(dataset_path, airlines_url, airports_url)``. ``latency`` and
+    ``failures`` are passed to ``serve_directory``.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+        dataset, airlines, airports = write_synthetic_sources(directory, n_flights, seed)
+        server, base_url = serve_directory(directory, latency=latency, failures=failures)
+        try:
+            yield dataset, f"{base_url}/{airlines.name}", f"{base_url}/{airports.name}"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+@contextmanager
+def use_sources(dataset: Path, airlines_url: str, airports_url: str) -> Iterator[None]:
+    """Point ``preprocess`` (and so the app's loader) at the given sources."""
+
+    original = (preprocess.AIRLINE_DATA_PATH, preprocess.AIRLINES_LOOKUP_URL,
+                preprocess.AIRPORTS_URL)
+    (preprocess.AIRLINE_DATA_PATH, preprocess.AIRLINES_LOOKUP_URL,
+     preprocess.AIRPORTS_URL) = str(dataset), airlines_url, airports_url
+    try:
+        yield
+    finally:
+        (preprocess.AIRLINE_DATA_PATH, preprocess.AIRLINES_LOOKUP_URL,
+         preprocess.AIRPORTS_URL) = original
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import re
 from copy import deepcopy
+from functools import lru_cache
 from typing import Sequence
 
 import plotly.express as px
@@ -21,6 +23,10 @@ APP_BACKGROUND = "#0F172A"
 CARD_BACKGROUND = "#14213D"
 SIDEBAR_BACKGROUND = "#0B1120"
 
+# Bump whenever colors, the Plotly template or figure styling change, so
+# figures cached on disk (see figure_cache.py) are rebuilt with the new look.
+THEME_VERSION = 2
+
 COLOR_SEQUENCE = [
     PRIMARY_COLOR,
     ACCENT_BLUE,
@@ -45,14 +51,19 @@ BLUE_GRADIENT = [
 
 
 def init_theme() -> None:
-    """Apply Plotly defaults and inject global CSS for a cohesive UI."""
+    """Apply Plotly defaults and inject global CSS for a cohesive UI.
+
+    Runs on every rerun, so both halves are cheap after the first: the
+    template is registered once per process and the CSS is a prebuilt string.
+    """
 
     _configure_plotly()
     _inject_streamlit_css()
 
 
+@lru_cache(maxsize=None)
 def _configure_plotly() -> None:
-    """Create and register a custom Plotly template."""
+    """Create and register a custom Plotly template, once per process."""
 
     template = deepcopy(pio.templates["plotly_white"])
     layout = template.layout
@@ -75,8 +86,11 @@ def _configure_plotly() -> None:
 def _inject_streamlit_css() -> None:
     """Inject custom CSS to align Streamlit widgets with the dashboard theme."""
 
-    st.markdown(
-        f"""
+    st.markdown(_THEME_CSS, unsafe_allow_html=True)
+
+
+# Built once at import and whitespace-collapsed, since it is sent on every rerun.
+_THEME_CSS = re.sub(r"\s+", " ", f"""
         <style>
         .stApp {{
             background-color: {APP_BACKGROUND};
@@ -168,9 +182,7 @@ def _inject_streamlit_css() -> None:
             margin-top: 0.3rem;
         }}
         </style>
-        """,
-        unsafe_allow_html=True,
-    )
+        """).strip()
 
 
 __all__: Sequence[str] = [
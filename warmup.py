@@ -0,0 +1,307 @@
+"""Background warm-up that fills the dashboard caches before users need them.
+
+``start_warmup`` loads the data and then runs every page's cached builders,
+one at a time, in a background thread. Streamlit caches are process-wide, so once a builder has
+run here, sessions get a cache hit instead of paying for the aggregation.
+
+The builders are kept inside a CPU budget so a warm-up running next to live
+sessions doesn't starve them. The warm-up thread shares the interpreter lock
+with those sessions, so the budget is a fraction of one core however large
+the machine: ``0.5`` lets it run half the time. It is enforced while a
+builder runs, not after it: a trace function checks the thread's CPU time
+every few hundred Python calls and sleeps off the excess, which hands the
+lock to the sessions. On Linux the warm-up thread also runs at the lowest
+scheduling priority.
+
+The trade-off: a builder sleeps while holding Streamlit's per-key compute
+lock, so a session that asks for the builder the warm-up is running waits
+for the throttled run, ``1 / budget`` times its normal wall time. That is
+why there is a single worker with the whole budget rather than several
+splitting it, and why the budget is never below ``MIN_WARMUP_CPU_BUDGET``:
+such a session waits at most four times as long as it would have without
+the warm-up, and every later session gets a cache hit.
+
+    python warmup.py --flights 200000 --budget 0.25
+
+warms every builder on synthetic data while timing a stand-in session, and
+exits 1 if the warm-up used more CPU than its budget.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+import pandas as pd
+
+WARMUP_ENABLED = os.environ.get("DASHBOARD_WARMUP", "1") != "0"
+WARMUP_CPU_BUDGET = float(os.environ.get("DASHBOARD_WARMUP_CPU_BUDGET", "0.5"))
+MIN_WARMUP_CPU_BUDGET = 0.25
+WARMUP_NICE = 19
+
+WarmupTask = Tuple[str, Callable[[], object]]
+TaskFactory = Callable[[pd.DataFrame, pd.DataFrame], List[WarmupTask]]
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupProgress:
+    """Thread-safe record of what the warm-up has finished so far."""
+
+    total: int = 1
+    completed: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    finished: bool = False
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def fraction(self) -> float:
+        with self._lock:
+            return min((len(self.completed) + len(self.failed)) / max(self.total, 1), 1.0)
+
+    def summary(self) -> str:
+        """Return a one-line status suitable for a caption or a log line."""
+
+        with self._lock:
+            done = len(self.completed) + len(self.failed)
+            state = "done" if self.finished else "running"
+            failed = f", {len(self.failed)} failed" if self.failed else ""
+            return f"Cache warm-up {state}: {done}/{self.total} steps{failed}"
+
+    def _record(self, name: str, seconds: float, error: BaseException | None = None) -> None:
+        with self._lock:
+            self.timings[name] = seconds
+            if error is None:
+                self.completed.append(name)
+            else:
+                self.failed[name] = repr(error)
+        if error is None:
+            LOGGER.info("Warm-up %s finished in %.2fs", name, seconds)
+        else:
+            LOGGER.warning("Warm-up %s failed after %.2fs: %r",
+                           name, seconds, error)
+
+
+def start_warmup(
+    load_data: Callable[[], Tuple[pd.DataFrame, pd.DataFrame]],
+    task_factories: Sequence[TaskFactory],
+    cpu_budget: float = WARMUP_CPU_BUDGET,
+) -> WarmupProgress:
+    """Run ``load_data`` and every page builder in a background thread.
+
+    Returns immediately with a ``WarmupProgress`` that fills in as steps
+    complete. ``cpu_budget`` is the fraction of one core the builders may
+    keep busy, clamped to ``MIN_WARMUP_CPU_BUDGET``..1.
+    """
+
+    progress = WarmupProgress()
+    thread = threading.Thread(
+        target=run_warmup,
+        args=(load_data, task_factories, cpu_budget, progress),
+        name="dashboard-warmup",
+        daemon=True,
+    )
+    thread.start()
+    return progress
+
+
+def run_warmup(
+    load_data: Callable[[], Tuple[pd.DataFrame, pd.DataFrame]],
+    task_factories: Sequence[TaskFactory],
+    cpu_budget: float = WARMUP_CPU_BUDGET,
+    progress: WarmupProgress | None = None,
+) -> WarmupProgress:
+    """Blocking version of ``start_warmup``; returns once every step has run.
+
+    The data load runs at full speed, though at low priority: every session
+    waits on the same cache entry, so throttling it would only delay them.
+    """
+
+    progress = progress or WarmupProgress()
+    _lower_priority()
+    started = time.perf_counter()
+    try:
+        df, airports_us = load_data()
+    except Exception as exc:  # pragma: no cover - surfaced via progress
+        progress._record("get_data", time.perf_counter() - started, exc)
+        progress.finished = True
+        return progress
+    progress._record("get_data", time.perf_counter() - started)
+
+    tasks = [task for factory in task_factories for task in factory(df, airports_us)]
+    with progress._lock:
+        progress.total = 1 + len(tasks)
+
+    share = _duty_cycle(cpu_budget)
+    LOGGER.info("Warming %d cached builders at %.0f%% duty cycle", len(tasks), share * 100)
+    for name, func in tasks:
+        seconds, error = _run_throttled(func, share)
+        progress._record(name, seconds, error)
+
+    progress.finished = True
+    LOGGER.info("%s in %.2fs", progress.summary(),
+                time.perf_counter() - started)
+    return progress
+
+
+def _duty_cycle(cpu_budget: float) -> float:
+    """Return the fraction of a core the warm-up thread runs at for ``cpu_budget``.
+
+    Clamped below by ``MIN_WARMUP_CPU_BUDGET``, which bounds how much longer
+    a session waiting on a builder the warm-up is running has to wait.
+    """
+
+    return max(min(cpu_budget, 1.0), MIN_WARMUP_CPU_BUDGET)
+
+
+class _Throttle:
+    """Trace function that holds its thread to ``share`` of a core while it runs.
+
+    Called on every Python function call in the thread it is installed in;
+    every ``check_every`` calls it sleeps long enough to bring the CPU time
+    used since the last pause down to ``share`` of the elapsed time. A
+    single long C call, such as one large sort, is not interrupted, so the
+    cap holds over tens of milliseconds rather than instantly.
+    """
+
+    def __init__(self, share: float, check_every: int = 1024) -> None:
+        self.share = share
+        self.check_every = check_every
+        self.calls = 0
+        self.cpu_mark = time.thread_time()
+
+    def __call__(self, frame, event, arg) -> None:
+        self.calls += 1
+        if self.calls % self.check_every == 0:
+            self.pause()
+        # No local trace function, so no per-line events.
+        return None
+
+    def pause(self) -> None:
+        used = time.thread_time() - self.cpu_mark
+        if used > 0:
+            time.sleep(used * (1.0 / self.share - 1.0))
+        self.cpu_mark = time.thread_time()
+
+
+def _run_throttled(func: Callable[[], object], share: float) -> Tuple[float, BaseException | None]:
+    """Run ``func`` at no more than ``share`` of a core; return its wall time and error.
+
+    Leaves an existing trace function (a debugger, coverage) in place and
+    runs unthrottled under it.
+    """
+
+    throttle = _Throttle(share) if share < 1.0 and sys.gettrace() is None else None
+    started = time.perf_counter()
+    error = None
+    if throttle is not None:
+        sys.settrace(throttle)
+    try:
+        func()
+    except Exception as exc:  # noqa: BLE001 - one bad builder must not stop the rest
+        error = exc
+    finally:
+        if throttle is not None:
+            sys.settrace(None)
+            throttle.pause()
+    return time.perf_counter() - started, error
+
+
+def _lower_priority() -> None:
+    """Move the calling thread to the lowest scheduling priority where the OS allows it.
+
+    Linux applies nice values per thread; elsewhere this does nothing.
+    """
+
+    if sys.platform.startswith("linux"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), WARMUP_NICE)
+        except OSError:
+            pass
+
+
+class _SessionProbe:
+    """Stand-in live session: a short pure-Python step every few milliseconds, timed."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.latencies: List[float] = []
+        self.cpu = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="session-probe", daemon=True)
+
+    def __enter__(self) -> "_SessionProbe":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        cpu_started = time.thread_time()
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            sum(i * i for i in range(2_000))
+            self.latencies.append(time.perf_counter() - started)
+        self.cpu = time.thread_time() - cpu_started
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.latencies, q)) * 1000 if self.latencies else float("nan")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Warm every builder on synthetic data and check the CPU budget holds.")
+    parser.add_argument("--flights", type=int, default=200_000,
+                        help="Size of the synthetic dataset.")
+    parser.add_argument("--budget", type=float, default=WARMUP_CPU_BUDGET,
+                        help="Fraction of one core the builders may use.")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed overshoot, as a fraction of the budget.")
+    args = parser.parse_args(argv)
+
+    from streamlit.logger import set_log_level
+
+    # Imported here so ``--help`` stays fast.
+    from app import WARMUP_TASK_FACTORIES
+    from synthetic import make_synthetic_data
+
+    # Builders run outside ``streamlit run``; silence the no-runtime warnings.
+    set_log_level("error")
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    df, airports_us = make_synthetic_data(args.flights)
+    budget = _duty_cycle(args.budget)
+
+    with _SessionProbe() as idle:
+        time.sleep(1.0)
+    with _SessionProbe() as busy:
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        progress = run_warmup(lambda: (df, airports_us), WARMUP_TASK_FACTORIES, budget)
+        wall = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+    used = (cpu - busy.cpu) / wall
+
+    print(progress.summary())
+    print(f"Warm-up: {wall:.2f}s wall, {used:.2f} of a core (budget {budget:.2f})")
+    print(f"Session step p50/p95: {idle.percentile(50):.2f}/{idle.percentile(95):.2f} ms idle, "
+          f"{busy.percentile(50):.2f}/{busy.percentile(95):.2f} ms during the warm-up")
+    if used > budget * (1 + args.tolerance):
+        print("CPU budget exceeded.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())